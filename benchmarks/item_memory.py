@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+'''Measure the memory used by Twitter items with and without __slots__
+
+The unslotted variants are plain dataclass copies of the slotted classes with the same fields.
+Usage: python3 benchmarks/item_memory.py [N]
+'''
+
+import dataclasses
+import datetime
+import gc
+import snscrape.modules.twitter as twitter
+import sys
+import tracemalloc
+
+
+def unslotted_copy(cls):
+	fields = []
+	for field in dataclasses.fields(cls):
+		if field.default is not dataclasses.MISSING:
+			fields.append((field.name, field.type, dataclasses.field(default = field.default)))
+		elif field.default_factory is not dataclasses.MISSING:
+			fields.append((field.name, field.type, dataclasses.field(default_factory = field.default_factory)))
+		else:
+			fields.append((field.name, field.type))
+	return dataclasses.make_dataclass(f'Unslotted{cls.__name__}', fields)
+
+
+def make_tweets(n, classes):
+	Tweet, User, TextLink, Photo = classes
+	date = datetime.datetime(2023, 1, 1, tzinfo = datetime.timezone.utc)
+	tweets = []
+	for i in range(n):
+		user = User(
+			username = f'user{i}',
+			id = 10**9 + i,
+			displayname = f'User {i}',
+			rawDescription = 'Description https://t.co/abcdefghij',
+			renderedDescription = 'Description example.org',
+			descriptionLinks = [TextLink(text = 'example.org', url = 'https://example.org/', tcourl = 'https://t.co/abcdefghij', indices = (12, 35))],
+			verified = False,
+			created = date,
+			followersCount = i,
+			friendsCount = i,
+			statusesCount = i,
+			favouritesCount = i,
+			listedCount = i,
+			mediaCount = i,
+			location = '',
+			protected = False,
+			link = None,
+			profileImageUrl = 'https://pbs.twimg.com/profile_images/1/a_normal.jpg',
+			profileBannerUrl = None,
+		)
+		tweets.append(Tweet(
+			url = f'https://twitter.com/user{i}/status/{10**18 + i}',
+			date = date,
+			rawContent = 'Some content https://t.co/abcdefghij',
+			renderedContent = 'Some content example.org',
+			id = 10**18 + i,
+			user = user,
+			replyCount = 0,
+			retweetCount = 0,
+			likeCount = 0,
+			quoteCount = 0,
+			conversationId = 10**18 + i,
+			lang = 'en',
+			links = [TextLink(text = 'example.org', url = 'https://example.org/', tcourl = 'https://t.co/abcdefghij', indices = (13, 36))],
+			media = [Photo(previewUrl = 'https://pbs.twimg.com/media/a.jpg', fullUrl = 'https://pbs.twimg.com/media/a.jpg?name=large')],
+		))
+	return tweets
+
+
+def measure(n, classes):
+	gc.collect()
+	tracemalloc.start()
+	tweets = make_tweets(n, classes)
+	current, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del tweets
+	return current
+
+
+def main():
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+	slotted = (twitter.Tweet, twitter.User, twitter.TextLink, twitter.Photo)
+	unslotted = tuple(map(unslotted_copy, slotted))
+	results = {'slotted': measure(n, slotted), 'unslotted': measure(n, unslotted)}
+	for name, size in results.items():
+		print(f'{name:>9}: {size / 2**20:8.1f} MiB for {n} tweets, {size / n:6.0f} bytes per tweet')
+	print(f'Reduction: {1 - results["slotted"] / results["unslotted"]:.1%}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+'''Generate the synthetic page fixtures used by benchmarks/parsers.py
+
+The fixtures imitate the structure of the pages and API responses of each service closely enough to exercise the common paths of the parsers.
+They are generated deterministically and checked in; rerun this only when a fixture needs to change.
+Usage: python3 benchmarks/make_fixtures.py [N]
+'''
+
+import datetime
+import html
+import json
+import os
+import random
+import sys
+import urllib.parse
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BASE_DATE = datetime.datetime(2023, 1, 1, tzinfo = datetime.timezone.utc)
+WORDS = ('lorem', 'ipsum', 'dolor', 'sit', 'amet', 'consectetur', 'adipiscing', 'elit', 'sed', 'do', 'eiusmod', 'tempor', 'incididunt', 'ut', 'labore', 'et', 'dolore', 'magna', 'aliqua', 'snscrape', 'überprüfung', '测试', 'тест')
+
+
+def text(rng, n):
+	return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def date(i):
+	return BASE_DATE - datetime.timedelta(minutes = 17 * i)
+
+
+def twitter_date(d):
+	return d.strftime('%a %b %d %H:%M:%S +0000 %Y')
+
+
+def twitter_user(i):
+	return {
+		'__typename': 'User',
+		'rest_id': str(1000000 + i),
+		'is_blue_verified': i % 3 == 0,
+		'affiliates_highlighted_label': {},
+		'legacy': {
+			'screen_name': f'user{i}',
+			'name': f'User {i}',
+			'description': 'Writing about things at https://t.co/abcdefghij',
+			'entities': {'description': {'urls': [{'display_url': 'example.org', 'expanded_url': 'https://example.org/', 'url': 'https://t.co/abcdefghij', 'indices': [24, 47]}]}},
+			'verified': False,
+			'created_at': twitter_date(BASE_DATE - datetime.timedelta(days = 1000 + i)),
+			'followers_count': 100 * i,
+			'friends_count': 10 * i,
+			'statuses_count': 1000 + i,
+			'favourites_count': 50 * i,
+			'listed_count': i,
+			'media_count': 3 * i,
+			'location': 'Somewhere',
+			'protected': False,
+			'profile_image_url_https': f'https://pbs.twimg.com/profile_images/{i}/a_normal.jpg',
+			'profile_banner_url': f'https://pbs.twimg.com/profile_banners/{i}/1',
+		},
+	}
+
+
+def twitter_tweet(rng, i, userIndex):
+	tweetId = 1600000000000000000 + 1000 * i
+	content = text(rng, rng.randrange(5, 30))
+	legacy = {
+		'id_str': str(tweetId),
+		'user_id_str': str(1000000 + userIndex),
+		'created_at': twitter_date(date(i)),
+		'full_text': content,
+		'entities': {'hashtags': [], 'symbols': [], 'user_mentions': [], 'urls': []},
+		'reply_count': rng.randrange(100),
+		'retweet_count': rng.randrange(100),
+		'favorite_count': rng.randrange(1000),
+		'quote_count': rng.randrange(10),
+		'bookmark_count': rng.randrange(10),
+		'conversation_id_str': str(tweetId),
+		'lang': 'en',
+		'source': '<a href="https://mobile.twitter.com" rel="nofollow">Twitter Web App</a>',
+	}
+	if i % 3 == 0:
+		start = len(content) + 1
+		legacy['full_text'] = f'{content} https://t.co/abcdefghij'
+		legacy['entities']['urls'].append({'display_url': 'example.org/page', 'expanded_url': f'https://example.org/page/{i}', 'url': 'https://t.co/abcdefghij', 'indices': [start, start + 23]})
+	if i % 4 == 0:
+		legacy['entities']['hashtags'].append({'text': 'snscrape', 'indices': [0, 9]})
+	if i % 5 == 0:
+		legacy['extended_entities'] = {'media': [{'type': 'photo', 'media_url_https': f'https://pbs.twimg.com/media/F{i}.jpg', 'ext_alt_text': 'A photo'}]}
+	if i % 7 == 0:
+		replyTo = (userIndex + 1) % 20
+		legacy['in_reply_to_status_id_str'] = str(tweetId - 1000)
+		legacy['in_reply_to_user_id_str'] = str(1000000 + replyTo)
+		legacy['in_reply_to_screen_name'] = f'user{replyTo}'
+		legacy['entities']['user_mentions'].append({'screen_name': f'user{replyTo}', 'id_str': str(1000000 + replyTo), 'name': f'User {replyTo}', 'indices': [0, 0]})
+	result = {
+		'__typename': 'Tweet',
+		'rest_id': str(tweetId),
+		'core': {'user_results': {'result': twitter_user(userIndex)}},
+		'legacy': legacy,
+		'views': {'count': str(rng.randrange(100000)), 'state': 'EnabledWithCount'},
+	}
+	return result
+
+
+def make_twitter(rng, n):
+	entries = []
+	for i in range(n):
+		result = twitter_tweet(rng, i, rng.randrange(20))
+		if i % 11 == 0:
+			retweeted = twitter_tweet(rng, n + i, rng.randrange(20))
+			result['legacy']['retweeted_status_result'] = {'result': retweeted}
+			result['legacy']['full_text'] = f'RT @user: {retweeted["legacy"]["full_text"]}'
+		elif i % 13 == 0:
+			quoted = twitter_tweet(rng, 2 * n + i, rng.randrange(20))
+			result['quoted_status_result'] = {'result': quoted}
+			result['legacy']['quoted_status_id_str'] = quoted['rest_id']
+		entries.append({
+			'entryId': f'tweet-{result["rest_id"]}',
+			'sortIndex': result['rest_id'],
+			'content': {
+				'entryType': 'TimelineTimelineItem',
+				'__typename': 'TimelineTimelineItem',
+				'itemContent': {'itemType': 'TimelineTweet', '__typename': 'TimelineTweet', 'tweet_results': {'result': result}, 'tweetDisplayType': 'Tweet'},
+			},
+		})
+	entries.append({'entryId': 'cursor-bottom-0', 'sortIndex': '0', 'content': {'entryType': 'TimelineTimelineCursor', 'value': 'DAADDAABCgABF', 'cursorType': 'Bottom'}})
+	return json.dumps({'instructions': [{'type': 'TimelineClearCache'}, {'type': 'TimelineAddEntries', 'entries': entries}]}, ensure_ascii = False)
+
+
+def make_telegram(rng, n):
+	posts = []
+	for i in range(n):
+		postId = 10000 + n - i
+		url = f'https://t.me/benchmark/{postId}'
+		parts = [f'<div class="tgme_widget_message_wrap js-widget_message_wrap"><div class="tgme_widget_message text_not_supported_wrap js-widget_message" data-post="benchmark/{postId}" data-view="x">']
+		parts.append('<div class="tgme_widget_message_bubble">')
+		parts.append('<div class="tgme_widget_message_author accent_color"><a class="tgme_widget_message_owner_name" href="https://t.me/benchmark"><span dir="auto">Benchmark channel</span></a></div>')
+		if i % 5 == 0:
+			parts.append(f'<a class="tgme_widget_message_photo_wrap" href="{url}" style="width:800px;background-image:url(\'https://cdn4.telesco.pe/file/{postId}.jpg\')"></a>')
+		if i % 6 == 0:
+			parts.append(f'<a class="tgme_widget_message_reply" href="https://t.me/benchmark/{postId - 3}"><div class="tgme_widget_message_author accent_color"><span class="tgme_widget_message_author_name" dir="auto">Benchmark channel</span></div><div class="tgme_widget_message_metatext js-message_reply_text" dir="auto">{html.escape(text(rng, 8))}</div></a>')
+		if i % 12 == 1:
+			parts.append(f'<div class="tgme_widget_message_user"><a href="https://t.me/member{i}"><i class="tgme_widget_message_user_photo"></i></a></div>')
+		if i % 8 == 1:
+			parts.append(f'<div class="tgme_widget_message_forwarded_from accent_color">Forwarded from <a class="tgme_widget_message_forwarded_from_name" href="https://t.me/other/{i}"><span dir="auto">Other channel</span></a></div>')
+		if i % 9 == 1:
+			parts.append(f'<a class="tgme_widget_message_video_player" href="{url}"><i class="tgme_widget_message_video_thumb" style="background-image:url(\'https://cdn4.telesco.pe/file/v{i}.jpg\')"></i><div class="tgme_widget_message_video_wrap"><video class="tgme_widget_message_video js-message_video" src="https://cdn4.telesco.pe/file/v{i}.mp4"></video></div></a>')
+		if i % 11 == 1:
+			parts.append(f'<a class="tgme_widget_message_sticker_wrap" href="{url}"><i class="tgme_widget_message_sticker js-sticker_image" data-webp="https://cdn4.telesco.pe/file/s{i}.webp"></i></a>')
+		if i % 10 == 1:
+			parts.append(f'<div class="tgme_widget_message_poll"><div class="tgme_widget_message_poll_question">{html.escape(text(rng, 5))}?</div><a class="tgme_widget_message_poll_options" href="{url}">')
+			for option in ('Yes', 'No', 'Maybe'):
+				parts.append(f'<div class="tgme_widget_message_poll_option"><div class="tgme_widget_message_poll_option_percent">{rng.randrange(100)}%</div><div class="tgme_widget_message_poll_option_text">{option}</div></div>')
+			parts.append(f'<div class="tgme_widget_message_poll_votes">{rng.randrange(1000)} votes</div></a></div>')
+		elif i % 13 == 1:
+			parts.append(f'<div class="message_media_not_supported_wrap"><div class="message_media_not_supported"><div class="message_media_not_supported_label">Please open Telegram to view this post</div><a href="{url}?single" class="message_media_view_in_telegram">VIEW IN TELEGRAM</a></div></div>')
+		else:
+			parts.append(f'<div class="tgme_widget_message_text js-message_text" dir="auto">{html.escape(text(rng, rng.randrange(10, 60)))}')
+			if i % 3 == 0:
+				parts.append(f' <a href="https://example.org/article/{i}" target="_blank" rel="noopener">https://example.org/article/{i}</a>')
+			parts.append('<br/>&nbsp;<b>bold</b> <i class="emoji" style="background-image:url(\'//telegram.org/img/emoji/40/F09F918D.png\')"><b>👍</b></i></div>')
+		if i % 4 == 0:
+			parts.append(f'<a class="tgme_widget_message_link_preview" href="https://example.org/article/{i}"><i class="link_preview_right_image" style="background-image:url(\'https://cdn4.telesco.pe/file/p{i}.jpg\')"></i><div class="link_preview_site_name accent_color" dir="auto">Example</div><div class="link_preview_title" dir="auto">{html.escape(text(rng, 6))}</div><div class="link_preview_description" dir="auto">{html.escape(text(rng, 20))}</div></a>')
+		parts.append(f'<div class="tgme_widget_message_footer compact js-message_footer"><div class="tgme_widget_message_info short js-message_info"><span class="tgme_widget_message_views">{rng.randrange(1, 999)}.{rng.randrange(10)}K</span><span class="copyonly"> · </span><span class="tgme_widget_message_meta"><a class="tgme_widget_message_date" href="{url}"><time datetime="{date(i).isoformat()}" class="time">{date(i):%H:%M}</time></a></span></div></div>')
+		parts.append('</div></div></div>')
+		posts.append(''.join(parts))
+	posts.reverse() # Oldest first as on the website
+	return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark channel – Telegram</title></head><body><section class="tgme_channel_history js-message_history"><div class="tgme_widget_message_centered js-messages_more_wrap"><a href="/s/benchmark?before={10000 - n}" class="tme_messages_more js-messages_more" data-before="{10000 - n}"></a></div>{"".join(posts)}</section></body></html>'
+
+
+def make_mastodon(rng, n):
+	entries = []
+	for i in range(n):
+		tootId = 109000000000000000 + n - i
+		account = f'user{i % 20}'
+		url = f'https://mastodon.example/@{account}/{tootId}'
+		parts = ['<div class="entry h-entry">']
+		if i % 9 == 0:
+			parts.append('<div class="status__prepend"><div class="status__prepend-icon-wrapper"><i class="status__prepend-icon fa fa-fw fa-retweet"></i></div><span><a class="status__display-name muted" href="https://mastodon.example/@booster"><bdi><strong class="emojify">Booster</strong></bdi></a> boosted</span></div>')
+		parts.append('<div class="status">')
+		parts.append(f'<div class="status__info"><a class="status__relative-time u-url u-uid" href="{url}"><data class="dt-published" value="{date(i):%Y-%m-%dT%H:%M:%S+00:00}"></data><time class="time-ago" datetime="{date(i):%Y-%m-%dT%H:%M:%SZ}">{date(i):%b %d, %Y}</time></a>')
+		displayName = f'User {i % 20}'
+		if i % 4 == 0:
+			displayName += ' <img draggable="false" class="emojione custom-emoji" alt=":blobcat:" title=":blobcat:" src="https://mastodon.example/emoji/blobcat.png" data-original="https://mastodon.example/emoji/blobcat.png" data-static="https://mastodon.example/emoji/blobcat_static.png">'
+		parts.append(f'<a class="status__display-name u-url" href="https://mastodon.example/@{account}"><div class="status__avatar"><div><img alt="" class="u-photo account__avatar" src="https://mastodon.example/avatars/{i % 20}.png" width="48" height="48"></div></div><span class="display-name"><bdi><strong class="display-name__html p-name emojify">{displayName}</strong></bdi> <span>@{account}@mastodon.example</span></span></a></div>')
+		parts.append(f'<div class="status__content emojify"><div class="e-content"><p>{html.escape(text(rng, rng.randrange(5, 40)))}</p>')
+		if i % 3 == 0:
+			parts.append(f'<p><a href="https://example.org/{i}" rel="nofollow noopener noreferrer" target="_blank">example.org/{i}</a> <a href="https://mastodon.example/tags/snscrape" class="mention hashtag" rel="tag">#<span>snscrape</span></a></p>')
+		if i % 5 == 0:
+			parts.append(f'<p><span class="h-card"><a href="https://other.example/@friend{i}" class="u-url mention">@<span>friend{i}</span></a></span> {html.escape(text(rng, 5))}</p>')
+		parts.append('</div></div>')
+		if i % 6 == 0:
+			parts.append(f'<div class="attachment-list"><div class="attachment-list__icon"><i class="fa fa-link"></i></div><ul class="attachment-list__list"><li><a href="https://mastodon.example/media/{i}.png" rel="noopener">{i}.png</a></li></ul></div>')
+		parts.append('</div></div>')
+		entries.append(''.join(parts))
+	return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark</title></head><body><div class="activity-stream">{"".join(entries)}<div class="entry"><a class="load-more load-gap" href="https://mastodon.example/@user0/with_replies?max_id={109000000000000000}">Show more</a></div></div></body></html>'
+
+
+def mastodon_account(i, domain = 'mastodon.example'):
+	displayName = f'User {i % 20}'
+	emojis = []
+	if i % 4 == 0:
+		displayName += ' :blobcat:'
+		emojis.append({'shortcode': 'blobcat', 'url': 'https://mastodon.example/emoji/blobcat.png', 'static_url': 'https://mastodon.example/emoji/blobcat_static.png', 'visible_in_picker': True})
+	return {
+		'id': str(100000 + i % 20),
+		'username': f'user{i % 20}',
+		'acct': f'user{i % 20}' if domain == 'mastodon.example' else f'user{i % 20}@{domain}',
+		'display_name': displayName,
+		'url': f'https://{domain}/@user{i % 20}',
+		'avatar': f'https://mastodon.example/avatars/{i % 20}.png',
+		'avatar_static': f'https://mastodon.example/avatars/{i % 20}.png',
+		'emojis': emojis,
+	}
+
+
+def make_mastodon_api(rng, n):
+	statuses = []
+	for i in range(n):
+		tootId = str(109000000000000000 + n - i)
+		account = mastodon_account(i)
+		content = [f'<p>{html.escape(text(rng, rng.randrange(5, 40)))}</p>']
+		mentions = []
+		tags = []
+		if i % 3 == 0:
+			content.append(f'<p><a href="https://example.org/{i}" rel="nofollow noopener noreferrer" target="_blank">example.org/{i}</a> <a href="https://mastodon.example/tags/snscrape" class="mention hashtag" rel="tag">#<span>snscrape</span></a></p>')
+			tags.append({'name': 'snscrape', 'url': 'https://mastodon.example/tags/snscrape'})
+		if i % 5 == 0:
+			content.append(f'<p><span class="h-card"><a href="https://other.example/@friend{i}" class="u-url mention">@<span>friend{i}</span></a></span> {html.escape(text(rng, 5))}</p>')
+			mentions.append({'id': str(200000 + i), 'username': f'friend{i}', 'acct': f'friend{i}@other.example', 'url': f'https://other.example/@friend{i}'})
+		status = {
+			'id': tootId,
+			'created_at': f'{date(i):%Y-%m-%dT%H:%M:%S}.000Z',
+			'in_reply_to_id': None,
+			'sensitive': False,
+			'spoiler_text': '',
+			'visibility': 'public',
+			'uri': f'https://mastodon.example/users/{account["username"]}/statuses/{tootId}',
+			'url': f'https://mastodon.example/@{account["username"]}/{tootId}',
+			'replies_count': i % 7,
+			'reblogs_count': i % 11,
+			'favourites_count': i % 13,
+			'content': ''.join(content),
+			'reblog': None,
+			'account': account,
+			'media_attachments': [{'id': str(300000 + i), 'type': 'image', 'url': f'https://mastodon.example/media/{i}.png', 'preview_url': f'https://mastodon.example/media/small/{i}.png', 'description': None}] if i % 6 == 0 else [],
+			'mentions': mentions,
+			'tags': tags,
+			'emojis': [],
+			'poll': None,
+		}
+		if i % 10 == 7:
+			status['poll'] = {'id': str(400000 + i), 'expires_at': f'{date(i - 1440):%Y-%m-%dT%H:%M:%S}.000Z', 'expired': False, 'multiple': i % 20 == 7, 'votes_count': 3 * i, 'voters_count': 2 * i, 'options': [{'title': 'Yes', 'votes_count': 2 * i}, {'title': 'No', 'votes_count': i}]}
+		if i % 9 == 0:
+			booster = mastodon_account(i)
+			booster.update(id = '99999', username = 'booster', acct = 'booster', display_name = 'Booster', url = 'https://mastodon.example/@booster', emojis = [])
+			status = {'id': str(110000000000000000 + i), 'created_at': status['created_at'], 'url': None, 'uri': f'https://mastodon.example/users/booster/statuses/{110000000000000000 + i}/activity', 'content': '', 'spoiler_text': '', 'reblog': status, 'account': booster, 'media_attachments': [], 'mentions': [], 'tags': [], 'emojis': [], 'poll': None}
+		statuses.append(status)
+	return json.dumps(statuses, ensure_ascii = False)
+
+
+def make_vkontakte(rng, n):
+	posts = []
+	for i in range(n):
+		postId = 5000 + n - i
+		parts = [f'<div id="post-1_{postId}" class="_post post page_block all own post--with-likes deep_active" data-post-id="-1_{postId}">']
+		parts.append('<div class="_post_content"><div class="post_header"><div class="post_header_info">')
+		parts.append(f'<div class="post_date"><a class="post_link" href="/wall-1_{postId}"><span class="rel_date" time="{int(date(i).timestamp())}">{date(i):%d %b %Y}</span></a></div>')
+		parts.append('</div></div><div class="post_content"><div class="post_info"><div class="wall_text"><div class="wall_post_cont _wall_post_cont">')
+		parts.append(f'<div class="wall_post_text">{html.escape(text(rng, rng.randrange(10, 60)))}')
+		if i % 3 == 0:
+			parts.append(f' <a href="/away.php?to={urllib.parse.quote(f"https://example.org/{i}", safe = "")}&amp;cc_key=" target="_blank">example.org/{i}</a>')
+		parts.append('</div>')
+		if i % 4 == 0:
+			temp = {'base': 'https://sun9-1.userapi.com/', 'x': f'impg/{i}x', 'x_': [f'impg/{i}x', 604, 403], 'y': f'impg/{i}y', 'y_': [f'impg/{i}y', 807, 538]}
+			onclick = html.escape(f"return showPhoto('-1_{i}', 'wall-1_{postId}', {json.dumps({'temp': temp})}, event)")
+			parts.append(f'<div class="page_post_sized_thumbs clear_fix"><a aria-label="photo" onclick="{onclick}" style="width: 510px; height: 340px;" class="page_post_thumb_wrap image_cover page_post_thumb_last_column page_post_thumb_last_row" href="/photo-1_{i}"></a></div>')
+		elif i % 7 == 0:
+			parts.append(f'<div class="page_post_sized_thumbs clear_fix"><a href="/video-1_{i}" data-video="-1_{i}" data-list="abcdef" data-duration="{60 + i}" class="page_post_thumb_wrap image_cover page_post_thumb_video" style="width: 510px; height: 287px;background-image: url(https://sun9-1.userapi.com/video/{i}.jpg);"></a></div>')
+		parts.append('</div></div></div></div></div></div>')
+		posts.append(''.join(parts))
+	return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark</title></head><body><div id="page_wall_posts" class="page_wall_posts">{"".join(posts)}</div></body></html>'
+
+
+def make_facebook(rng, n):
+	entries = []
+	for i in range(n):
+		postId = 10150000000000000 + n - i
+		parts = ['<div class="_4-u2 _4-u8"><div class="_5pcr userContentWrapper"><div class="_1dwg _1w_m _q7o">']
+		parts.append(f'<div class="_5va1"><span class="fsm fwn fcg"><a href="/benchmark/posts/{postId}?__xts__%5B0%5D=68.ARB&amp;__tn__=-R" class="_5pcq"><abbr data-utime="{int(date(i).timestamp())}" class="_5ptz"><span class="timestampContent">{date(i):%d %B}</span></abbr></a></span></div>')
+		parts.append(f'<div class="_5pbx userContent _3576" data-ft="{{}}"><p>{html.escape(text(rng, rng.randrange(10, 60)))}</p>')
+		if i % 3 == 0:
+			parts.append(f'<p><a href="https://l.facebook.com/l.php?u={urllib.parse.quote(f"https://example.org/{i}", safe = "")}&amp;h=AT0" target="_blank" rel="nofollow">example.org/{i}</a></p>')
+		parts.append('</div></div></div></div>')
+		entries.append(''.join(parts))
+	return f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark</title></head><body><div id="pagelet_timeline_main_column">{"".join(entries)}</div></body></html>'
+
+
+def make_reddit(rng, n):
+	data = []
+	for i in range(n):
+		created = int(date(i).timestamp())
+		itemId = format(100000000 - i, 'x')
+		if i % 3 == 0:
+			d = {'id': itemId, 'title': text(rng, 8), 'author': f'user{i % 20}', 'subreddit': 'benchmark', 'created_utc': created, 'permalink': f'/r/benchmark/comments/{itemId}/title/'}
+			if i % 2 == 0:
+				d['selftext'] = text(rng, rng.randrange(10, 80))
+				d['url'] = f'https://www.reddit.com/r/benchmark/comments/{itemId}/title/'
+			else:
+				d['selftext'] = ''
+				d['url'] = f'https://example.org/{i}'
+		else:
+			d = {'id': itemId, 'body': text(rng, rng.randrange(5, 60)), 'author': f'user{i % 20}', 'subreddit': 'benchmark', 'created_utc': created, 'link_id': 't3_abcdef', 'parent_id': 't3_abcdef'}
+			if i % 5 != 0:
+				d['permalink'] = f'/r/benchmark/comments/abcdef/title/{itemId}/'
+		data.append(d)
+	return json.dumps({'data': data}, ensure_ascii = False)
+
+
+def make_instagram(rng, n):
+	edges = []
+	for i in range(n):
+		captions = [{'node': {'text': text(rng, rng.randrange(3, 30))}}] if i % 8 else []
+		edges.append({'node': {
+			'__typename': 'GraphImage',
+			'id': str(2000000000000000000 + i),
+			'shortcode': f'C{i:09d}',
+			'owner': {'id': '1000', 'username': 'benchmark'},
+			'taken_at_timestamp': int(date(i).timestamp()),
+			'edge_media_to_caption': {'edges': captions},
+			'thumbnail_src': f'https://scontent.cdninstagram.com/v/t51/{i}_n.jpg?stp=c0.180.1440.1440a_dst-jpg_e35_s640x640',
+			'display_url': f'https://scontent.cdninstagram.com/v/t51/{i}_n.jpg',
+			'edge_media_preview_like': {'count': rng.randrange(10000)},
+			'edge_media_to_comment': {'count': rng.randrange(100)},
+			'comments_disabled': i % 10 == 0,
+			'is_video': i % 6 == 0,
+		}})
+	return json.dumps({'user': {'edge_owner_to_timeline_media': {'count': n, 'page_info': {'has_next_page': True, 'end_cursor': 'QVFD'}, 'edges': edges}}}, ensure_ascii = False)
+
+
+def weibo_user(i):
+	return {'id': 5000000000 + i, 'screen_name': f'用户{i}', 'verified': i % 4 == 0, 'verified_reason': '认证' if i % 4 == 0 else None, 'description': text(random.Random(i), 10), 'statuses_count': 1000 + i, 'followers_count': 100 * i, 'follow_count': 10 * i, 'avatar_hd': f'https://tvax1.sinaimg.cn/crop/{i}.jpg'}
+
+
+def weibo_mblog(rng, i):
+	mblog = {
+		'id': str(4800000000000000 + i),
+		'bid': f'M{i:08d}',
+		'created_at': f'{date(i):%a %b %d %H:%M:%S +0800 %Y}',
+		'user': weibo_user(i % 20),
+		'text': f'{html.escape(text(rng, rng.randrange(5, 40)))}<a href="/n/user{i}">@user{i}</a> <span class="surl-text">#话题#</span>',
+		'reposts_count': rng.randrange(100),
+		'comments_count': rng.randrange(100),
+		'attitudes_count': rng.randrange(1000),
+		'pic_num': 0,
+	}
+	if i % 2 == 0:
+		mblog['raw_text'] = text(rng, rng.randrange(5, 40))
+	if i % 5 == 0:
+		mblog['pic_num'] = 2
+		mblog['pics'] = [{'pid': f'p{i}{j}', 'url': f'https://wx1.sinaimg.cn/orj360/{i}{j}.jpg', 'large': {'url': f'https://wx1.sinaimg.cn/large/{i}{j}.jpg'}} for j in range(2)]
+	elif i % 7 == 0:
+		mblog['page_info'] = {'type': 'video', 'urls': {'mp4_720p_mp4': f'https://f.video.weibocdn.com/{i}_720.mp4', 'mp4_ld_mp4': f'https://f.video.weibocdn.com/{i}_ld.mp4'}}
+	elif i % 9 == 0:
+		mblog['page_info'] = {'type': 'webpage', 'page_url': f'https://example.org/{i}'}
+	return mblog
+
+
+def make_weibo(rng, n):
+	cards = []
+	for i in range(n):
+		mblog = weibo_mblog(rng, i)
+		if i % 6 == 0:
+			mblog['retweeted_status'] = weibo_mblog(rng, n + i)
+		cards.append({'card_type': 9, 'itemid': '', 'mblog': mblog})
+	return json.dumps({'ok': 1, 'data': {'cardlistInfo': {'since_id': 4800000000000000}, 'cards': cards}}, ensure_ascii = False)
+
+
+FIXTURES = {
+	'twitter.json': make_twitter,
+	'telegram.html': make_telegram,
+	'mastodon.html': make_mastodon,
+	'mastodon.json': make_mastodon_api,
+	'vkontakte.html': make_vkontakte,
+	'facebook.html': make_facebook,
+	'reddit.json': make_reddit,
+	'instagram.json': make_instagram,
+	'weibo.json': make_weibo,
+}
+
+
+def main():
+	n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+	os.makedirs(FIXTURES_DIR, exist_ok = True)
+	for filename, make in FIXTURES.items():
+		with open(os.path.join(FIXTURES_DIR, filename), 'w', encoding = 'utf-8') as fp:
+			fp.write(make(random.Random(filename), n))
+			fp.write('\n')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+'''Benchmark the conversion of pages and API responses to items for each module, and the JSON serialisation of items
+
+The benchmarks run offline against the synthetic fixtures in benchmarks/fixtures (see make_fixtures.py).
+Each benchmark covers the path from the raw response body to the items, i.e. JSON decoding or HTML parsing with BeautifulSoup followed by the module's conversion method.
+The mastodon and mastodon-api benchmarks cover the same toots, once as the HTML profile page and once as the JSON API response.
+A fresh scraper is used for every run so that per-scraper caches (e.g. the Twitter user cache) do not carry over between runs.
+The json benchmark serialises the items produced by all module benchmarks with Item.json.
+
+The results are printed (or written to --output) as JSON: items per run, number of runs, total time, items per second, and the peak memory allocated during one run as measured by tracemalloc.
+With --compare, the items per second are compared against an earlier result file on stderr.
+Benchmarks of alternative parser implementations (e.g. telegram-lxml) also check that the items are identical to those of the default implementation; the exit status is 1 if they are not.
+
+Usage: python3 benchmarks/parsers.py [--min-time SECONDS] [--output FILE] [--compare FILE] [BENCHMARK ...]
+'''
+
+import argparse
+import bs4
+import datetime
+import gc
+import json
+import os
+import platform
+import snscrape.base
+import snscrape.version
+import sys
+import time
+import tracemalloc
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BENCHMARKS = {}
+PARITY = {'telegram-lxml': 'telegram'} # Alternative implementations and the benchmark whose items they must reproduce exactly
+
+
+def benchmark(name, fixture):
+	'''Register a benchmark
+
+	The decorated function is called with the fixture contents before each run and returns the function to be timed, which returns the list of items.'''
+
+	def decorator(f):
+		BENCHMARKS[name] = (fixture, f)
+		return f
+	return decorator
+
+
+@benchmark('twitter', 'twitter.json')
+def twitter(payload):
+	import snscrape.modules.twitter
+	scraper = snscrape.modules.twitter.TwitterSearchScraper('benchmark')
+	def run():
+		obj = snscrape.base._json_loads(payload)
+		return list(scraper._graphql_timeline_instructions_to_tweets(obj['instructions']))
+	return run
+
+
+@benchmark('telegram', 'telegram.html')
+def telegram(payload):
+	import snscrape.modules.telegram
+	scraper = snscrape.modules.telegram.TelegramChannelScraper('benchmark')
+	def run():
+		soup = bs4.BeautifulSoup(payload, 'lxml')
+		return list(scraper._soup_to_items(soup, 'https://t.me/s/benchmark'))
+	return run
+
+
+@benchmark('telegram-lxml', 'telegram.html')
+def telegram_lxml(payload):
+	import lxml.html
+	import snscrape.modules.telegram
+	scraper = snscrape.modules.telegram.TelegramChannelScraper('benchmark', parser = 'lxml')
+	def run():
+		root = lxml.html.fromstring(payload)
+		return list(scraper._lxml_to_items(root, 'https://t.me/s/benchmark'))
+	return run
+
+
+@benchmark('mastodon', 'mastodon.html')
+def mastodon(payload):
+	import snscrape.modules.mastodon
+	scraper = snscrape.modules.mastodon.MastodonProfileScraper('@benchmark@mastodon.example')
+	def run():
+		soup = bs4.BeautifulSoup(payload, 'lxml')
+		return list(scraper._entries_to_items(soup.find('div', class_ = 'activity-stream').find_all('div', class_ = 'entry'), 'https://mastodon.example/@benchmark/with_replies'))
+	return run
+
+
+@benchmark('mastodon-api', 'mastodon.json')
+def mastodon_api(payload):
+	import snscrape.modules.mastodon
+	scraper = snscrape.modules.mastodon.MastodonProfileScraper('@benchmark@mastodon.example', api = True)
+	def run():
+		statuses = snscrape.base._json_loads(payload)
+		return [scraper._api_status_to_item(status, 'mastodon.example') for status in statuses]
+	return run
+
+
+@benchmark('vkontakte', 'vkontakte.html')
+def vkontakte(payload):
+	import snscrape.modules.vkontakte
+	scraper = snscrape.modules.vkontakte.VKontakteUserScraper('benchmark')
+	def run():
+		soup = bs4.BeautifulSoup(payload, 'lxml')
+		return list(scraper._soup_to_items(soup))
+	return run
+
+
+@benchmark('facebook', 'facebook.html')
+def facebook(payload):
+	import snscrape.modules.facebook
+	scraper = snscrape.modules.facebook.FacebookUserScraper('benchmark')
+	def run():
+		soup = bs4.BeautifulSoup(payload, 'lxml')
+		return list(scraper._soup_to_items(soup, 'https://www.facebook.com/benchmark/', 'user'))
+	return run
+
+
+@benchmark('reddit', 'reddit.json')
+def reddit(payload):
+	import snscrape.modules.reddit
+	scraper = snscrape.modules.reddit.RedditSearchScraper('benchmark')
+	def run():
+		obj = snscrape.base._json_loads(payload)
+		return [scraper._api_obj_to_item(d) for d in obj['data']]
+	return run
+
+
+@benchmark('instagram', 'instagram.json')
+def instagram(payload):
+	import snscrape.modules.instagram
+	scraper = snscrape.modules.instagram.InstagramUserScraper('benchmark')
+	def run():
+		obj = snscrape.base._json_loads(payload)
+		return list(scraper._response_to_items(obj))
+	return run
+
+
+@benchmark('weibo', 'weibo.json')
+def weibo(payload):
+	import snscrape.modules.weibo
+	scraper = snscrape.modules.weibo.WeiboUserScraper('benchmark')
+	def run():
+		obj = snscrape.base._json_loads(payload)
+		return [scraper._mblog_to_item(card['mblog']) for card in obj['data']['cards'] if card['card_type'] == 9]
+	return run
+
+
+def load_fixture(filename):
+	with open(os.path.join(FIXTURES_DIR, filename), 'r', encoding = 'utf-8') as fp:
+		return fp.read()
+
+
+def measure(setup, minTime):
+	'''Time runs of setup() until at least minTime seconds and three runs have been spent, then measure the peak memory of one more run'''
+
+	runs = 0
+	elapsed = 0.0
+	items = 0
+	while elapsed < minTime or runs < 3:
+		run = setup()
+		gc.collect()
+		start = time.perf_counter()
+		out = run()
+		elapsed += time.perf_counter() - start
+		runs += 1
+		items += len(out)
+		del out
+	run = setup()
+	gc.collect()
+	tracemalloc.start()
+	out = run()
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return {'items': len(out), 'runs': runs, 'seconds': round(elapsed, 6), 'itemsPerSecond': round(items / elapsed, 1), 'peakMemory': peak}
+
+
+def check_parity(name, reference):
+	'''Check that the benchmark produces the same items as the reference benchmark on the same fixture'''
+
+	items = [BENCHMARKS[n][1](load_fixture(BENCHMARKS[n][0]))() for n in (reference, name)]
+	if items[0] != items[1]:
+		for a, b in zip(*items):
+			if a != b:
+				print(f'{name} differs from {reference}:\n{a!r}\n{b!r}', file = sys.stderr)
+				break
+		else:
+			print(f'{name} differs from {reference} in the number of items: {len(items[0])} vs {len(items[1])}', file = sys.stderr)
+		return False
+	return True
+
+
+def json_setup(names):
+	items = []
+	for name in names:
+		fixture, setup = BENCHMARKS[name]
+		items.extend(setup(load_fixture(fixture))())
+	return lambda: lambda: [item.json() for item in items]
+
+
+def compare(results, baseline):
+	for name, result in results['benchmarks'].items():
+		if (old := baseline.get('benchmarks', {}).get(name)) is None:
+			print(f'{name:>13}: {result["itemsPerSecond"]:12.1f} items/s (new)', file = sys.stderr)
+			continue
+		change = result['itemsPerSecond'] / old['itemsPerSecond'] - 1
+		print(f'{name:>13}: {result["itemsPerSecond"]:12.1f} items/s ({change:+.1%}), peak memory {result["peakMemory"] / 2**10:.0f} KiB (was {old["peakMemory"] / 2**10:.0f} KiB)', file = sys.stderr)
+
+
+def main():
+	parser = argparse.ArgumentParser(description = 'Benchmark the parsers on the synthetic fixtures')
+	parser.add_argument('--min-time', dest = 'minTime', type = float, default = 1.0, metavar = 'SECONDS', help = 'Minimum total run time per benchmark')
+	parser.add_argument('--output', metavar = 'FILE', help = 'Write the results to FILE instead of stdout')
+	parser.add_argument('--compare', metavar = 'FILE', help = 'Compare the results against an earlier result file')
+	parser.add_argument('benchmarks', nargs = '*', metavar = 'BENCHMARK', choices = [[]] + list(BENCHMARKS) + ['json'], help = f'Benchmarks to run (default: all); one or more of {", ".join(list(BENCHMARKS) + ["json"])}')
+	args = parser.parse_args()
+
+	names = args.benchmarks or list(BENCHMARKS) + ['json']
+	results = {
+		'snscrape': snscrape.version.__version__,
+		'python': platform.python_version(),
+		'implementation': platform.python_implementation(),
+		'platform': platform.platform(),
+		'orjson': snscrape.base.orjson is not None,
+		'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec = 'seconds'),
+		'minTime': args.minTime,
+		'benchmarks': {},
+	}
+	for name in names:
+		if name == 'json':
+			setup = json_setup([n for n in BENCHMARKS if n not in PARITY])
+		else:
+			fixture, setupFunc = BENCHMARKS[name]
+			payload = load_fixture(fixture)
+			setup = lambda setupFunc = setupFunc, payload = payload: setupFunc(payload)
+		results['benchmarks'][name] = measure(setup, args.minTime)
+		if name in PARITY:
+			results['benchmarks'][name]['parity'] = check_parity(name, PARITY[name])
+
+	out = json.dumps(results, indent = '\t')
+	if args.output:
+		with open(args.output, 'w') as fp:
+			fp.write(out)
+			fp.write('\n')
+	else:
+		print(out)
+	if args.compare:
+		with open(args.compare, 'r') as fp:
+			compare(results, json.load(fp))
+	if not all(result.get('parity', True) for result in results['benchmarks'].values()):
+		sys.exit(1)
+
+
+if __name__ == '__main__':
+	main()
@@ -1,19 +1,26 @@
 import argparse
 import collections
+import concurrent.futures
 import contextlib
+import copy
 import dataclasses
 import datetime
 import importlib.metadata
 import inspect
+import json
 import logging
 import os
+import re
 import requests
 # Imported in parse_args() after setting up the logger:
 #import snscrape.base
 #import snscrape.modules
+#import snscrape.utils
 #import snscrape.version
+import shlex
 import sys
 import tempfile
+import threading
 
 
 ## Logging
@@ -205,6 +212,20 @@ def parse_format(arg):
 	return out
 
 
+def parse_rate_limit(arg):
+	parts = arg.split(':')
+	if len(parts) not in (2, 3) or not parts[0]:
+		raise argparse.ArgumentTypeError(f'Cannot parse {arg!r} as HOST:RATE[:BURST]')
+	try:
+		rate = float(parts[1])
+		burst = int(parts[2]) if len(parts) == 3 else 1
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'Cannot parse {arg!r} as HOST:RATE[:BURST]')
+	if rate <= 0 or burst < 1:
+		raise argparse.ArgumentTypeError(f'Invalid rate limit {arg!r}: RATE must be positive and BURST at least 1')
+	return parts[0], rate, burst
+
+
 class CitationAction(argparse.Action):
 	def __init__(self, option_strings, dest = argparse.SUPPRESS, *args, default = argparse.SUPPRESS, **kwargs):
 		super().__init__(option_strings, dest, *args, **kwargs)
@@ -231,6 +252,7 @@ class CitationAction(argparse.Action):
 def parse_args():
 	import snscrape.base
 	import snscrape.modules
+	import snscrape.utils
 	import snscrape.version
 
 	parser = argparse.ArgumentParser(formatter_class = argparse.ArgumentDefaultsHelpFormatter)
@@ -239,36 +261,136 @@ def parse_args():
 	parser.add_argument('-v', '--verbose', '--verbosity', dest = 'verbosity', action = 'count', default = 0, help = 'Increase output verbosity')
 	parser.add_argument('--dump-locals', dest = 'dumpLocals', action = 'store_true', default = False, help = 'Dump local variables on serious log messages (warnings or higher)')
 	parser.add_argument('--retry', '--retries', dest = 'retries', type = int, default = 3, metavar = 'N',
-		help = 'When the connection fails or the server returns an unexpected response, retry up to N times with an exponential backoff')
+		help = 'When the connection fails or the server returns an unexpected response, retry up to N times with a jittered exponential backoff or after the wait requested by the server')
+	parser.add_argument('--retry-budget', dest = 'retryBudget', type = snscrape.utils.parse_nonnegative_int, default = None, metavar = 'N',
+		help = 'Retry at most N failed requests in total across all requests and scrapers')
+	parser.add_argument('--max-retry-wait', dest = 'maxRetryWait', type = float, default = 900.0, metavar = 'SECONDS',
+		help = 'Give up instead of retrying when the server requests a wait (Retry-After) longer than SECONDS')
 	parser.add_argument('-n', '--max-results', dest = 'maxResults', type = lambda x: int(x) if int(x) >= 0 else parser.error('--max-results N must be zero or positive'), metavar = 'N', help = 'Only return the first N results')
 	group = parser.add_mutually_exclusive_group(required = False)
 	group.add_argument('-f', '--format', dest = 'format', type = parse_format, default = None, help = 'Output format')
 	group.add_argument('--jsonl', dest = 'jsonl', action = 'store_true', default = False, help = 'Output JSONL')
 	group.add_argument('--jsonl-for-buggy-int-parser', dest = 'jsonlForBuggyIntParser', action = 'store_true', default = False, help = 'Output JSONL and insert extra string fields into objects for integers exceeding double precision limits')
+	group.add_argument('--output-format', dest = 'outputFormat', choices = ('parquet', 'arrow'), default = None, help = 'Output a columnar Parquet or Arrow IPC file; requires --output and pyarrow')
+	parser.add_argument('-o', '--output', dest = 'output', metavar = 'FILE', default = None, help = 'Write the output to FILE instead of stdout')
 	parser.add_argument('--with-entity', dest = 'withEntity', action = 'store_true', default = False, help = 'Include the entity (e.g. user, channel) as the first output item')
 	parser.add_argument('--since', type = parse_datetime_arg, metavar = 'DATETIME', help = 'Only return results newer than DATETIME')
 	parser.add_argument('--progress', action = 'store_true', default = False, help = 'Report progress on stderr')
+	parser.add_argument('--checkpoint', metavar = 'FILE', default = None, help = 'Store the pagination state in FILE and resume from it if it exists; only supported by some scrapers')
+	parser.add_argument('--rate-limit', dest = 'rateLimits', metavar = 'HOST:RATE[:BURST]', type = parse_rate_limit, action = 'append', default = [],
+		help = 'Limit the requests to HOST (or to each host if HOST is *) to RATE per second with bursts of up to BURST (default 1) requests, shared across all scrapers; can be given multiple times')
+	group = parser.add_mutually_exclusive_group(required = False)
+	group.add_argument('--record', metavar = 'FILE', default = None, help = 'Record all HTTP requests and responses to FILE (gzip-compressed JSONL)')
+	group.add_argument('--replay', metavar = 'FILE', default = None, help = 'Serve all HTTP requests from FILE recorded with --record instead of the network')
+	parser.add_argument('--checkpoint-interval', dest = 'checkpointInterval', metavar = 'N', type = snscrape.utils.parse_positive_int, default = 1, help = 'Write the checkpoint every N pages (and on exit)')
 
 	subparsers = parser.add_subparsers(dest = 'scraper', metavar = 'SCRAPER', title = 'scrapers', required = True)
-	classes = snscrape.base.Scraper.__subclasses__()
-	scrapers = {}
-	for cls in classes:
-		if cls.name is not None:
-			scrapers[cls.name] = cls
-		classes.extend(cls.__subclasses__())
-	for scraper, cls in sorted(scrapers.items()):
-		subparser = subparsers.add_parser(cls.name, help = '', formatter_class = argparse.ArgumentDefaultsHelpFormatter)
-		cls._cli_setup_parser(subparser)
-		subparser.set_defaults(cls = cls)
-
+	batchParser = subparsers.add_parser('batch', help = 'Run many scrapes from a list of targets', formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+	batchParser.add_argument('--workers', metavar = 'N', type = snscrape.utils.parse_positive_int, default = 4, help = 'Run up to N scrapes concurrently')
+	batchParser.add_argument('--output-dir', dest = 'outputDir', metavar = 'DIR', default = None, help = 'Write the output of each target to a separate file in DIR instead of combined output tagged with the target')
+	batchParser.add_argument('targets', metavar = 'FILE', help = 'File with one target per line (or - for stdin), each consisting of the scraper name, options, and arguments as on the command line')
+	batchParser.set_defaults(cls = None)
+
+	# The scraper subparsers are only populated for the selected scraper(s) to avoid importing all modules.
+	# They are created without a help option so that the preliminary parse_known_args call does not print an incomplete help; the option is added in setup_scraper_parser.
+	scraperParsers = {}
+	for name in sorted(snscrape.modules._SCRAPERS):
+		scraperParsers[name] = subparsers.add_parser(name, help = '', add_help = False, formatter_class = argparse.ArgumentDefaultsHelpFormatter)
+	setUp = set()
+
+	def setup_scraper_parser(argv, namespace = None):
+		preliminaryArgs, _ = parser.parse_known_args(argv, namespace = copy.copy(namespace))
+		name = preliminaryArgs.scraper
+		if name in scraperParsers and name not in setUp:
+			cls = snscrape.modules._get_scraper_class(name)
+			subparser = scraperParsers[name]
+			subparser.add_argument('-h', '--help', action = 'help', default = argparse.SUPPRESS, help = 'show this help message and exit')
+			cls._cli_setup_parser(subparser)
+			subparser.set_defaults(cls = cls)
+			setUp.add(name)
+
+	setup_scraper_parser(None)
 	args = parser.parse_args()
+	for host, rate, burst in args.rateLimits:
+		snscrape.base._rateLimiter.set_limit(host, rate, burst)
+	snscrape.base._retryPolicy = snscrape.base.RetryPolicy(maxRetryAfter = args.maxRetryWait, totalBudget = args.retryBudget)
+	args.archive = None
+	if args.record is not None or args.replay is not None:
+		try:
+			args.archive = snscrape.base.HTTPArchive(args.record or args.replay, 'record' if args.record is not None else 'replay')
+		except OSError as e:
+			parser.error(f'Could not open archive: {e!s}')
+	if args.scraper == 'batch':
+		if args.checkpoint is not None:
+			parser.error('--checkpoint cannot be used for a whole batch; specify it on the individual targets instead')
+		if args.outputFormat is not None and args.outputDir is None:
+			parser.error(f'--output-format {args.outputFormat} in batch mode requires --output-dir')
+		args.targets = _parse_batch_targets(parser, args, setup_scraper_parser)
+	_check_args(parser, args)
+
+	return args
+
+
+def _check_args(parser, args):
+	import snscrape.base
 
 	if not args.withEntity and args.maxResults == 0:
 		parser.error('--max-results 0 is only valid when used with --with-entity')
 	if args.jsonlForBuggyIntParser:
 		args.jsonl = True
-
-	return args
+	if args.checkpoint is not None:
+		if not args.cls._supportsCheckpoint:
+			parser.error(f'{args.scraper} does not support --checkpoint')
+		args.checkpoint = snscrape.base.Checkpoint(args.checkpoint, interval = args.checkpointInterval)
+		if args.checkpoint.resuming and args.outputFormat is not None:
+			parser.error(f'--output-format {args.outputFormat} cannot be used when resuming from a checkpoint since the file cannot be appended to')
+	if args.outputFormat is not None:
+		if args.output is None and getattr(args, 'outputDir', None) is None:
+			parser.error(f'--output-format {args.outputFormat} requires --output')
+		import snscrape._columnar
+		if snscrape._columnar.pyarrow is None:
+			parser.error(f'--output-format {args.outputFormat} requires pyarrow')
+
+
+_BATCH_ONLY_OPTIONS = (
+	('output', '--output'),
+	('outputFormat', '--output-format'),
+	('format', '--format'),
+	('jsonl', '--jsonl'),
+	('jsonlForBuggyIntParser', '--jsonl-for-buggy-int-parser'),
+	('rateLimits', '--rate-limit'),
+	('record', '--record'),
+	('replay', '--replay'),
+	('retryBudget', '--retry-budget'),
+	('maxRetryWait', '--max-retry-wait'),
+)
+
+
+def _parse_batch_targets(parser, args, setup_scraper_parser):
+	# Each target line is parsed like a command line on top of a copy of the batch's global options, so lines may also override global options such as --max-results.
+	# The output, rate limit, archive, and retry options of the batch invocation apply to all targets; setting them on a line is an error rather than silently ignored.
+	fp = sys.stdin if args.targets == '-' else open(args.targets, 'r')
+	with fp:
+		lines = [line.strip() for line in fp]
+	targets = []
+	for lineNumber, line in enumerate(lines, start = 1):
+		if not line or line.startswith('#'):
+			continue
+		try:
+			argv = shlex.split(line)
+			setup_scraper_parser(argv, namespace = args)
+			targetArgs = parser.parse_args(argv, namespace = copy.copy(args))
+			if targetArgs.scraper == 'batch':
+				parser.error('batch targets cannot be batches')
+			for dest, option in _BATCH_ONLY_OPTIONS:
+				if getattr(targetArgs, dest) != getattr(args, dest):
+					parser.error(f'{option} cannot be set on a batch target, only for the whole batch')
+			_check_args(parser, targetArgs)
+		except SystemExit:
+			print(f'Invalid target on line {lineNumber}: {line}', file = sys.stderr)
+			raise
+		targets.append((line, targetArgs))
+	return targets
 
 
 def setup_logging():
@@ -303,45 +425,181 @@ def configure_logging(verbosity, dumpLocals_):
 	rootLogger.addHandler(handler)
 
 
+class _PrintSink:
+	'''Prints items as text, with a format string, or as JSONL
+
+	If target is not None, each line is tagged with it: JSONL objects get a _target key, other lines are prefixed with the target and a tab.
+	'''
+
+	def __init__(self, args, path = None, *, fp = None, target = None, lock = None, append = False):
+		self._jsonl = args.jsonl
+		self._jsonlForBuggyIntParser = args.jsonlForBuggyIntParser
+		self._format = args.format
+		if fp is not None:
+			self._fp, self._ownsFp = fp, False
+		elif path is not None:
+			# When resuming from a checkpoint, the output of the interrupted run is kept.
+			self._fp, self._ownsFp = open(path, 'a' if append else 'w', encoding = 'utf-8'), True
+		else:
+			self._fp, self._ownsFp = sys.stdout, False
+		self._jsonTarget = json.dumps(target) if target is not None else None
+		self._target = target
+		self._lock = lock or contextlib.nullcontext()
+
+	def write(self, item, isEntity = False):
+		if self._jsonl:
+			line = item.json(forBuggyIntParser = self._jsonlForBuggyIntParser)
+			if self._target is not None:
+				line = f'{{"_target": {self._jsonTarget}, {line[1:]}'
+		else:
+			if self._format is not None and not isEntity:
+				line = self._format.format(item)
+			else:
+				line = str(item)
+			if self._target is not None:
+				line = f'{self._target}\t{line}'
+		with self._lock:
+			print(line, file = self._fp)
+
+	def close(self):
+		if self._ownsFp:
+			self._fp.close()
+
+
+class _ColumnarSink:
+	'''Writes items to a Parquet or Arrow IPC file'''
+
+	def __init__(self, args, path):
+		import snscrape._columnar
+		self._writer = snscrape._columnar.ColumnarWriter(path, args.outputFormat)
+
+	def write(self, item, isEntity = False):
+		self._writer.write(item)
+
+	def close(self):
+		self._writer.close()
+
+
+def _scrape(args, scraper, sink, label = None):
+	prefix = f'{label}: ' if label is not None else ''
+	if args.withEntity and (entity := scraper.entity):
+		sink.write(entity, isEntity = True)
+	if args.maxResults == 0:
+		logger.info(f'{prefix}Exiting after 0 results')
+		return
+	i = 0
+	for i, item in enumerate(scraper.get_items(), start = 1):
+		if item is None: break
+		if args.since is not None and item.date < args.since:
+			logger.info(f'{prefix}Exiting due to reaching older results than {args.since}')
+			break
+		sink.write(item)
+		if args.checkpoint is not None:
+			args.checkpoint.acknowledge()
+		if args.progress and i % 100 == 0:
+			print(f'{prefix}Scraping, {i} results so far', file = sys.stderr)
+		if args.maxResults and i >= args.maxResults:
+			logger.info(f'{prefix}Exiting after {i} results')
+			if args.progress:
+				print(f'{prefix}Stopped scraping after {i} results due to --max-results', file = sys.stderr)
+			break
+	else:
+		logger.info(f'{prefix}Done, found {i} results')
+		if args.progress:
+			print(f'{prefix}Finished, {i} results', file = sys.stderr)
+
+
+def _scrape_target(args, scraper, sink, label):
+	with contextlib.closing(sink), (args.checkpoint or contextlib.nullcontext()):
+		_scrape(args, scraper, sink, label = label)
+
+
+def _run_batch(args):
+	# Scrapers are constructed in the main thread and then run on a thread pool.
+	# Each target gets its own session since scrapers modify the cookies (e.g. Twitter's guest token and --auth cookies), but targets of the same module share the connection pool, so connections (and TLS sessions) are reused across targets.
+	# The Twitter scrapers also share the CLI guest token manager.
+	import snscrape.base
+
+	adapters = {}
+	if args.outputDir is not None:
+		os.makedirs(args.outputDir, exist_ok = True)
+		extension = {'parquet': 'parquet', 'arrow': 'arrow'}.get(args.outputFormat, 'jsonl' if args.jsonl else 'txt')
+		width = len(str(len(args.targets)))
+		combinedFp = None
+	else:
+		resuming = any(targetArgs.checkpoint is not None and targetArgs.checkpoint.resuming for _, targetArgs in args.targets)
+		combinedFp = open(args.output, 'a' if resuming else 'w', encoding = 'utf-8') if args.output is not None else sys.stdout
+	lock = threading.Lock()
+	failed = 0
+	with contextlib.ExitStack() as stack:
+		if args.archive is not None:
+			stack.enter_context(args.archive)
+		if combinedFp is not None and combinedFp is not sys.stdout:
+			stack.enter_context(combinedFp)
+		executor = stack.enter_context(concurrent.futures.ThreadPoolExecutor(max_workers = args.workers))
+		futures = {}
+		for i, (target, targetArgs) in enumerate(args.targets, start = 1):
+			if targetArgs.cls.__module__ not in adapters:
+				adapters[targetArgs.cls.__module__] = snscrape.base._HTTPSAdapter(pool_maxsize = args.workers)
+			targetArgs.session = snscrape.base._new_session(adapter = adapters[targetArgs.cls.__module__])
+			try:
+				scraper = targetArgs.cls._cli_from_args(targetArgs)
+			except Exception as e:
+				logger.error(f'Could not set up target {target!r}: {type(e).__module__}.{type(e).__name__}: {e!s}')
+				failed += 1
+				continue
+			if args.outputDir is not None:
+				slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', target)[:100]
+				path = os.path.join(args.outputDir, f'{i:0{width}d}-{slug}.{extension}')
+				if args.outputFormat is not None:
+					sink = _ColumnarSink(args, path)
+				else:
+					sink = _PrintSink(args, path, append = targetArgs.checkpoint is not None and targetArgs.checkpoint.resuming)
+			else:
+				sink = _PrintSink(args, fp = combinedFp, target = target, lock = lock)
+			futures[executor.submit(_scrape_target, targetArgs, scraper, sink, target)] = target
+		for future in concurrent.futures.as_completed(futures):
+			try:
+				future.result()
+			except BrokenPipeError:
+				raise
+			except Exception as e:
+				logger.error(f'Target {futures[future]!r} failed: {type(e).__module__}.{type(e).__name__}: {e!s}')
+				failed += 1
+	_log_retry_metrics()
+	if failed:
+		logger.error(f'{failed} of {len(args.targets)} targets failed')
+		sys.exit(1)
+
+
+def _log_retry_metrics():
+	import snscrape.base
+	metrics = snscrape.base._retryPolicy.metrics
+	if any(metrics['retries'].values()) or metrics['refusals']:
+		retries = ', '.join(f'{n} {errorClass}' for errorClass, n in metrics['retries'].items() if n)
+		logger.info(f'Retried {retries or "no"} errors, waited {metrics["sleepSeconds"]:.1f} seconds, gave up early on {metrics["refusals"]} errors')
+
+
 def main():
 	setup_logging()
 	args = parse_args()
 	configure_logging(args.verbosity, args.dumpLocals)
+
+	if args.scraper == 'batch':
+		try:
+			_run_batch(args)
+		except BrokenPipeError:
+			os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+			sys.exit(1)
+		return
+
 	scraper = args.cls._cli_from_args(args)
+	sink = _ColumnarSink(args, args.output) if args.outputFormat is not None else _PrintSink(args, args.output, append = args.checkpoint is not None and args.checkpoint.resuming)
 
-	i = 0
-	with _dump_locals_on_exception():
+	with _dump_locals_on_exception(), (args.archive or contextlib.nullcontext()), contextlib.closing(sink), (args.checkpoint or contextlib.nullcontext()):
 		try:
-			if args.withEntity and (entity := scraper.entity):
-				if args.jsonl:
-					print(entity.json(forBuggyIntParser = args.jsonlForBuggyIntParser))
-				else:
-					print(entity)
-			if args.maxResults == 0:
-				logger.info('Exiting after 0 results')
-				return
-			for i, item in enumerate(scraper.get_items(), start = 1):
-				if item is None: break
-				if args.since is not None and item.date < args.since:
-					logger.info(f'Exiting due to reaching older results than {args.since}')
-					break
-				if args.jsonl:
-					print(item.json(forBuggyIntParser = args.jsonlForBuggyIntParser))
-				elif args.format is not None:
-					print(args.format.format(item))
-				else:
-					print(item)
-				if args.progress and i % 100 == 0:
-					print(f'Scraping, {i} results so far', file = sys.stderr)
-				if args.maxResults and i >= args.maxResults:
-					logger.info(f'Exiting after {i} results')
-					if args.progress:
-						print(f'Stopped scraping after {i} results due to --max-results', file = sys.stderr)
-					break
-			else:
-				logger.info(f'Done, found {i} results')
-				if args.progress:
-					print(f'Finished, {i} results', file = sys.stderr)
+			_scrape(args, scraper, sink)
 		except BrokenPipeError:
 			os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
 			sys.exit(1)
+	_log_retry_metrics()
@@ -0,0 +1,281 @@
+'''Columnar output of items in the Apache Parquet or Arrow IPC file formats
+
+This requires pyarrow, which is an optional dependency.
+The Arrow schema is derived from the type annotations of the item dataclasses:
+* Nested dataclasses become struct columns, lists become list columns.
+* Classes with dataclass subclasses (e.g. twitter.Medium or twitter.Card) become a struct with a _type field and one struct field per subclass, only the matching one of which is set.
+* IntWithGranularity fields get an additional NAME.granularity column.
+* Properties become string columns.
+* Anything that has no natural Arrow representation (dicts, unions of unrelated types, recursive references) is stored as a JSON string.
+The type of the output file is determined by the most common item type in the first batch. Items of any other type (e.g. the entity) are stored only as a JSON string in the _json column.
+'''
+
+__all__ = ['ColumnarWriter']
+
+
+import collections
+import dataclasses
+import datetime
+import logging
+import snscrape.base
+import snscrape.version
+import sys
+import typing
+import warnings
+try:
+	import pyarrow
+	import pyarrow.ipc
+	import pyarrow.parquet
+except ImportError:
+	pyarrow = None
+
+
+_logger = logging.getLogger(__name__)
+_DEFAULT_BATCH_SIZE = 10000
+_NoneType = type(None)
+
+
+def _type_name(cls):
+	return f'{cls.__module__}.{cls.__name__}'
+
+
+def _json_string(value):
+	if value is None:
+		return None
+	return snscrape.base._json_dumps(snscrape.base._json_dataclass_to_dict(value))
+
+
+def _property_string(value):
+	if value is None or isinstance(value, str):
+		return value
+	return _json_string(value)
+
+
+def _unwrap(tp):
+	'''Strip Optional and NewType wrappers from an annotation'''
+
+	while True:
+		if hasattr(tp, '__supertype__'):
+			tp = tp.__supertype__
+		elif typing.get_origin(tp) is typing.Union and _NoneType in typing.get_args(tp):
+			args = tuple(a for a in typing.get_args(tp) if a is not _NoneType)
+			tp = args[0] if len(args) == 1 else typing.Union[args]
+		else:
+			return tp
+
+
+def _dataclass_subclasses(cls):
+	out = []
+	queue = [cls]
+	while queue:
+		for subcls in queue.pop(0).__subclasses__():
+			if subcls not in out:
+				# Classes replaced by a slotted copy (base._add_slots) remain in __subclasses__ until they are garbage-collected; only consider the one the module exports.
+				if dataclasses.is_dataclass(subcls) and getattr(sys.modules.get(subcls.__module__), subcls.__name__, None) is subcls:
+					out.append(subcls)
+				queue.append(subcls)
+	return out
+
+
+class _SchemaBuilder:
+	'''Derives the Arrow type and a value conversion function for an annotation
+
+	Conversion functions map a Python value to the representation expected by pyarrow.Table.from_pylist; None means that the value can be used as is.
+	'''
+
+	def __init__(self):
+		self._stack = []
+
+	def build(self, tp):
+		'''Return a tuple (arrowType, converter) or None if values of this type should be omitted'''
+
+		tp = _unwrap(tp)
+		origin = typing.get_origin(tp)
+		args = typing.get_args(tp)
+		if tp is bool:
+			return pyarrow.bool_(), None
+		if tp is int or tp is snscrape.base.IntWithGranularity:
+			return pyarrow.int64(), None
+		if tp is float:
+			return pyarrow.float64(), None
+		if tp is str:
+			return pyarrow.string(), None
+		if tp is datetime.datetime:
+			return pyarrow.timestamp('us', tz = 'UTC'), None
+		if tp is datetime.date:
+			return pyarrow.date32(), None
+		if origin in (list, tuple) and args and (origin is list or args[1:] == (Ellipsis,) or all(a == args[0] for a in args)):
+			return self._build_list(args[0])
+		if isinstance(tp, type) and tp not in self._stack:
+			subclasses = _dataclass_subclasses(tp)
+			if subclasses:
+				return self._build_union(([tp] if dataclasses.is_dataclass(tp) else []) + subclasses)
+			if dataclasses.is_dataclass(tp):
+				return self._build_struct(tp)
+		if origin is typing.Union and all(isinstance(a, type) and dataclasses.is_dataclass(a) and a not in self._stack for a in args):
+			members = []
+			for a in args:
+				members.extend(m for m in [a] + _dataclass_subclasses(a) if m not in members)
+			return self._build_union(members)
+		return pyarrow.string(), _json_string
+
+	def _build_list(self, tp):
+		built = self.build(tp)
+		if built is None:
+			return None
+		valueType, convert = built
+		if convert is None:
+			def convert_list(value):
+				return None if value is None else list(value)
+		else:
+			def convert_list(value):
+				return None if value is None else [convert(x) for x in value]
+		return pyarrow.list_(valueType), convert_list
+
+	def struct_fields(self, cls):
+		'''Return a list of (columnName, arrowType, getter) for the dataclass cls'''
+
+		try:
+			hints = typing.get_type_hints(cls)
+		except Exception as e:
+			_logger.debug(f'Could not resolve type hints of {_type_name(cls)}: {type(e).__module__}.{type(e).__name__}: {e!s}')
+			hints = {}
+		self._stack.append(cls)
+		try:
+			columns = []
+			for field in dataclasses.fields(cls):
+				if field.name.startswith('_'):
+					continue
+				tp = _unwrap(hints.get(field.name, typing.Any))
+				built = self.build(tp)
+				if built is None:
+					continue
+				arrowType, convert = built
+				columns.append((field.name, arrowType, self._getter(field.name, convert)))
+				if tp is snscrape.base.IntWithGranularity:
+					columns.append((f'{field.name}.granularity', pyarrow.int64(), self._granularity_getter(field.name)))
+			for name in dir(cls):
+				# Deprecated properties only duplicate other fields and are therefore skipped.
+				if not name.startswith('_') and isinstance(getattr(cls, name, None), property):
+					columns.append((name, pyarrow.string(), self._getter(name, _property_string)))
+		finally:
+			self._stack.pop()
+		return columns
+
+	@staticmethod
+	def _getter(name, convert):
+		if convert is None:
+			return lambda obj: getattr(obj, name)
+		return lambda obj: convert(getattr(obj, name))
+
+	@staticmethod
+	def _granularity_getter(name):
+		return lambda obj: getattr(getattr(obj, name), 'granularity', None)
+
+	def _build_struct(self, cls):
+		columns = self.struct_fields(cls)
+		if not columns:
+			return None
+		getters = tuple((name, getter) for name, _, getter in columns)
+
+		def convert(value):
+			if value is None:
+				return None
+			return {name: getter(value) for name, getter in getters}
+		return pyarrow.struct([(name, arrowType) for name, arrowType, _ in columns]), convert
+
+	def _build_union(self, members):
+		fields = [('_type', pyarrow.string())]
+		converters = {}
+		for member in members:
+			if member in self._stack:
+				fields.append((member.__name__, pyarrow.string()))
+				converters[member] = (member.__name__, _json_string)
+				continue
+			built = self._build_struct(member)
+			if built is None:
+				converters[member] = None
+				continue
+			arrowType, convert = built
+			fields.append((member.__name__, arrowType))
+			converters[member] = (member.__name__, convert)
+
+		def convert(value):
+			if value is None:
+				return None
+			out = {'_type': _type_name(type(value))}
+			if (c := converters.get(type(value))) is not None:
+				out[c[0]] = c[1](value)
+			return out
+		return pyarrow.struct(fields), convert
+
+
+class ColumnarWriter:
+	'''Writes items to a Parquet or Arrow IPC file in record batches of batchSize rows'''
+
+	def __init__(self, path, format, batchSize = _DEFAULT_BATCH_SIZE):
+		if pyarrow is None:
+			raise RuntimeError('Columnar output requires pyarrow')
+		if format not in ('parquet', 'arrow'):
+			raise ValueError(f'Unsupported format: {format!r}')
+		self._path = path
+		self._format = format
+		self._batchSize = batchSize
+		self._buffer = []
+		self._writer = None
+		self._schema = None
+		self._itemType = None
+		self._convert = None
+
+	def write(self, item):
+		self._buffer.append(item)
+		if len(self._buffer) >= self._batchSize:
+			self._flush()
+
+	def close(self):
+		if self._buffer or self._writer is None:
+			self._flush()
+		if self._writer is not None:
+			self._writer.close()
+
+	def _setup(self):
+		if self._buffer:
+			self._itemType = collections.Counter(type(item) for item in self._buffer).most_common(1)[0][0]
+			columns = _SchemaBuilder().struct_fields(self._itemType)
+		else:
+			columns = []
+		reserved = {'_type', '_json'}
+		assert not any(name in reserved for name, _, _ in columns), 'Column collision on _type or _json'
+		getters = tuple((name, getter) for name, _, getter in columns)
+		typeName = _type_name(self._itemType) if self._itemType is not None else None
+
+		def convert(item):
+			if type(item) is not self._itemType:
+				return {'_type': _type_name(type(item)), '_json': item.json()}
+			row = {name: getter(item) for name, getter in getters}
+			row['_type'] = typeName
+			return row
+		self._convert = convert
+
+		fields = [('_type', pyarrow.string())] + [(name, arrowType) for name, arrowType, _ in columns] + [('_json', pyarrow.string())]
+		metadata = {}
+		if snscrape.version.__version__ is not None:
+			metadata['snscrape.version'] = snscrape.version.__version__
+		if typeName is not None:
+			metadata['snscrape.type'] = typeName
+		self._schema = pyarrow.schema(fields, metadata = metadata)
+		if self._format == 'parquet':
+			self._writer = pyarrow.parquet.ParquetWriter(self._path, self._schema)
+		else:
+			self._writer = pyarrow.ipc.new_file(self._path, self._schema)
+
+	def _flush(self):
+		if self._writer is None:
+			self._setup()
+		if not self._buffer:
+			return
+		with warnings.catch_warnings():
+			warnings.filterwarnings(action = 'ignore', category = snscrape.base.DeprecatedFeatureWarning)
+			rows = [self._convert(item) for item in self._buffer]
+		self._buffer = []
+		self._writer.write_table(pyarrow.Table.from_pylist(rows, schema = self._schema))
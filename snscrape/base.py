@@ -1,21 +1,32 @@
-__all__ = ['DeprecatedFeatureWarning', 'Item', 'IntWithGranularity', 'ScraperException', 'EntityUnavailable', 'Scraper']
+__all__ = ['DeprecatedFeatureWarning', 'Item', 'IntWithGranularity', 'ScraperException', 'EntityUnavailable', 'Checkpoint', 'HTTPArchive', 'HostRateLimiter', 'RetryPolicy', 'Scraper']
 
 
 import abc
-import copy
+import asyncio
+import base64
 import dataclasses
 import datetime
+import email.utils
 import functools
+import gzip
 import json
 import logging
+import os
 import random
 import requests
 import requests.adapters
 import snscrape.utils
 import snscrape.version
+import tempfile
+import threading
 import urllib3.connection
 import time
+import urllib.parse
 import warnings
+try:
+	import orjson
+except ImportError:
+	orjson = None
 
 
 _logger = logging.getLogger(__name__)
@@ -46,46 +57,147 @@ def _json_serialise_datetime(obj):
 	raise TypeError(f'Object of type {type(obj)} is not JSON serializable')
 
 
+def _json_loads(s):
+	'''Decode JSON from a str or bytes object, using orjson if it is available'''
+
+	if orjson is not None:
+		try:
+			return orjson.loads(s)
+		except orjson.JSONDecodeError:
+			# orjson is stricter than the json module, e.g. on NaN or integers beyond 64 bits; let the latter have a go before giving up.
+			pass
+	return json.loads(s)
+
+
+def _json_loads_response(r):
+	'''Decode the JSON body of a requests.Response, using orjson if it is available'''
+
+	if r.encoding is None or r.encoding.lower() in ('utf-8', 'utf8'):
+		# Avoid decoding the body to a str first
+		return _json_loads(r.content)
+	return _json_loads(r.text)
+
+
+def _json_dumps(obj, compact = False):
+	'''Encode an object to a JSON string
+
+	By default, the output is that of the json module regardless of whether orjson is installed, so e.g. the JSONL output does not depend on optional dependencies.
+	With compact = True, orjson is used if it is available, which is faster but produces compact output without escaping non-ASCII characters; this is only meant for internal files such as HTTP archives.
+	orjson handles datetime.datetime and datetime.date objects natively; the json module uses _json_serialise_datetime for them.'''
+
+	if compact and orjson is not None:
+		try:
+			return orjson.dumps(obj, option = orjson.OPT_NON_STR_KEYS).decode('utf-8')
+		except orjson.JSONEncodeError:
+			# E.g. integers beyond 64 bits
+			pass
+	return json.dumps(obj, default = _json_serialise_datetime)
+
+
 def _json_dataclass_to_dict(obj, forBuggyIntParser = False):
-	if isinstance(obj, _JSONDataclass) or dataclasses.is_dataclass(obj):
-		out = {}
-		out['_type'] = f'{type(obj).__module__}.{type(obj).__name__}'
-		for field in dataclasses.fields(obj):
-			assert field.name != '_type'
-			if field.name.startswith('_'):
-				continue
-			out[field.name] = _json_dataclass_to_dict(getattr(obj, field.name), forBuggyIntParser = forBuggyIntParser)
-		# Add properties
-		for k in dir(obj):
-			if isinstance(getattr(type(obj), k, None), (property, _DeprecatedProperty)):
-				assert k != '_type'
-				if k.startswith('_'):
-					continue
-				out[k] = _json_dataclass_to_dict(getattr(obj, k), forBuggyIntParser = forBuggyIntParser)
-	elif isinstance(obj, (tuple, list)):
-		return type(obj)(_json_dataclass_to_dict(x, forBuggyIntParser = forBuggyIntParser) for x in obj)
-	elif isinstance(obj, dict):
-		out = {_json_dataclass_to_dict(k, forBuggyIntParser = forBuggyIntParser): _json_dataclass_to_dict(v, forBuggyIntParser = forBuggyIntParser) for k, v in obj.items()}
-	elif isinstance(obj, set):
-		return {_json_dataclass_to_dict(v, forBuggyIntParser = forBuggyIntParser) for v in obj}
-	else:
-		return copy.deepcopy(obj)
+	try:
+		serialiser = _jsonSerialisers[type(obj)]
+	except KeyError:
+		serialiser = _jsonSerialisers[type(obj)] = _json_make_serialiser(type(obj))
+	return serialiser(obj, forBuggyIntParser)
+
+
+def _json_add_extra_keys(out, forBuggyIntParser):
 	# Transform IntWithGranularity and handle buggy int parser output
-	for key, value in list(out.items()): # Modifying the dict below, so make a copy first
+	# The extra keys are appended after all regular keys in the order of the regular keys they belong to.
+	extra = []
+	for key, value in out.items():
 		if isinstance(value, IntWithGranularity):
 			out[key] = int(value)
-			assert f'{key}.granularity' not in out, f'Granularity collision on {key}.granularity'
-			out[f'{key}.granularity'] = value.granularity
+			extra.append((f'{key}.granularity', value.granularity, 'Granularity collision on {}'))
 		elif forBuggyIntParser and isinstance(value, int) and abs(value) > 2**53:
-			assert f'{key}.str' not in out, f'Buggy int collision on {key}.str'
-			out[f'{key}.str'] = str(value)
+			extra.append((f'{key}.str', str(value), 'Buggy int collision on {}'))
+	for key, value, collisionMsg in extra:
+		assert key not in out, collisionMsg.format(key)
+		out[key] = value
 	return out
 
 
+def _json_make_serialiser(cls):
+	'''Build the function converting objects of type cls into their JSON-serialisable representation'''
+
+	if issubclass(cls, _JSONDataclass) or dataclasses.is_dataclass(cls):
+		typeName = f'{cls.__module__}.{cls.__name__}'
+		names = []
+		for field in dataclasses.fields(cls):
+			assert field.name != '_type'
+			if not field.name.startswith('_'):
+				names.append(field.name)
+		# Add properties
+		for k in dir(cls):
+			if isinstance(getattr(cls, k, None), (property, _DeprecatedProperty)):
+				assert k != '_type'
+				if not k.startswith('_'):
+					names.append(k)
+		names = tuple(names)
+
+		def serialise(obj, forBuggyIntParser):
+			out = {'_type': typeName}
+			for name in names:
+				out[name] = _json_dataclass_to_dict(getattr(obj, name), forBuggyIntParser = forBuggyIntParser)
+			return _json_add_extra_keys(out, forBuggyIntParser)
+	elif issubclass(cls, (tuple, list)):
+		def serialise(obj, forBuggyIntParser):
+			return type(obj)(_json_dataclass_to_dict(x, forBuggyIntParser = forBuggyIntParser) for x in obj)
+	elif issubclass(cls, dict):
+		def serialise(obj, forBuggyIntParser):
+			out = {_json_dataclass_to_dict(k, forBuggyIntParser = forBuggyIntParser): _json_dataclass_to_dict(v, forBuggyIntParser = forBuggyIntParser) for k, v in obj.items()}
+			return _json_add_extra_keys(out, forBuggyIntParser)
+	elif issubclass(cls, set):
+		def serialise(obj, forBuggyIntParser):
+			return {_json_dataclass_to_dict(v, forBuggyIntParser = forBuggyIntParser) for v in obj}
+	else:
+		# Leaf values are emitted as they are; the output is only ever used for JSON encoding, so there is no need to copy them.
+		def serialise(obj, forBuggyIntParser):
+			return obj
+	return serialise
+
+
+_jsonSerialisers = {}
+
+
+def _add_slots(cls):
+	'''Recreate the dataclass cls with __slots__ for its fields, equivalent to dataclass(slots = True) on Python 3.10+
+
+	Fields already in the __slots__ of a base class are not repeated. Instances only lack a __dict__ if all base classes define __slots__, too.
+	'''
+
+	inheritedSlots = set()
+	for base in cls.__mro__[1:]:
+		slots = base.__dict__.get('__slots__', ())
+		inheritedSlots.update((slots,) if isinstance(slots, str) else slots)
+	fieldNames = tuple(field.name for field in dataclasses.fields(cls) if field.name not in inheritedSlots)
+	clsDict = dict(cls.__dict__)
+	for name in fieldNames:
+		# Remove default values; the generated __init__ does not rely on them.
+		clsDict.pop(name, None)
+	clsDict.pop('__dict__', None)
+	clsDict.pop('__weakref__', None)
+	clsDict['__slots__'] = fieldNames
+	newCls = type(cls)(cls.__name__, cls.__bases__, clsDict)
+	newCls.__qualname__ = cls.__qualname__
+	return newCls
+
+
+def _dataclass_with_slots(cls = None, /, **kwargs):
+	'''Like dataclasses.dataclass but with __slots__ for the fields (cf. _add_slots)'''
+
+	def wrap(cls):
+		return _add_slots(dataclasses.dataclass(cls, **kwargs))
+	return wrap if cls is None else wrap(cls)
+
+
 @dataclasses.dataclass
 class _JSONDataclass:
 	'''A base class for dataclasses for conversion to JSON'''
 
+	__slots__ = ()
+
 	def json(self, forBuggyIntParser = False):
 		'''
 		Convert the object to a JSON string
@@ -99,7 +211,7 @@ class _JSONDataclass:
 			out = _json_dataclass_to_dict(self, forBuggyIntParser = forBuggyIntParser)
 		assert '_snscrape' not in out, 'Metadata collision on _snscrape'
 		out['_snscrape'] = snscrape.version.__version__
-		return json.dumps(out, default = _json_serialise_datetime)
+		return _json_dumps(out)
 
 
 @dataclasses.dataclass
@@ -109,6 +221,8 @@ class Item(_JSONDataclass):
 	An item can really be anything. The string representation should be useful for the CLI output (e.g. a direct URL for the item).
 	'''
 
+	__slots__ = ()
+
 	@abc.abstractmethod
 	def __str__(self):
 		pass
@@ -149,6 +263,18 @@ class _HTTPSAdapter(requests.adapters.HTTPAdapter):
 			_logger.debug(f'Could not install TLS cipher logger: {type(e).__module__}.{type(e).__name__} {e!s}')
 
 
+def _new_session(poolSize = None, adapter = None):
+	'''Create a requests.Session with the TLS connection logging adapter, optionally with a connection pool of poolSize connections per host
+
+	adapter may be an existing _HTTPSAdapter to share its connection pool between sessions that must not share cookies.'''
+
+	session = requests.Session()
+	if adapter is None:
+		adapter = _HTTPSAdapter(pool_maxsize = poolSize) if poolSize is not None else _HTTPSAdapter()
+	session.mount('https://', adapter)
+	return session
+
+
 class _HTTPSConnection(urllib3.connection.HTTPSConnection):
 	def connect(self, *args, **kwargs):
 		conn = super().connect(*args, **kwargs)
@@ -174,16 +300,460 @@ class EntityUnavailable(ScraperException):
 	'''The target entity of the scrape is unavailable, possibly because it does not exist or was suspended.'''
 
 
+class Checkpoint:
+	'''Pagination state of a scrape for resuming it after an interruption
+
+	A scrape consists of one or more named streams, e.g. the submissions and the comments of a Reddit search.
+	For each stream, the checkpoint stores the state needed to re-request the current page and the keys (str(item)) of the items emitted since the start of that page.
+	On resumption, the scraper continues from the stored page and skips the items that were already emitted, so no page before it needs to be fetched again and no item is emitted twice.
+
+	The state is written atomically to path every interval pages and when leaving the context manager or calling save.
+	An item only counts as emitted once the consumer calls acknowledge after processing (e.g. writing) it, or else when it requests the next item, so an item lost in a crash during its processing is emitted again on resumption.
+	Items emitted after the last save before a hard crash may be emitted again on resumption as well.
+	'''
+
+	def __init__(self, path, *, interval = 1):
+		if interval < 1:
+			raise ValueError('interval must be positive')
+		self._path = path
+		self._interval = interval
+		self._pages = 0
+		self._pendingSkip = {}
+		self._skip = {}
+		self._unacknowledged = None
+		try:
+			with open(path, 'r') as fp:
+				o = json.load(fp)
+		except FileNotFoundError:
+			o = {'version': 1, 'streams': {}}
+			self.resuming = False
+		else:
+			self.resuming = True
+		if o.get('version') != 1:
+			raise ScraperException(f'Unsupported checkpoint version in {path}')
+		self._streams = o['streams']
+
+	def resume(self, stream, fingerprint):
+		'''Return the stored pagination state of stream, or None if there is none
+
+		fingerprint is a JSON-serialisable description of the scrape (e.g. the query parameters); resuming with a different fingerprint raises a ScraperException.
+		'''
+
+		fingerprint = json.dumps(fingerprint, sort_keys = True)
+		if (s := self._streams.get(stream)) is None:
+			self._streams[stream] = {'fingerprint': fingerprint, 'state': None, 'emitted': [], 'done': False}
+			return None
+		if s['fingerprint'] != fingerprint:
+			raise ScraperException(f'Checkpoint {self._path} was created for a different scrape')
+		self._pendingSkip[stream] = set(s['emitted'])
+		return s['state']
+
+	def is_done(self, stream):
+		return stream in self._streams and self._streams[stream]['done']
+
+	def start_page(self, stream, state):
+		'''Record that the items of the page retrieved with the given state are about to be emitted'''
+
+		s = self._streams[stream]
+		skip = self._pendingSkip.pop(stream, set())
+		self._skip[stream] = skip
+		s['state'] = state
+		s['emitted'] = list(skip)
+		self._pages += 1
+		if self._pages % self._interval == 0:
+			self.save()
+
+	def finish(self, stream):
+		s = self._streams[stream]
+		s['state'] = None
+		s['emitted'] = []
+		s['done'] = True
+		self._skip.pop(stream, None)
+		self.save()
+
+	def track(self, iterable, stream):
+		'''Yield the items from iterable, skipping those emitted before the resumption and recording the others
+
+		stream is either the name of the stream or a function returning it for an item.'''
+
+		for item in iterable:
+			itemStream = stream(item) if callable(stream) else stream
+			key = str(item)
+			if key in self._skip.get(itemStream, ()):
+				continue
+			self._unacknowledged = (itemStream, key)
+			yield item
+			self.acknowledge()
+
+	def acknowledge(self):
+		'''Record the item last yielded by track as emitted'''
+
+		if self._unacknowledged is not None:
+			itemStream, key = self._unacknowledged
+			self._unacknowledged = None
+			self._streams[itemStream]['emitted'].append(key)
+
+	def save(self):
+		dirName = os.path.dirname(os.path.abspath(self._path))
+		with tempfile.NamedTemporaryFile('w', dir = dirName, prefix = '.snscrape_checkpoint_', delete = False) as fp:
+			try:
+				json.dump({'version': 1, 'streams': self._streams}, fp)
+				fp.flush()
+				os.fsync(fp.fileno())
+			except BaseException:
+				fp.close()
+				os.remove(fp.name)
+				raise
+		os.replace(fp.name, self._path)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.save()
+
+
+class HTTPArchive:
+	'''A gzip-compressed JSONL archive of HTTP exchanges for recording a scrape and replaying it without network access
+
+	In record mode, every request made through Scraper._request and its response (or connection error) is appended to the archive at path.
+	In replay mode, requests are answered from the archive instead: responses are matched on the method, the full URL, and the request body, and identical requests are served the recorded responses in order (the last one repeatedly once they are exhausted).
+	A request without a recorded response raises a ScraperException. Waits for retries and rate limits are skipped during replay.
+	Response cookies are recorded as well and restored into the session's cookie jar on replay.
+	Values that a scraper derives from something other than responses, e.g. the current time, can be pinned with Scraper._archived_value.
+
+	Each record is flushed as it is written, so an archive of an interrupted scrape can still be replayed up to that point.
+	Request headers are not recorded since they may contain credentials; note that response bodies and cookies are stored as is.
+	An archive can be shared by several scrapers, including across threads.
+	'''
+
+	def __init__(self, path, mode):
+		if mode not in ('record', 'replay'):
+			raise ValueError("mode must be 'record' or 'replay'")
+		self._path = path
+		self._mode = mode
+		self._lock = threading.Lock()
+		if mode == 'record':
+			self._fp = gzip.open(path, 'wt', encoding = 'utf-8')
+		else:
+			self._fp = None
+			self._exchanges = {}
+			self._values = {}
+			with gzip.open(path, 'rt', encoding = 'utf-8') as fp:
+				try:
+					for line in fp:
+						if not line.endswith('\n'):
+							# Partially written record
+							break
+						exchange = _json_loads(line)
+						if 'value' in exchange:
+							self._values.setdefault(exchange['value'], []).append(exchange['data'])
+							continue
+						self._exchanges.setdefault(self._key(exchange['method'], exchange['url'], exchange['body']), []).append(exchange)
+				except EOFError:
+					_logger.warning(f'Archive {path} is truncated, probably from an interrupted scrape; replaying the complete records')
+
+	@property
+	def replaying(self):
+		return self._mode == 'replay'
+
+	@staticmethod
+	def _key(method, url, body):
+		return (method, url, json.dumps(body))
+
+	@staticmethod
+	def _encode_body(body):
+		if body is None or isinstance(body, str):
+			return body
+		try:
+			return body.decode('utf-8')
+		except UnicodeDecodeError:
+			return {'base64': base64.b64encode(body).decode('ascii')}
+
+	@staticmethod
+	def _decode_body(body):
+		if body is None:
+			return b''
+		if isinstance(body, dict):
+			return base64.b64decode(body['base64'])
+		return body.encode('utf-8')
+
+	@staticmethod
+	def _encode_cookies(jar):
+		return [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path, 'secure': c.secure, 'expires': c.expires} for c in jar]
+
+	@staticmethod
+	def _decode_cookies(cookies):
+		jar = requests.cookies.RequestsCookieJar()
+		for c in cookies:
+			jar.set_cookie(requests.cookies.create_cookie(**c))
+		return jar
+
+	@classmethod
+	def _encode_response(cls, r):
+		return {'url': r.url, 'status': r.status_code, 'reason': r.reason, 'headers': dict(r.headers), 'cookies': cls._encode_cookies(r.cookies), 'content': cls._encode_body(r.content)}
+
+	@classmethod
+	def _decode_response(cls, o, request):
+		r = requests.Response()
+		r.url = o['url']
+		r.status_code = o['status']
+		r.reason = o['reason']
+		r.headers = requests.structures.CaseInsensitiveDict(o['headers'])
+		r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+		r._content = cls._decode_body(o['content'])
+		r.cookies = cls._decode_cookies(o.get('cookies', []))
+		r.request = request
+		return r
+
+	def record(self, request, response = None, exception = None):
+		'''Append the exchange of the prepared request with the response or the exception raised while sending it'''
+
+		exchange = {'method': request.method, 'url': request.url, 'body': self._encode_body(request.body)}
+		if exception is not None:
+			exchange['error'] = {'type': f'{type(exception).__module__}.{type(exception).__name__}', 'message': str(exception)}
+		else:
+			exchange['response'] = self._encode_response(response)
+			exchange['history'] = [self._encode_response(h) for h in response.history]
+		self._write(exchange)
+
+	def _write(self, record):
+		line = _json_dumps(record, compact = True)
+		with self._lock:
+			self._fp.write(line)
+			self._fp.write('\n')
+			self._fp.flush()
+
+	def value(self, key, func):
+		'''Return func() and record it under key, or in replay mode, return the value recorded under key
+
+		Values recorded under the same key are returned in order (the last one repeatedly once they are exhausted). The value must be JSON-serialisable.'''
+
+		if self._mode == 'record':
+			data = func()
+			self._write({'value': key, 'data': data})
+			return data
+		with self._lock:
+			values = self._values.get(key)
+			if not values:
+				raise ScraperException(f'No recorded value for {key} in {self._path}')
+			return values.pop(0) if len(values) > 1 else values[0]
+
+	def replay(self, request):
+		'''Return the recorded response to the prepared request or raise the recorded exception'''
+
+		key = self._key(request.method, request.url, self._encode_body(request.body))
+		with self._lock:
+			exchanges = self._exchanges.get(key)
+			if not exchanges:
+				raise ScraperException(f'No recorded response for {request.method} {request.url} in {self._path}')
+			exchange = exchanges.pop(0) if len(exchanges) > 1 else exchanges[0]
+		if 'error' in exchange:
+			raise requests.exceptions.ConnectionError(f'{exchange["error"]["type"]}: {exchange["error"]["message"]} (replayed)', request = request)
+		r = self._decode_response(exchange['response'], request)
+		r.history = [self._decode_response(h, request) for h in exchange['history']]
+		return r
+
+	def close(self):
+		if self._fp is not None:
+			self._fp.close()
+			self._fp = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, excType, excValue, traceback):
+		self.close()
+
+
+class HostRateLimiter:
+	'''Token bucket rate limits per host, shared by all scrapers and threads using the limiter
+
+	Each host has a bucket holding up to burst tokens that refills at rate tokens per second; every request takes one token and waits until it is available.
+	The waiting requests to a host are served in the order in which they arrived.
+	The limit of a host is the one set for it with set_limit, else the one set for '*', else the one announced by the server with set_server_limit, else the default of the scraper class making the request (Scraper._rate_limit), else there is no limit.
+	Server and default limits apply per scope, which separates requests to the same host that the server limits independently, e.g. an API from the HTML pages; the requests of different scopes do not share a bucket, and a server limit learned for one scope does not affect the others.
+	Explicit limits cover all scopes of the host together.
+	'''
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._limits = {}
+		self._serverLimits = {}
+		self._buckets = {}
+
+	def set_limit(self, host, rate, burst = 1):
+		'''Limit the requests to host (or to each host if host is '*') to rate per second with bursts of up to burst requests; a rate of None removes the limit'''
+
+		if rate is not None and (rate <= 0 or burst < 1):
+			raise ValueError('rate must be positive and burst at least 1')
+		with self._lock:
+			if rate is None:
+				self._limits.pop(host, None)
+			else:
+				self._limits[host] = (rate, burst)
+
+	def set_server_limit(self, host, rate, burst = 1, scope = None):
+		'''Set the limit of the requests to host in scope as derived from the server's responses (e.g. rate limit headers), which replaces the scraper's default unless an explicit limit is set with set_limit; a rate of None removes it'''
+
+		if rate is not None and (rate <= 0 or burst < 1):
+			raise ValueError('rate must be positive and burst at least 1')
+		with self._lock:
+			if rate is None:
+				self._serverLimits.pop((host, scope), None)
+			else:
+				self._serverLimits[(host, scope)] = (rate, burst)
+
+	def acquire(self, host, default = None, sleep = time.sleep, scope = None):
+		'''Wait until a request to host in scope may be made and return the time waited in seconds
+
+		default is the (rate, burst) applying if there is no explicit or server limit for the host and scope.'''
+
+		with self._lock:
+			if (limit := self._limits.get(host) or self._limits.get('*')) is not None:
+				key = host
+			else:
+				limit = self._serverLimits.get((host, scope)) or default
+				key = (host, scope)
+			if limit is None:
+				return 0.0
+			rate, burst = limit
+			now = time.monotonic()
+			if (bucket := self._buckets.get(key)) is None:
+				tokens = burst
+			else:
+				tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+			# Taking the token now even if it is not available yet reserves the next slot for this request.
+			tokens -= 1
+			self._buckets[key] = (tokens, now)
+		if tokens >= 0:
+			return 0.0
+		wait = -tokens / rate
+		_logger.info(f'Waiting {wait:.2f} seconds for the rate limit of {host}')
+		sleep(wait)
+		return wait
+
+
+_rateLimiter = HostRateLimiter()
+
+
+class _RetryState:
+	__slots__ = ('counts', 'previousWait')
+
+	def __init__(self):
+		self.counts = {}
+		self.previousWait = None
+
+
+class RetryPolicy:
+	'''Decides how long to wait before retrying a failed request, or whether to give up
+
+	Failures are classified as 'connection', 'timeout', 'rate-limit' (status 429), 'server' (5xx), or 'response' (any other response rejected by the scraper).
+	If the response carries a Retry-After header (or, with useRateLimitReset, an x-rate-limit-reset timestamp along with x-rate-limit-remaining: 0), the request is retried after the time requested by the server, or not at all if that exceeds maxRetryAfter seconds.
+	Otherwise, the wait uses decorrelated jitter: a random duration between baseWait and three times the previous wait, capped at maxWait.
+	budgets optionally limits the number of retries of a request per failure class, and totalBudget the number of retries of all requests using the policy; the scraper's retries setting always applies on top.
+	useRateLimitReset can also be enabled per scraper class with Scraper._useRateLimitReset.
+	The policy is thread-safe and may be shared by many scrapers, which also aggregates the metrics.
+	'''
+
+	ERROR_CLASSES = ('connection', 'timeout', 'rate-limit', 'server', 'response')
+
+	def __init__(self, *, baseWait = 1.0, maxWait = 60.0, maxRetryAfter = 900.0, budgets = None, totalBudget = None, useRateLimitReset = False):
+		if budgets is not None and (unknown := set(budgets) - set(self.ERROR_CLASSES)):
+			raise ValueError(f'Unknown error classes: {", ".join(sorted(unknown))}')
+		self._baseWait = baseWait
+		self._maxWait = maxWait
+		self._maxRetryAfter = maxRetryAfter
+		self._budgets = budgets or {}
+		self._totalBudget = totalBudget
+		self._useRateLimitReset = useRateLimitReset
+		self._lock = threading.Lock()
+		self._retries = {c: 0 for c in self.ERROR_CLASSES}
+		self._sleepSeconds = 0.0
+		self._refusals = 0
+
+	@property
+	def metrics(self):
+		'''A dict with the number of retries per failure class, the total wait time in seconds, and the number of failures not retried due to a budget or an excessive server-requested wait'''
+
+		with self._lock:
+			return {'retries': dict(self._retries), 'sleepSeconds': self._sleepSeconds, 'refusals': self._refusals}
+
+	def new_request(self):
+		return _RetryState()
+
+	@staticmethod
+	def classify(exception = None, response = None):
+		if exception is not None:
+			return 'timeout' if isinstance(exception, requests.exceptions.Timeout) else 'connection'
+		if response.status_code == 429:
+			return 'rate-limit'
+		if 500 <= response.status_code < 600:
+			return 'server'
+		return 'response'
+
+	def _server_wait(self, response, useRateLimitReset):
+		if (retryAfter := response.headers.get('Retry-After')) is not None:
+			try:
+				return float(retryAfter)
+			except ValueError:
+				pass
+			try:
+				return (email.utils.parsedate_to_datetime(retryAfter) - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+			except (TypeError, ValueError):
+				_logger.warning(f'Could not parse Retry-After header: {retryAfter!r}')
+		if (self._useRateLimitReset or useRateLimitReset) and response.headers.get('x-rate-limit-remaining') == '0' and (reset := response.headers.get('x-rate-limit-reset')) is not None:
+			try:
+				return float(reset) - time.time()
+			except ValueError:
+				_logger.warning(f'Could not parse x-rate-limit-reset header: {reset!r}')
+		return None
+
+	def wait(self, state, *, exception = None, response = None, useRateLimitReset = False):
+		'''Return the number of seconds to wait before retrying the request after the exception or rejected response, or None if it should not be retried'''
+
+		errorClass = self.classify(exception, response)
+		serverWait = self._server_wait(response, useRateLimitReset) if response is not None else None
+		with self._lock:
+			if (serverWait is not None and serverWait > self._maxRetryAfter) or \
+			   state.counts.get(errorClass, 0) >= self._budgets.get(errorClass, float('inf')) or \
+			   (self._totalBudget is not None and sum(self._retries.values()) >= self._totalBudget):
+				self._refusals += 1
+				if serverWait is not None and serverWait > self._maxRetryAfter:
+					_logger.warning(f'Server requested a wait of {serverWait:.0f} seconds, not retrying')
+				return None
+			if serverWait is not None:
+				wait = max(serverWait, 0.0)
+			else:
+				wait = min(self._maxWait, random.uniform(self._baseWait, 3 * (state.previousWait or self._baseWait)))
+			state.counts[errorClass] = state.counts.get(errorClass, 0) + 1
+			state.previousWait = wait
+			self._retries[errorClass] += 1
+			self._sleepSeconds += wait
+		return wait
+
+
+_retryPolicy = RetryPolicy()
+
+
 class Scraper:
 	'''An abstract base class for a scraper.'''
 
 	name = None
+	_supportsCheckpoint = False
+	_rateLimit = None # Default (rate, burst) of the rate limiter for the hosts requested by this scraper; see also _rate_limit
+	_useRateLimitReset = False # Whether retries of rate-limited requests wait for the x-rate-limit-reset time sent by the server; see also _use_rate_limit_reset
 
-	def __init__(self, *, retries = 3, proxies = None):
+	def __init__(self, *, retries = 3, proxies = None, checkpoint = None, session = None, archive = None, rateLimiter = None, retryPolicy = None):
+		if checkpoint is not None and not type(self)._supportsCheckpoint:
+			raise ValueError(f'{type(self).__name__} does not support checkpoints')
 		self._retries = retries
 		self._proxies = proxies
-		self._session = requests.Session()
-		self._session.mount('https://', _HTTPSAdapter())
+		self._checkpoint = checkpoint
+		self._archive = archive
+		self._rateLimiter = rateLimiter if rateLimiter is not None else _rateLimiter
+		self._retryPolicy = retryPolicy if retryPolicy is not None else _retryPolicy
+		self._session = session if session is not None else _new_session()
 
 	@abc.abstractmethod
 	def get_items(self):
@@ -203,6 +773,39 @@ class Scraper:
 	def entity(self):
 		return self._get_entity()
 
+	async def aget_items(self, *, executor = None):
+		'''Asynchronous iterator yielding Items.
+
+		This advances the blocking get_items iterator in `executor` (default: the event loop's default executor), so a single event loop can drive many scrapes concurrently.
+		For a large number of concurrent scrapes, pass an executor with a correspondingly large number of workers.
+		'''
+
+		loop = asyncio.get_running_loop()
+		it = iter(self.get_items())
+		sentinel = object()
+		try:
+			while True:
+				item = await loop.run_in_executor(executor, next, it, sentinel)
+				if item is sentinel:
+					break
+				yield item
+		finally:
+			try:
+				it.close()
+			except ValueError:
+				# The generator is still running in the executor after a cancellation; it will be garbage-collected once that finishes.
+				pass
+
+	def _checkpoint_track(self, iterable, stream):
+		if self._checkpoint is None:
+			return iterable
+		return self._checkpoint.track(iterable, stream)
+
+	async def aget_entity(self, *, executor = None):
+		'''Asynchronous counterpart of the entity property'''
+
+		return await asyncio.get_running_loop().run_in_executor(executor, lambda: self.entity)
+
 	def _request(self, method, url, params = None, data = None, headers = None, timeout = 10, responseOkCallback = None, allowRedirects = True, proxies = None):
 		if not headers:
 			headers = {}
@@ -210,6 +813,7 @@ class Scraper:
 			headers['User-Agent'] = _DEFAULT_USER_AGENT
 		proxies = proxies or self._proxies or {}
 		errors = []
+		retryState = self._retryPolicy.new_request()
 		for attempt in range(self._retries + 1):
 			# The request is newly prepared on each retry because of potential cookie updates.
 			req = self._session.prepare_request(requests.Request(method, url, params = params, data = data, headers = headers))
@@ -221,15 +825,10 @@ class Scraper:
 			if environmentSettings:
 				_logger.debug(f'... with environmentSettings: {environmentSettings!r}')
 			try:
-				r = self._session.send(req, allow_redirects = allowRedirects, timeout = timeout, **environmentSettings)
+				r = self._send(req, allow_redirects = allowRedirects, timeout = timeout, **environmentSettings)
 			except requests.exceptions.RequestException as exc:
-				if attempt < self._retries:
-					retrying = ', retrying'
-					level = logging.INFO
-				else:
-					retrying = ''
-					level = logging.ERROR
-				_logger.log(level, f'Error retrieving {req.url}: {exc!r}{retrying}')
+				wait = self._retry_wait(retryState, attempt, exception = exc)
+				_logger.log(logging.INFO if wait is not None else logging.ERROR, f'Error retrieving {req.url}: {exc!r}{", retrying" if wait is not None else ""}')
 				errors.append(repr(exc))
 			else:
 				redirected = f' (redirected to {r.url})' if r.history else ''
@@ -250,23 +849,70 @@ class Scraper:
 					_logger.debug(f'{req.url} retrieved successfully{msg}')
 					return r
 				else:
-					if attempt < self._retries:
-						retrying = ', retrying'
-						level = logging.INFO
-					else:
-						retrying = ''
-						level = logging.ERROR
-					_logger.log(level, f'Error retrieving {req.url}{msg}{retrying}')
-			if attempt < self._retries:
-				sleepTime = 1.0 * 2**attempt # exponential backoff: sleep 1 second after first attempt, 2 after second, 4 after third, etc.
-				_logger.info(f'Waiting {sleepTime:.0f} seconds')
-				time.sleep(sleepTime)
-		else:
-			msg = f'{self._retries + 1} requests to {req.url} failed, giving up.'
-			_logger.fatal(msg)
-			_logger.fatal(f'Errors: {", ".join(errors)}')
-			raise ScraperException(msg)
-		raise RuntimeError('Reached unreachable code')
+					wait = self._retry_wait(retryState, attempt, response = r)
+					_logger.log(logging.INFO if wait is not None else logging.ERROR, f'Error retrieving {req.url}{msg}{", retrying" if wait is not None else ""}')
+			if wait is None:
+				break
+			_logger.info(f'Waiting {wait:.1f} seconds')
+			self._sleep(wait)
+		msg = f'{attempt + 1} requests to {req.url} failed, giving up.'
+		_logger.fatal(msg)
+		_logger.fatal(f'Errors: {", ".join(errors)}')
+		raise ScraperException(msg)
+
+	def _rate_limit(self, url):
+		'''Return the scope and the default (rate, burst) of the rate limiter for a request to url
+
+		Subclasses can override this to limit parts of a host separately, e.g. an API with its own server-side limits.'''
+
+		return None, type(self)._rateLimit
+
+	def _retry_wait(self, retryState, attempt, *, exception = None, response = None):
+		if attempt >= self._retries:
+			return None
+		useRateLimitReset = response is not None and self._use_rate_limit_reset(response)
+		return self._retryPolicy.wait(retryState, exception = exception, response = response, useRateLimitReset = useRateLimitReset)
+
+	def _use_rate_limit_reset(self, response):
+		'''Whether the retry of the request that got the rejected response should wait for its x-rate-limit-reset time
+
+		Subclasses can override this, e.g. to only wait if the retry will be made with the same credentials that hit the rate limit.'''
+
+		return type(self)._useRateLimitReset
+
+	def _send(self, req, **kwargs):
+		if self._archive is not None and self._archive.replaying:
+			r = self._archive.replay(req)
+			for response in (*r.history, r):
+				self._session.cookies.update(response.cookies)
+			return r
+		scope, default = self._rate_limit(req.url)
+		self._rateLimiter.acquire(urllib.parse.urlsplit(req.url).hostname, default, scope = scope)
+		if self._archive is None:
+			return self._session.send(req, **kwargs)
+		try:
+			r = self._session.send(req, **kwargs)
+		except requests.exceptions.RequestException as exc:
+			self._archive.record(req, exception = exc)
+			raise
+		self._archive.record(req, r)
+		return r
+
+	def _archived_value(self, key, func):
+		'''Return func(), recording its value in the HTTP archive or taking it from there during a replay
+
+		This is for values that requests depend on but that do not come from a response, e.g. bounds derived from the current time.'''
+
+		if self._archive is None:
+			return func()
+		return self._archive.value(key, func)
+
+	def _sleep(self, seconds):
+		'''time.sleep except during a replay'''
+
+		if self._archive is not None and self._archive.replaying:
+			return
+		time.sleep(seconds)
 
 	def _get(self, *args, **kwargs):
 		return self._request('GET', *args, **kwargs)
@@ -274,6 +920,19 @@ class Scraper:
 	def _post(self, *args, **kwargs):
 		return self._request('POST', *args, **kwargs)
 
+	async def _arequest(self, *args, executor = None, **kwargs):
+		'''Run _request in `executor` without blocking the event loop
+
+		The default executor of the event loop has at most min(32, os.cpu_count() + 4) threads, which caps the number of concurrent requests; pass an executor with more workers if more requests should be in flight at once.'''
+
+		return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(self._request, *args, **kwargs))
+
+	async def _aget(self, *args, executor = None, **kwargs):
+		return await self._arequest('GET', *args, executor = executor, **kwargs)
+
+	async def _apost(self, *args, executor = None, **kwargs):
+		return await self._arequest('POST', *args, executor = executor, **kwargs)
+
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
 		pass
@@ -284,6 +943,12 @@ class Scraper:
 
 	@classmethod
 	def _cli_construct(cls, argparseArgs, *args, **kwargs):
+		if getattr(argparseArgs, 'checkpoint', None) is not None:
+			kwargs['checkpoint'] = argparseArgs.checkpoint
+		if getattr(argparseArgs, 'session', None) is not None:
+			kwargs['session'] = argparseArgs.session
+		if getattr(argparseArgs, 'archive', None) is not None:
+			kwargs['archive'] = argparseArgs.archive
 		return cls(*args, **kwargs, retries = argparseArgs.retries)
 
 
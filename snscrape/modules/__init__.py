@@ -1,17 +1,55 @@
-import pkgutil
+import importlib
 
 
-__all__ = []
+__all__ = ['facebook', 'instagram', 'mastodon', 'reddit', 'telegram', 'twitter', 'vkontakte', 'weibo']
 
 
-def _import_modules():
-	prefixLen = len(__name__) + 1
-	for importer, moduleName, isPkg in pkgutil.iter_modules(__path__, prefix = f'{__name__}.'):
-		assert not isPkg
-		moduleNameWithoutPrefix = moduleName[prefixLen:]
-		__all__.append(moduleNameWithoutPrefix)
-		module = importer.find_module(moduleName).load_module(moduleName)
-		globals()[moduleNameWithoutPrefix] = module
+# Scraper name -> (module name, class name)
+# The modules are only imported when they are accessed, so e.g. the CLI only needs to import the module of the selected scraper.
+# This must be kept in sync with the name attributes of the scraper classes.
+_SCRAPERS = {
+	'facebook-community': ('facebook', 'FacebookCommunityScraper'),
+	'facebook-group': ('facebook', 'FacebookGroupScraper'),
+	'facebook-user': ('facebook', 'FacebookUserScraper'),
+	'instagram-hashtag': ('instagram', 'InstagramHashtagScraper'),
+	'instagram-location': ('instagram', 'InstagramLocationScraper'),
+	'instagram-user': ('instagram', 'InstagramUserScraper'),
+	'mastodon-profile': ('mastodon', 'MastodonProfileScraper'),
+	'mastodon-profiles': ('mastodon', 'MastodonProfilesScraper'),
+	'mastodon-toot': ('mastodon', 'MastodonTootScraper'),
+	'reddit-search': ('reddit', 'RedditSearchScraper'),
+	'reddit-submission': ('reddit', 'RedditSubmissionScraper'),
+	'reddit-subreddit': ('reddit', 'RedditSubredditScraper'),
+	'reddit-user': ('reddit', 'RedditUserScraper'),
+	'telegram-channel': ('telegram', 'TelegramChannelScraper'),
+	'twitter-cashtag': ('twitter', 'TwitterCashtagScraper'),
+	'twitter-community': ('twitter', 'TwitterCommunityScraper'),
+	'twitter-hashtag': ('twitter', 'TwitterHashtagScraper'),
+	'twitter-list-posts': ('twitter', 'TwitterListPostsScraper'),
+	'twitter-profile': ('twitter', 'TwitterProfileScraper'),
+	'twitter-search': ('twitter', 'TwitterSearchScraper'),
+	'twitter-trends': ('twitter', 'TwitterTrendsScraper'),
+	'twitter-tweet': ('twitter', 'TwitterTweetScraper'),
+	'twitter-uconnect': ('twitter', 'TwitterUserConnectScraper'),
+	'twitter-urecommend': ('twitter', 'TwitterUserRecommendationScraper'),
+	'twitter-user': ('twitter', 'TwitterUserScraper'),
+	'vkontakte-user': ('vkontakte', 'VKontakteUserScraper'),
+	'weibo-user': ('weibo', 'WeiboUserScraper'),
+}
 
 
-_import_modules()
+def __getattr__(name):
+	if name in __all__:
+		return importlib.import_module(f'{__name__}.{name}')
+	raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+	return sorted(list(globals()) + __all__)
+
+
+def _get_scraper_class(name):
+	'''Return the scraper class with the given CLI name, importing its module'''
+
+	moduleName, className = _SCRAPERS[name]
+	return getattr(importlib.import_module(f'{__name__}.{moduleName}'), className)
@@ -4,7 +4,6 @@ __all__ = ['FacebookPost', 'User', 'FacebookUserScraper', 'FacebookCommunityScra
 import bs4
 import dataclasses
 import datetime
-import json
 import logging
 import re
 import snscrape.base
@@ -194,7 +193,7 @@ class _FacebookUserAndCommunityScraper(_FacebookCommonScraper):
 			r = self._get(urllib.parse.urljoin(self._baseUrl, nextPageLink.get('ajaxify')) + '&__a=1', headers = self._headers)
 			if r.status_code != 200:
 				raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-			response = json.loads(spuriousForLoopPattern.sub('', r.text))
+			response = snscrape.base._json_loads(spuriousForLoopPattern.sub('', r.text))
 			assert 'domops' in response
 			assert len(response['domops']) == 1
 			assert len(response['domops'][0]) == 4
@@ -239,7 +238,7 @@ class FacebookUserScraper(_FacebookUserAndCommunityScraper):
 		kwargs['username'] = handle.group(1)
 
 		nameVerifiedMarkup = nameVerifiedMarkupPattern.search(r.text)
-		nameVerifiedMarkup = json.loads(nameVerifiedMarkup.group(1))
+		nameVerifiedMarkup = snscrape.base._json_loads(nameVerifiedMarkup.group(1))
 		nameVerifiedSoup = bs4.BeautifulSoup(nameVerifiedMarkup, 'lxml')
 		kwargs['name'] = nameVerifiedSoup.find('a', class_ = '_64-f').text
 		kwargs['verified'] = bool(nameVerifiedSoup.find('a', class_ = '_56_f'))
@@ -349,7 +348,7 @@ class FacebookGroupScraper(_FacebookCommonScraper):
 			  )
 			if r.status_code != 200:
 				raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-			obj = json.loads(spuriousForLoopPattern.sub('', r.text))
+			obj = snscrape.base._json_loads(spuriousForLoopPattern.sub('', r.text))
 			if obj['payload'] == '':
 				# End of pagination
 				break
@@ -88,7 +88,7 @@ class _InstagramCommonScraper(snscrape.base.Scraper):
 			return True, None
 		jsonData = r.text.split('<script type="text/javascript">window._sharedData = ')[1].split(';</script>')[0] # May throw an IndexError if Instagram changes something again; we just let that bubble.
 		try:
-			obj = json.loads(jsonData)
+			obj = snscrape.base._json_loads(jsonData)
 		except json.JSONDecodeError:
 			return False, 'invalid JSON'
 		r._snscrape_json_obj = obj
@@ -100,7 +100,7 @@ class _InstagramCommonScraper(snscrape.base.Scraper):
 		if r.url.startswith('https://www.instagram.com/accounts/login/'):
 			raise snscrape.base.ScraperException('Redirected to login page')
 		try:
-			obj = json.loads(r.text)
+			obj = snscrape.base._json_loads_response(r)
 		except json.JSONDecodeError as e:
 			return False, f'invalid JSON ({e!r})'
 		r._snscrape_json_obj = obj
@@ -1,12 +1,13 @@
-__all__ = ['Toot', 'Boost', 'Attachment', 'Poll', 'PollOption', 'User', 'CustomEmoji', 'MastodonProfileScraper', 'MastodonTootScraperMode', 'MastodonTootScraper']
+__all__ = ['Toot', 'Boost', 'Attachment', 'Poll', 'PollOption', 'User', 'CustomEmoji', 'MastodonProfileScraper', 'MastodonProfilesScraper', 'MastodonTootScraperMode', 'MastodonTootScraper']
 
 
 import bs4
 import dataclasses
 import datetime
 import enum
-import json
+import itertools
 import logging
+import re
 import snscrape.base
 import snscrape.utils
 import time
@@ -92,17 +93,128 @@ class CustomEmoji:
 	staticUrl: str
 
 
+def _api_datetime(s):
+	return datetime.datetime.strptime(s, '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo = datetime.timezone.utc)
+
+
 class _MastodonCommonScraper(snscrape.base.Scraper):
-	def __init__(self, **kwargs):
+	_rateLimit = (1 / 3, 1) # One request every three seconds per instance for the HTML pages, shared by all scrapers in the process
+	_apiRateLimit = (1, 1) # Mastodon's default API limit is 300 requests per five minutes; replaced by the X-RateLimit headers once an instance has sent them
+
+	def __init__(self, *, api = False, **kwargs):
 		super().__init__(**kwargs)
+		self._api = api
 		self._headers = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:52.0) Gecko/20100101 Firefox/52.0', 'Accept-Language': 'en-US,en;q=0.5'}
-		self._lastRequest = 0
 
-	def _rate_limited_get(self, *args, **kwargs):
-		if (diff := time.time() - self._lastRequest) < 3:
-			time.sleep(3 - diff)
-		self._lastRequest = time.time()
-		return self._get(*args, **kwargs)
+	def _rate_limit(self, url):
+		if urllib.parse.urlsplit(url).path.startswith('/api/'):
+			return 'api', type(self)._apiRateLimit
+		return super()._rate_limit(url)
+
+	def _api_response_ok(self, r):
+		# The API announces its rate limit in the X-RateLimit-* headers, so the following requests to the instance are spread evenly over the remaining window instead.
+		if (remaining := r.headers.get('X-RateLimit-Remaining')) is not None and (reset := r.headers.get('X-RateLimit-Reset')) is not None:
+			try:
+				resetTimestamp = datetime.datetime.fromisoformat(reset.replace('Z', '+00:00')).timestamp()
+				remaining = int(remaining)
+			except ValueError:
+				_logger.warning(f'Could not parse rate limit headers: {remaining!r}, {reset!r}')
+			else:
+				self._rateLimiter.set_server_limit(urllib.parse.urlsplit(r.url).hostname, (max(remaining, 0) + 1) / max(resetTimestamp - time.time(), 1.0), scope = 'api')
+		if r.status_code == 429:
+			return False, 'rate-limited'
+		if r.status_code >= 500:
+			return False, f'status code {r.status_code}'
+		return True, None
+
+	def _api_get(self, url, params = None):
+		'''Retrieve an API endpoint and return the decoded response, or None if it does not exist'''
+
+		r = self._get(url, params = params, headers = self._headers, responseOkCallback = self._api_response_ok)
+		if r.status_code == 404:
+			return None
+		if r.status_code != 200:
+			raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
+		return snscrape.base._json_loads_response(r)
+
+	def _api_account_to_user(self, account, domain):
+		kwargs = {}
+		kwargs['account'] = f'@{account["acct"]}' if '@' in account['acct'] else f'@{account["acct"]}@{domain}' # Local accounts have no domain in acct
+		kwargs['displayName'] = account['display_name']
+		if account.get('emojis') and any(f':{emoji["shortcode"]}:' in account['display_name'] for emoji in account['emojis']):
+			emojis = {f':{emoji["shortcode"]}:': emoji for emoji in account['emojis']}
+			kwargs['displayNameWithCustomEmojis'] = []
+			for part in re.split('(' + '|'.join(map(re.escape, emojis)) + ')', account['display_name']):
+				if part in emojis:
+					kwargs['displayNameWithCustomEmojis'].append(CustomEmoji(shortName = part, url = emojis[part]['url'], staticUrl = emojis[part]['static_url']))
+				elif part:
+					kwargs['displayNameWithCustomEmojis'].append(part)
+		kwargs['avatarUrl'] = account.get('avatar')
+		kwargs['_url'] = account.get('url')
+		return User(**kwargs)
+
+	def _api_status_to_item(self, status, domain):
+		if status.get('reblog'):
+			return Boost(user = self._api_account_to_user(status['account'], domain), toot = self._api_status_to_item(status['reblog'], domain))
+
+		tootKwargs = {}
+		tootKwargs['url'] = status['url'] or status['uri']
+		tootKwargs['id'] = status['id']
+		tootKwargs['date'] = _api_datetime(status['created_at'])
+		tootKwargs['user'] = self._api_account_to_user(status['account'], domain)
+
+		content = bs4.BeautifulSoup(status['content'], 'lxml')
+		text = '\n\n'.join(p.text for p in content.find_all('p'))
+		if not status.get('spoiler_text'):
+			tootKwargs['text'] = text
+		else:
+			tootKwargs['text'] = status['spoiler_text']
+			tootKwargs['spoilerText'] = text
+
+		if status.get('media_attachments'):
+			tootKwargs['attachments'] = [Attachment(url = m['url'], name = m.get('description') or m['id']) for m in status['media_attachments']]
+
+		# Mentions and hashtags are taken from the structured fields; the content's anchors are only used for the other links.
+		if (links := self._content_links(content, tootKwargs['url']).get('links')):
+			tootKwargs['links'] = links
+		if status.get('mentions'):
+			tootKwargs['mentionedUsers'] = [User(account = f'@{m["acct"]}' if '@' in m['acct'] else f'@{m["acct"]}@{domain}', _url = m['url']) for m in status['mentions']]
+		if status.get('tags'):
+			tootKwargs['hashtags'] = [f'#{tag["name"]}' for tag in status['tags']]
+
+		if (poll := status.get('poll')):
+			tootKwargs['poll'] = Poll(
+				id = poll['id'],
+				expirationDate = _api_datetime(poll['expires_at']) if poll.get('expires_at') else None,
+				multiple = poll['multiple'],
+				options = [PollOption(title = op['title'], votesCount = op['votes_count']) for op in poll['options']],
+				votesCount = poll['votes_count'],
+				votersCount = poll.get('voters_count'),
+			)
+
+		return Toot(**tootKwargs)
+
+	def _content_links(self, content, url):
+		out = {}
+		links = []
+		mentionedUsers = []
+		hashtags = []
+		for a in content.find_all('a'):
+			cls = a.get('class', [])
+			if 'mention' in cls and 'u-url' in cls:
+				mentionUrl = urllib.parse.urljoin(url, a['href'])
+				mentionedUsers.append(User(account = self._url_to_account(mentionUrl), _url = mentionUrl))
+			elif 'mention' in cls and 'hashtag' in cls:
+				hashtags.append(a.text.strip())
+			else:
+				links.append(urllib.parse.urljoin(url, a['href']))
+		if links:
+			out['links'] = links
+		if mentionedUsers:
+			out['mentionedUsers'] = mentionedUsers
+		if hashtags:
+			out['hashtags'] = hashtags
+		return out
 
 	def _entries_to_items(self, entries, url):
 		for entry in entries:
@@ -149,7 +261,7 @@ class _MastodonCommonScraper(snscrape.base.Scraper):
 					attachments.append(Attachment(url = urllib.parse.urljoin(url, a['href']), name = a.text.strip()))
 				tootKwargs['attachments'] = attachments
 			elif (mediaGalleryDiv := entry.find('div', attrs = {'data-component': 'MediaGallery'})): # Before 2.7.0 (https://github.com/mastodon/mastodon/issues/6714)
-				o = json.loads(mediaGalleryDiv['data-props'])
+				o = snscrape.base._json_loads(mediaGalleryDiv['data-props'])
 				attachments = []
 				for medium in o['media']:
 					attachments.append(Attachment(url = urllib.parse.urljoin(url, medium['url']), name = medium['url'].rsplit('/', 1)[-1].strip()))
@@ -160,27 +272,10 @@ class _MastodonCommonScraper(snscrape.base.Scraper):
 					attachments.append(Attachment(url = urllib.parse.urljoin(url, a['href']), name = a['href'].rsplit('/', 1)[1]))
 				tootKwargs['attachments'] = attachments
 
-			links = []
-			mentionedUsers = []
-			hashtags = []
-			for a in content.find_all('a'):
-				cls = a.get('class', [])
-				if 'mention' in cls and 'u-url' in cls:
-					mentionUrl = urllib.parse.urljoin(url, a['href'])
-					mentionedUsers.append(User(account = self._url_to_account(mentionUrl), _url = mentionUrl))
-				elif 'mention' in cls and 'hashtag' in cls:
-					hashtags.append(a.text.strip())
-				else:
-					links.append(urllib.parse.urljoin(url, a['href']))
-			if links:
-				tootKwargs['links'] = links
-			if mentionedUsers:
-				tootKwargs['mentionedUsers'] = mentionedUsers
-			if hashtags:
-				tootKwargs['hashtags'] = hashtags
+			tootKwargs.update(self._content_links(content, url))
 
 			if (pollDiv := entry.find('div', attrs = {'data-component': 'Poll'})):
-				o = json.loads(pollDiv['data-props'])
+				o = snscrape.base._json_loads(pollDiv['data-props'])
 				pollKwargs = {}
 				pollKwargs['id'] = o['poll']['id']
 				pollKwargs['expirationDate'] = datetime.datetime.strptime(o['poll']['expires_at'], '%Y-%m-%dT%H:%M:%S.%fZ').replace(tzinfo = datetime.timezone.utc)
@@ -256,14 +351,17 @@ class MastodonProfileScraper(_MastodonCommonScraper):
 		self._url = url
 
 	def get_items(self):
+		if self._api:
+			yield from self._get_api_items()
+			return
 		initial = True
 		while True:
 			if initial:
-				r = self._rate_limited_get(f'{self._url}/with_replies', headers = self._headers)
+				r = self._get(f'{self._url}/with_replies', headers = self._headers)
 				if r.status_code not in (200, 404):
 					raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
 				if r.status_code == 404: # Possibly an old instance where with_replies doesn't exist, try without that.
-					r = self._rate_limited_get(self._url, headers = self._headers)
+					r = self._get(self._url, headers = self._headers)
 					if r.status_code not in (200, 404):
 						raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
 					if r.status_code == 404:
@@ -272,7 +370,7 @@ class MastodonProfileScraper(_MastodonCommonScraper):
 					_logger.warning('Old Mastodon instance, cannot retrieve reply toots')
 				initial = False
 			else:
-				r = self._rate_limited_get(url, headers = self._headers)
+				r = self._get(url, headers = self._headers)
 				if r.status_code != 200:
 					raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
 			soup = bs4.BeautifulSoup(r.text, 'lxml')
@@ -288,13 +386,98 @@ class MastodonProfileScraper(_MastodonCommonScraper):
 				break
 			url = urllib.parse.urljoin(r.url, nextA['href'])
 
+	def _get_api_items(self):
+		domain = urllib.parse.urlsplit(self._url).hostname
+		username = self._url_to_account(self._url.rstrip('/')).split('@')[1]
+		account = self._api_get(f'https://{domain}/api/v1/accounts/lookup', params = {'acct': username})
+		if account is None:
+			_logger.warning('Account does not exist')
+			return
+		params = {'limit': 40}
+		while True:
+			statuses = self._api_get(f'https://{domain}/api/v1/accounts/{account["id"]}/statuses', params = params)
+			if not statuses: # End of pagination
+				break
+			for status in statuses:
+				yield self._api_status_to_item(status, domain)
+			params['max_id'] = statuses[-1]['id']
+
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
+		subparser.add_argument('--api', action = 'store_true', default = False, help = 'Use the JSON API instead of the HTML pages; requires Mastodon 3.4 or newer')
 		subparser.add_argument('account', type = snscrape.utils.nonempty_string_arg('account'), help = 'A Mastodon account. This can be either a URL to the profile page or a string of the form @account@instance.example.org')
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, args.account)
+		return cls._cli_construct(args, args.account, api = args.api)
+
+
+class MastodonProfilesScraper(_MastodonCommonScraper):
+	'''Scrape several accounts, possibly on many instances, concurrently
+
+	The toots of each account are in the usual order, but the accounts are interleaved in the order in which their toots arrive.
+	Up to concurrency accounts are scraped at a time, taking turns between the instances so that the workers do not all wait for the rate limit of the same one.
+	'''
+
+	name = 'mastodon-profiles'
+
+	def __init__(self, accounts, *, concurrency = 4, **kwargs):
+		if concurrency < 1:
+			raise ValueError('concurrency must be positive')
+		if concurrency > 1 and kwargs.get('session') is None:
+			# Enough pooled connections for all workers
+			kwargs['session'] = snscrape.base._new_session(poolSize = concurrency)
+		super().__init__(**kwargs)
+		self._accounts = list(accounts)
+		self._concurrency = concurrency
+		# Reject malformed accounts up front rather than when their turn comes during the scrape
+		for account in self._accounts:
+			if self._account_domain(account) is None:
+				raise ValueError(f'Invalid account: {account!r}')
+			if self._api and not account.startswith('@'):
+				try:
+					self._url_to_account(account.rstrip('/'))
+				except ValueError as e:
+					raise ValueError(f'Invalid account URL {account!r}: {e!s}') from e
+
+	@staticmethod
+	def _account_domain(account):
+		if account.startswith('@') and account.count('@') == 2:
+			return account.rsplit('@', 1)[1]
+		return urllib.parse.urlsplit(account).hostname
+
+	def _account_items(self, account):
+		scraper = MastodonProfileScraper(
+			account,
+			api = self._api,
+			retries = self._retries,
+			proxies = self._proxies,
+			session = self._session,
+			archive = self._archive,
+			rateLimiter = self._rateLimiter,
+			retryPolicy = self._retryPolicy,
+		)
+		try:
+			yield from scraper.get_items()
+		except snscrape.base.ScraperException as e:
+			_logger.error(f'Could not scrape {account}: {e!s}')
+
+	def get_items(self):
+		byDomain = {}
+		for account in self._accounts:
+			byDomain.setdefault(self._account_domain(account), []).append(account)
+		accounts = [account for accounts in itertools.zip_longest(*byDomain.values()) for account in accounts if account is not None]
+		yield from snscrape.utils.interleave_concurrently(map(self._account_items, accounts), self._concurrency)
+
+	@classmethod
+	def _cli_setup_parser(cls, subparser):
+		subparser.add_argument('--api', action = 'store_true', default = False, help = 'Use the JSON API instead of the HTML pages; requires Mastodon 3.4 or newer')
+		subparser.add_argument('--concurrency', type = snscrape.utils.parse_positive_int, default = 4, metavar = 'N', help = 'Scrape up to N accounts concurrently')
+		subparser.add_argument('accounts', nargs = '+', metavar = 'ACCOUNT', type = snscrape.utils.nonempty_string_arg('account'), help = 'Mastodon accounts, each either a URL to the profile page or a string of the form @account@instance.example.org')
+
+	@classmethod
+	def _cli_from_args(cls, args):
+		return cls._cli_construct(args, args.accounts, concurrency = args.concurrency, api = args.api)
 
 
 class MastodonTootScraperMode(enum.Enum):
@@ -317,7 +500,10 @@ class MastodonTootScraper(_MastodonCommonScraper):
 		self._mode = mode
 
 	def get_items(self):
-		r = self._rate_limited_get(self._url, headers = self._headers)
+		if self._api:
+			yield from self._get_api_items()
+			return
+		r = self._get(self._url, headers = self._headers)
 		if r.status_code == 404:
 			_logger.warning('Toot does not exist')
 			return
@@ -331,11 +517,28 @@ class MastodonTootScraper(_MastodonCommonScraper):
 		elif self._mode is MastodonTootScraperMode.THREAD:
 			yield from self._entries_to_items(soup.find('div', class_ = 'activity-stream').find_all('div', class_ = 'entry'), r.url)
 
+	def _get_api_items(self):
+		domain = urllib.parse.urlsplit(self._url).hostname
+		statusId = self._url.rstrip('/').rsplit('/', 1)[1]
+		status = self._api_get(f'https://{domain}/api/v1/statuses/{statusId}')
+		if status is None:
+			_logger.warning('Toot does not exist')
+			return
+		if self._mode is MastodonTootScraperMode.SINGLE:
+			yield self._api_status_to_item(status, domain)
+		elif self._mode is MastodonTootScraperMode.THREAD:
+			context = self._api_get(f'https://{domain}/api/v1/statuses/{statusId}/context')
+			if context is None:
+				raise snscrape.base.ScraperException('Toot context does not exist')
+			for s in context['ancestors'] + [status] + context['descendants']:
+				yield self._api_status_to_item(s, domain)
+
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
 		subparser.add_argument('--thread', action = 'store_true', help = 'Collect thread around the toot referenced by the URL')
+		subparser.add_argument('--api', action = 'store_true', default = False, help = 'Use the JSON API instead of the HTML page')
 		subparser.add_argument('url', type = snscrape.utils.nonempty_string_arg('url'), help = 'A URL for a toot')
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, args.url, mode = MastodonTootScraperMode._cli_from_args(args))
+		return cls._cli_construct(args, args.url, mode = MastodonTootScraperMode._cli_from_args(args), api = args.api)
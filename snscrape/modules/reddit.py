@@ -3,12 +3,12 @@ __all__ = ['Submission', 'Comment', 'RedditUserScraper', 'RedditSubredditScraper
 
 import dataclasses
 import datetime
+import functools
 import logging
 import re
 import snscrape.base
 import snscrape.utils
 import snscrape.version
-import string
 import time
 import typing
 
@@ -31,6 +31,12 @@ class Submission(snscrape.base.Item):
 
 	created = snscrape.base._DeprecatedProperty('created', lambda self: self.date, 'date')
 
+	@functools.cached_property
+	def numericId(self):
+		'''The decoded ID without the prefix, which orders the items of one type by creation'''
+
+		return _decode_id(self.id)[1]
+
 	def __str__(self):
 		return self.url
 
@@ -47,44 +53,37 @@ class Comment(snscrape.base.Item):
 
 	created = snscrape.base._DeprecatedProperty('created', lambda self: self.date, 'date')
 
+	@functools.cached_property
+	def numericId(self):
+		'''The decoded ID without the prefix, which orders the items of one type by creation'''
+
+		return _decode_id(self.id)[1]
+
 	def __str__(self):
 		return self.url
 
 
-def _cmp_id(id1, id2):
-	'''Compare two Reddit IDs. Returns -1 if id1 is less than id2, 0 if they are equal, and 1 if id1 is greater than id2.
+_ID_PATTERN = re.compile(r'^(?:(t[0-9])_)?([0-9a-z]+)$')
+
 
-	id1 and id2 may have prefixes like t1_, but if included, they must be present on both and equal.'''
+def _decode_id(id_):
+	'''Split a Reddit ID with an optional type prefix like t1_ into the prefix (without the underscore, or None) and the integer value of the base36 ID'''
 
-	if id1.startswith('t') and '_' in id1:
-		prefix, id1 = id1.split('_', 1)
-		if not id2.startswith(f'{prefix}_'):
-			raise ValueError('id2 must have the same prefix as id1')
-		_, id2 = id2.split('_', 1)
-	if id1.strip(string.ascii_lowercase + string.digits) != '':
-		raise ValueError('invalid characters in id1')
-	if id2.strip(string.ascii_lowercase + string.digits) != '':
-		raise ValueError('invalid characters in id2')
-	if len(id1) < len(id2):
-		return -1
-	if len(id1) > len(id2):
-		return 1
-	if id1 < id2:
-		return -1
-	if id1 > id2:
-		return 1
-	return 0
+	if not (match := _ID_PATTERN.match(id_)):
+		raise ValueError(f'invalid Reddit ID: {id_!r}')
+	return match.group(1), int(match.group(2), 36)
 
 
 class _RedditPushshiftScraper(snscrape.base.Scraper):
+	_rateLimit = (1, 1) # Pushshift allows about one request per second; concurrent slices and scrapers share it, so concurrency only helps if this is raised with HostRateLimiter.set_limit (--rate-limit)
+
 	def __init__(self, **kwargs):
 		super().__init__(**kwargs)
 		self._headers = {'User-Agent': f'snscrape/{snscrape.version.__version__}'}
 
 	def _handle_rate_limiting(self, r):
 		if r.status_code == 429:
-			_logger.info('Got 429 response, sleeping')
-			time.sleep(10)
+			# The wait before the retry is up to the retry policy
 			return False, 'rate-limited'
 		if r.status_code != 200:
 			return False, 'non-200 status code'
@@ -94,7 +93,7 @@ class _RedditPushshiftScraper(snscrape.base.Scraper):
 		r = self._get(url, params = params, headers = self._headers, responseOkCallback = self._handle_rate_limiting)
 		if r.status_code != 200:
 			raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-		return r.json()
+		return snscrape.base._json_loads_response(r)
 
 	def _api_obj_to_item(self, d):
 		cls = Submission if 'title' in d else Comment
@@ -134,30 +133,62 @@ class _RedditPushshiftScraper(snscrape.base.Scraper):
 
 		return cls(**kwargs)
 
-	def _iter_api(self, url, params = None):
-		'''Iterate through the Pushshift API using the 'until' parameter and yield the items.'''
+	def _iter_api(self, url, params = None, checkpointStream = None):
+		'''Iterate through the Pushshift API using the 'until' parameter and yield the items.
+
+		If checkpointStream is set and the scraper has a checkpoint, the pagination state of each page is recorded and pagination resumes from the stored state.
+		The caller is responsible for passing the items through _checkpoint_track with the same stream name.'''
 		lowestIdSeen = None
 		if params is None:
 			params = {}
+		checkpoint = self._checkpoint if checkpointStream is not None else None
+		if checkpoint is not None:
+			if checkpoint.is_done(checkpointStream):
+				return
+			if (state := checkpoint.resume(checkpointStream, {'url': url, 'params': params})) is not None:
+				lowestIdSeen = state['lowestIdSeen']
+				params.pop('until', None)
+				if state['until'] is not None:
+					params['until'] = state['until']
 		while True:
 			obj = self._get_api(url, params = params)
-			if not obj['data'] or (lowestIdSeen is not None and all(_cmp_id(d['id'], lowestIdSeen) >= 0 for d in obj['data'])): # end of pagination
+			ids = [_decode_id(d['id'])[1] for d in obj['data']]
+			if not ids or (lowestIdSeen is not None and min(ids) >= lowestIdSeen): # end of pagination
 				break
-			for d in obj['data']:
-				if lowestIdSeen is None or _cmp_id(d['id'], lowestIdSeen) == -1:
+			if checkpoint is not None:
+				checkpoint.start_page(checkpointStream, {'until': params.get('until'), 'lowestIdSeen': lowestIdSeen})
+			for d, id_ in zip(obj['data'], ids):
+				if lowestIdSeen is None or id_ < lowestIdSeen:
 					yield self._api_obj_to_item(d)
-					lowestIdSeen = d['id']
+					lowestIdSeen = id_
 			params['until'] = obj["data"][-1]["created_utc"] + 1
+		if checkpoint is not None:
+			checkpoint.finish(checkpointStream)
 
 
 class _RedditPushshiftSearchScraper(_RedditPushshiftScraper):
-	def __init__(self, name, *, submissions = True, comments = True, before = None, after = None, **kwargs):
+	_supportsCheckpoint = True
+
+	def __init__(self, name, *, submissions = True, comments = True, before = None, after = None, concurrency = 1, sliceDuration = None, **kwargs):
+		if concurrency < 1:
+			raise ValueError('concurrency must be positive')
+		if sliceDuration is not None and sliceDuration < 1:
+			raise ValueError('sliceDuration must be positive')
+		if (concurrency > 1 or sliceDuration is not None) and after is None:
+			raise ValueError('Time slices require after')
+		if (concurrency > 1 or sliceDuration is not None) and kwargs.get('checkpoint') is not None:
+			raise ValueError('Checkpoints are not supported with time slices')
+		if concurrency > 1 and kwargs.get('session') is None:
+			# Enough pooled connections for all workers
+			kwargs['session'] = snscrape.base._new_session(poolSize = concurrency)
 		super().__init__(**kwargs)
 		self._name = name
 		self._submissions = submissions
 		self._comments = comments
 		self._before = before
 		self._after = after
+		self._concurrency = concurrency
+		self._sliceDuration = sliceDuration
 
 		if not type(self)._validationFunc(self._name):
 			raise ValueError(f'invalid {type(self).name.split("-", 1)[1]} name')
@@ -165,58 +196,52 @@ class _RedditPushshiftSearchScraper(_RedditPushshiftScraper):
 			raise ValueError('At least one of submissions and comments must be True')
 
 	def _iter_api_submissions_and_comments(self, params: dict):
-		# Retrieve both submissions and comments, interleave the results to get a reverse-chronological order
 		params['limit'] = '1000'
-		if self._before is not None:
-			params['until'] = self._before
-		if self._after is not None:
-			params['since'] = self._after
+		if self._concurrency == 1 and self._sliceDuration is None:
+			if self._before is not None:
+				params['until'] = self._before
+			if self._after is not None:
+				params['since'] = self._after
+			yield from self._merge_submissions_and_comments(params, checkpoint = True)
+			return
 
+		# The interval is split into time slices, newest first, which are fetched by up to concurrency workers at a time and yielded in order, giving the same reverse-chronological order as a single scrape.
+		# Interior slice boundaries are requested with a second of overlap so that it does not matter whether Pushshift treats since and until as inclusive; the items are then filtered to the slice.
+		before = self._before if self._before is not None else int(time.time()) + 1
+		if before <= self._after:
+			return
+		duration = self._sliceDuration or -(-(before - self._after) // (4 * self._concurrency))
+		bounds = list(range(before, self._after, -duration)) + [self._after]
+		slices = [(since, until, since == self._after, until == before) for until, since in zip(bounds, bounds[1:])]
+		yield from snscrape.utils.chain_concurrently((self._iter_slice(params, *slice_) for slice_ in slices), self._concurrency)
+
+	def _iter_slice(self, params, since, until, isOldest, isNewest):
+		_logger.info(f'Scraping time slice from {since} to {until}')
+		params = params.copy()
+		params['since'] = since if isOldest else since - 1
+		params['until'] = until if isNewest else until + 1
+		for item in self._merge_submissions_and_comments(params):
+			timestamp = item.date.timestamp()
+			if (isOldest or timestamp >= since) and (isNewest or timestamp < until):
+				yield item
+
+	def _merge_submissions_and_comments(self, params, checkpoint = False):
+		# Retrieve both submissions and comments, interleave the results to get a reverse-chronological order
 		if self._submissions:
-			submissionsIter = self._iter_api('https://api.pushshift.io/reddit/search/submission', params.copy()) # Pass copies to prevent the two iterators from messing each other up by using the same dict
+			submissionsIter = self._iter_api('https://api.pushshift.io/reddit/search/submission', params.copy(), checkpointStream = 'submissions' if checkpoint else None) # Pass copies to prevent the two iterators from messing each other up by using the same dict
 		else:
 			submissionsIter = iter(())
 		if self._comments:
-			commentsIter = self._iter_api('https://api.pushshift.io/reddit/search/comment', params.copy())
+			commentsIter = self._iter_api('https://api.pushshift.io/reddit/search/comment', params.copy(), checkpointStream = 'comments' if checkpoint else None)
 		else:
 			commentsIter = iter(())
 
-		try:
-			tipSubmission = next(submissionsIter)
-		except StopIteration:
-			# There are no submissions, just yield comments and return
-			yield from commentsIter
-			return
-		try:
-			tipComment = next(commentsIter)
-		except StopIteration:
-			# There are no comments, just yield submissions and return
-			yield tipSubmission
-			yield from submissionsIter
-			return
-
-		while True:
-			# Return newer first; if both have the same creation datetime, return the comment first
-			if tipSubmission.date > tipComment.date:
-				yield tipSubmission
-				try:
-					tipSubmission = next(submissionsIter)
-				except StopIteration:
-					# Reached the end of submissions, just yield the remaining comments and stop
-					yield tipComment
-					yield from commentsIter
-					break
-			else:
-				yield tipComment
-				try:
-					tipComment = next(commentsIter)
-				except StopIteration:
-					yield tipSubmission
-					yield from submissionsIter
-					break
+		# Newer first; if both have the same creation datetime, the comment comes first
+		yield from snscrape.utils.merge(commentsIter, submissionsIter, key = lambda item: item.date, reverse = True)
 
 	def get_items(self):
-		yield from self._iter_api_submissions_and_comments({type(self)._apiField: self._name})
+		items = self._iter_api_submissions_and_comments({type(self)._apiField: self._name})
+		yield from self._checkpoint_track(items, lambda item: 'submissions' if isinstance(item, Submission) else 'comments')
 
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
@@ -224,13 +249,15 @@ class _RedditPushshiftSearchScraper(_RedditPushshiftScraper):
 		subparser.add_argument('--no-comments', dest = 'noComments', action = 'store_true', default = False, help = 'Don\'t list comments')
 		subparser.add_argument('--before', metavar = 'TIMESTAMP', type = int, help = 'Fetch results before a Unix timestamp')
 		subparser.add_argument('--after', metavar = 'TIMESTAMP', type = int, help = 'Fetch results after a Unix timestamp')
+		subparser.add_argument('--concurrency', type = snscrape.utils.parse_positive_int, default = 1, metavar = 'N', help = 'Split the interval between --after and --before (or now) into time slices and fetch up to N of them concurrently. All requests are limited to one per second by default; raise that with e.g. --rate-limit api.pushshift.io:N for this to speed up the scrape.')
+		subparser.add_argument('--slice-duration', dest = 'sliceDuration', type = snscrape.utils.parse_positive_int, default = None, metavar = 'SECONDS', help = 'Length of the time slices (default: a quarter of the interval divided by --concurrency)')
 		name = cls.name.split('-', 1)[1]
 		subparser.add_argument(name, type = snscrape.utils.nonempty_string_arg(name))
 
 	@classmethod
 	def _cli_from_args(cls, args):
 		name = cls.name.split('-', 1)[1]
-		return cls._cli_construct(args, getattr(args, name), submissions = not args.noSubmissions, comments = not args.noComments, before = args.before, after = args.after)
+		return cls._cli_construct(args, getattr(args, name), submissions = not args.noSubmissions, comments = not args.noComments, before = args.before, after = args.after, concurrency = args.concurrency, sliceDuration = args.sliceDuration)
 
 
 class RedditUserScraper(_RedditPushshiftSearchScraper):
@@ -255,7 +282,11 @@ class RedditSubmissionScraper(_RedditPushshiftScraper):
 	name = 'reddit-submission'
 
 	def __init__(self, submissionId, **kwargs):
-		if (submissionId[3:] if submissionId.startswith('t3_') else submissionId).strip(string.ascii_lowercase + string.digits) != '':
+		try:
+			prefix, self._numericId = _decode_id(submissionId)
+		except ValueError:
+			raise ValueError('invalid submissionId') from None
+		if prefix not in (None, 't3'):
 			raise ValueError('invalid submissionId')
 		super().__init__(**kwargs)
 		self._submissionId = submissionId
@@ -269,7 +300,7 @@ class RedditSubmissionScraper(_RedditPushshiftScraper):
 		yield self._api_obj_to_item(obj['data'][0])
 
 		# Upstream bug: link_id must be provided in decimal https://old.reddit.com/r/pushshift/comments/zkggt0/update_on_colo_switchover_bug_fixes_reindexing/
-		yield from self._iter_api('https://api.pushshift.io/reddit/search/comment', {'link_id': int(self._submissionId, 36), 'limit': 1000})
+		yield from self._iter_api('https://api.pushshift.io/reddit/search/comment', {'link_id': self._numericId, 'limit': 1000})
 
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
@@ -5,6 +5,8 @@ import bs4
 import dataclasses
 import datetime
 import logging
+import lxml.etree
+import lxml.html
 import re
 import snscrape.base
 import snscrape.utils
@@ -14,6 +16,32 @@ import urllib.parse
 
 _logger = logging.getLogger(__name__)
 _SINGLE_MEDIA_LINK_PATTERN = re.compile(r'^https://t\.me/[^/]+/\d+\?single$')
+_lxmlXPaths = {}
+
+
+def _lxml_find_all(element, tag, *classes, first = False):
+	'''Equivalent of bs4's element.find_all(tag, class_ = ...) or, with first, element.find(...) for lxml elements, requiring all of classes'''
+
+	key = (tag, classes, first)
+	if (xpath := _lxmlXPaths.get(key)) is None:
+		predicates = ''.join(f'[contains(concat(" ", normalize-space(@class), " "), " {class_} ")]' for class_ in classes)
+		expr = f'.//{tag}{predicates}'
+		if first:
+			expr = f'({expr})[1]'
+		xpath = _lxmlXPaths[key] = lxml.etree.XPath(expr)
+	return xpath(element)
+
+
+def _lxml_find(element, tag, *classes):
+	return found[0] if (found := _lxml_find_all(element, tag, *classes, first = True)) else None
+
+
+def _lxml_classes(element):
+	return element.get('class', '').split()
+
+
+def _lxml_text(element):
+	return str(element.text_content())
 
 
 @dataclasses.dataclass
@@ -68,18 +96,26 @@ class TelegramChannel(snscrape.base.Item):
 class TelegramChannelScraper(snscrape.base.Scraper):
 	name = 'telegram-channel'
 
-	def __init__(self, name, info = False, postid = None, postn = 1, **kwargs):
+	def __init__(self, name, info = False, postid = None, postn = 1, parser = 'bs4', concurrency = 1, **kwargs):
+		if concurrency < 1:
+			raise ValueError('concurrency must be positive')
+		if concurrency > 1 and kwargs.get('session') is None:
+			# Enough pooled connections for all workers
+			kwargs['session'] = snscrape.base._new_session(poolSize = concurrency)
 		super().__init__(**kwargs)
+		if parser not in ('bs4', 'lxml'):
+			raise ValueError("parser must be 'bs4' or 'lxml'")
 		self._name = name
 		self._headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/101.0.4044.138 Safari/537.36'}
 		self._initialPage = None
 		self._initialPageSoup = None
-		self._idx = 0
 		self.info = info
 		self.postid = postid
-		self.postn = postn
+		self.postn = postn if postn is not None else 1
+		self._parser = parser
+		self._concurrency = concurrency
 
-	def _initial_page(self):
+	def _initial_response(self):
 		if self._initialPage is None:
 			if self.postid is not None:
 				r = self._get(f'https://t.me/{self._name}/{self.postid}?embed=1&mode=tme', headers = self._headers)
@@ -87,8 +123,28 @@ class TelegramChannelScraper(snscrape.base.Scraper):
 				r = self._get(f'https://t.me/s/{self._name}', headers = self._headers)
 			if r.status_code != 200:
 				raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-			self._initialPage, self._initialPageSoup = r, bs4.BeautifulSoup(r.text, 'lxml')
-		return self._initialPage, self._initialPageSoup
+			self._initialPage = r
+		return self._initialPage
+
+	def _initial_page(self):
+		r = self._initial_response()
+		if self._initialPageSoup is None:
+			self._initialPageSoup = bs4.BeautifulSoup(r.text, 'lxml')
+		return r, self._initialPageSoup
+
+	def _page_to_items(self, r):
+		'''Return an iterator over the posts on the page and the href of the link to the next page (or None)'''
+
+		if self._parser == 'lxml':
+			root = lxml.html.fromstring(r.text)
+			pageLink = next((a for a in _lxml_find_all(root, 'a', 'tme_messages_more') if a.get('data-before') is not None), None)
+			return self._lxml_to_items(root, r.url), pageLink.get('href') if pageLink is not None else None
+		if r is self._initialPage:
+			_, soup = self._initial_page()
+		else:
+			soup = bs4.BeautifulSoup(r.text, 'lxml')
+		pageLink = soup.find('a', attrs = {'class': 'tme_messages_more', 'data-before': True})
+		return self._soup_to_items(soup, r.url), pageLink['href'] if pageLink else None
 
 	def _soup_to_items(self, soup, pageUrl, onlyUsername = False):
 		posts = soup.find_all('div', attrs = {'class': 'tgme_widget_message', 'data-post': True})
@@ -220,35 +276,173 @@ class TelegramChannelScraper(snscrape.base.Scraper):
 				linkPreview = LinkPreview(**kwargs)
 			yield TelegramPost(url = url, date = date, content = content, outlinks = outlinks, views = views, user = user, author = author, owner = owner, forward_from = forward_from, forward_url = forward_url, photos = photos, videos = videos, reply = reply, linkPreview = linkPreview)
 
+	def _lxml_to_items(self, root, pageUrl):
+		# A port of _soup_to_items to lxml.html and XPath, which avoids building a BeautifulSoup tree. Both must produce identical posts; benchmarks/parsers.py checks the parity.
+		posts = [post for post in _lxml_find_all(root, 'div', 'tgme_widget_message') if post.get('data-post') is not None]
+		for post in reversed(posts):
+			footerDiv = _lxml_find(post, 'div', 'tgme_widget_message_footer')
+			dateDiv = _lxml_find(footerDiv, 'a', 'tgme_widget_message_date')
+			rawUrl = dateDiv.attrib['href']
+			if not rawUrl.startswith('https://t.me/') or sum(x == '/' for x in rawUrl) != 4 or rawUrl.rsplit('/', 1)[1].strip('0123456789') != '':
+				_logger.warning(f'Possibly incorrect URL: {rawUrl!r}')
+			if (viewDiv := _lxml_find(footerDiv, 'span', 'tgme_widget_message_views')) is not None:
+				views = _lxml_text(viewDiv)
+			else:
+				views = '0'
+			url = rawUrl.replace('//t.me/', '//t.me/s/')
+			timeElement = next(t for t in _lxml_find_all(dateDiv, 'time') if t.get('datetime') is not None)
+			date = datetime.datetime.strptime(timeElement.get('datetime').replace('-', '', 2).replace(':', ''), '%Y%m%dT%H%M%S%z')
+			if (reply := _lxml_find(post, 'a', 'tgme_widget_message_reply')) is not None:
+				_ru = reply.get('href')
+				if (_rt := _lxml_find(reply, 'div', 'tgme_widget_message_text')) is not None:
+					_rt = _lxml_text(_rt)
+				reply = [_ru, _rt]
+			else:
+				reply = []
+			message = _lxml_find(post, 'div', 'tgme_widget_message_text', 'js-message_text')
+			user = None
+			author = None
+			owner = None
+			forward_from = None
+			forward_url = None
+			photos = []
+			videos = []
+			outlinks = []
+			content = _lxml_text(message) if message is not None else None
+			for link in _lxml_find_all(post, 'a'):
+				parent = link.getparent()
+				parentClasses = _lxml_classes(parent)
+				if 'tgme_widget_message_user' in parentClasses:
+					user = link.attrib['href']
+					continue
+				if 'tgme_widget_message_author' in parentClasses:
+					if (_span := _lxml_find(link, 'span')) is not None:
+						owner = _lxml_text(_span)
+					if (_span := _lxml_find(parent, 'span')) is not None:
+						author = _lxml_text(_span)
+					else:
+						author = owner
+					continue
+				if 'tgme_widget_message_forwarded_from' in parentClasses:
+					forward_url = link.attrib['href']
+					if (_span := _lxml_find(link, 'span')) is not None:
+						forward_from = _lxml_text(_span)
+					continue
+				if 'tgme_widget_message_photo_wrap' in _lxml_classes(link):
+					_style = link.get('style')
+					_photo = re.sub(r".*url\('(http.*)'\)", r'\1', _style)
+					photos.append(_photo)
+					continue
+				if (_videos := _lxml_find(link, 'div', 'tgme_widget_message_video_wrap')) is not None:
+					if (_video := _lxml_find(_videos, 'video')) is not None:
+						_video = _video.get('src')
+						videos.append(_video)
+						continue
+				if (_videos := _lxml_find(link, 'i', 'tgme_widget_message_video_thumb')) is not None:
+					_style = _videos.get('style')
+					_video = re.sub(r".*url\('(http.*)'\)", r'\1', _style)
+					photos.append(_video)
+				if 'message_media_not_supported' in parentClasses:
+					_label = _lxml_find(parent, 'div', 'message_media_not_supported_label')
+					if _label is not None and not content:
+						content = _lxml_text(_label)
+					continue
+				if 'tgme_widget_message_poll' in parentClasses:
+					_poll_question = ''
+					if (_label := _lxml_find(parent, 'div', 'tgme_widget_message_poll_question')) is not None:
+						_poll_question = _lxml_text(_label)
+					_poll_options = [_poll_question]
+					for _label in _lxml_find_all(link, 'div', 'tgme_widget_message_poll_option'):
+						_percent = _lxml_find(_label, 'div', 'tgme_widget_message_poll_option_percent')
+						_value = _lxml_find(_label, 'div', 'tgme_widget_message_poll_option_text')
+						if _percent is not None and _value is not None:
+							_poll_options.append(f"{_lxml_text(_percent)}: {_lxml_text(_value)}")
+					if (_votes := _lxml_find(link, 'div', 'tgme_widget_message_poll_votes')) is not None:
+						_poll_options.append(_lxml_text(_votes))
+					if not content:
+						content = "\n".join(_poll_options)
+				href = link.attrib['href']
+				if href == rawUrl or href == url:
+					# Generic filter of links to the post itself, catches videos, photos, and the date link
+					continue
+				if _SINGLE_MEDIA_LINK_PATTERN.match(href):
+					# Individual photo or video link
+					continue
+				if 'core.telegram.org/widgets' in href:
+					continue
+				href = urllib.parse.urljoin(pageUrl, href)
+				if href not in outlinks:
+					outlinks.append(href)
+			for link in _lxml_find_all(post, 'i', 'tgme_widget_message_sticker'):
+				photos.append(link.get('data-webp'))
+			for link in _lxml_find_all(post, 'video'):
+				if 'tgme_widget_message_videosticker' in _lxml_classes(link.getparent()):
+					videos.append(link.get('src'))
+			linkPreview = None
+			if (linkPreviewA := _lxml_find(post, 'a', 'tgme_widget_message_link_preview')) is not None:
+				kwargs = {}
+				kwargs['href'] = urllib.parse.urljoin(pageUrl, linkPreviewA.attrib['href'])
+				if (siteNameDiv := _lxml_find(linkPreviewA, 'div', 'link_preview_site_name')) is not None:
+					kwargs['siteName'] = _lxml_text(siteNameDiv)
+				if (titleDiv := _lxml_find(linkPreviewA, 'div', 'link_preview_title')) is not None:
+					kwargs['title'] = _lxml_text(titleDiv)
+				if (descriptionDiv := _lxml_find(linkPreviewA, 'div', 'link_preview_description')) is not None:
+					kwargs['description'] = _lxml_text(descriptionDiv)
+				if (imageI := _lxml_find(linkPreviewA, 'i', 'link_preview_image')) is not None:
+					if imageI.attrib['style'].startswith("background-image:url('"):
+						kwargs['image'] = imageI.attrib['style'][22 : imageI.attrib['style'].index("'", 22)]
+					else:
+						_logger.warning(f'Could not process link preview image on {url}')
+				elif (imageI := _lxml_find(linkPreviewA, 'i', 'link_preview_right_image')) is not None:
+					if imageI.attrib['style'].startswith("background-image:url('"):
+						kwargs['image'] = imageI.attrib['style'][22 : imageI.attrib['style'].index("'", 22)]
+					else:
+						_logger.warning(f'Could not process link preview right image on {url}')
+				linkPreview = LinkPreview(**kwargs)
+			yield TelegramPost(url = url, date = date, content = content, outlinks = outlinks, views = views, user = user, author = author, owner = owner, forward_from = forward_from, forward_url = forward_url, photos = photos, videos = videos, reply = reply, linkPreview = linkPreview)
+
 	def get_items(self):
 		if self.info:
 			yield self._get_entity()
 			return
-		r, soup = self._initial_page()
-		if '/s/' not in r.url and self.postid is None:
+		if self.postid is not None:
+			yield from self._get_posts_by_id()
+			return
+		r = self._initial_response()
+		if '/s/' not in r.url:
 			_logger.warning('No public post list for this user')
 			return
 		while True:
-			yield from self._soup_to_items(soup, r.url)
-			pageLink = soup.find('a', attrs = {'class': 'tme_messages_more', 'data-before': True})
-			# check if we are in postid mode
-			self._idx += 1
-			if self.postid is not None:
-				if self.postn - self._idx > 0:
-					r = self._get(f'https://t.me/{self._name}/{self.postid - self._idx}?embed=1&mode=tme', headers = self._headers)
-					if r.status_code != 200:
-						raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-					soup = bs4.BeautifulSoup(r.text, 'lxml')
-					continue
-				else:
-					break
+			items, pageLink = self._page_to_items(r)
+			yield from items
 			if not pageLink:
 				break
-			nextPageUrl = urllib.parse.urljoin(r.url, pageLink['href'])
+			nextPageUrl = urllib.parse.urljoin(r.url, pageLink)
 			r = self._get(nextPageUrl, headers = self._headers)
 			if r.status_code != 200:
 				raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-			soup = bs4.BeautifulSoup(r.text, 'lxml')
+
+	def _get_posts_by_id(self):
+		# The embed pages of postid, postid - 1, ... are fetched and parsed by up to concurrency workers at a time, and the posts are yielded in that (descending) order.
+		# The number of workers is also the limit on simultaneous requests to t.me.
+		postIds = range(self.postid, max(self.postid - self.postn, 0), -1)
+		if self._concurrency == 1:
+			for postId in postIds:
+				yield from self._get_post_by_id(postId)
+		else:
+			yield from snscrape.utils.chain_concurrently((self._get_post_by_id(postId) for postId in postIds), self._concurrency)
+
+	def _get_post_by_id(self, postId):
+		if postId == self.postid and self._initialPage is not None:
+			r = self._initialPage
+		else:
+			r = self._get(f'https://t.me/{self._name}/{postId}?embed=1&mode=tme', headers = self._headers)
+		if r.status_code != 200:
+			_logger.warning(f'Skipping post {postId}: got status code {r.status_code}')
+			return
+		# Deleted posts have a 'Post not found' page without any posts.
+		items, _ = self._page_to_items(r)
+		yield from items
 
 	def _get_entity(self):
 		kwargs = {}
@@ -307,7 +501,9 @@ class TelegramChannelScraper(snscrape.base.Scraper):
 		subparser.add_argument('--info', action = 'store_true', default = False, help = 'only get channel info')
 		subparser.add_argument('--postid', type = int, default = None, help = 'post id to start fetch')
 		subparser.add_argument('--postn', type = int, default = None, help = 'number of posts to fetch')
+		subparser.add_argument('--concurrency', type = snscrape.utils.parse_positive_int, default = 1, metavar = 'N', help = 'With --postid, fetch up to N posts concurrently')
+		subparser.add_argument('--parser', choices = ('bs4', 'lxml'), default = 'bs4', help = 'HTML parsing backend for the post pages; lxml is considerably faster')
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, args.channel, info = args.info, postid = args.postid, postn = args.postn)
+		return cls._cli_construct(args, args.channel, info = args.info, postid = args.postid, postn = args.postn, parser = args.parser, concurrency = args.concurrency)
@@ -51,6 +51,7 @@ __all__ = [
 	'Community',
 	'Trend',
 	'GuestTokenManager',
+	'GuestTokenPool',
 	'TwitterSearchScraperMode',
 	'TwitterSearchScraper',
 	'TwitterUserScraper',
@@ -67,6 +68,7 @@ __all__ = [
 
 import base64
 import collections
+import concurrent.futures
 import copy
 import dataclasses
 import datetime
@@ -79,11 +81,13 @@ import json
 import random
 import logging
 import os
+import queue
 import re
 import requests.adapters
 import snscrape.base
 import snscrape.utils
 import string
+import threading
 import time
 import typing
 import urllib.parse
@@ -94,11 +98,17 @@ import warnings
 _logger = logging.getLogger(__name__)
 _API_AUTHORIZATION_HEADER = 'Bearer AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs=1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA'
 _globalGuestTokenManager = None
+_cliGuestTokenManager = None
 _GUEST_TOKEN_VALIDITY = 10800
+_SEARCH_TIME_BOUND_PATTERN = re.compile(r'(?<!\S)(since|until|since_time|until_time):(\S+)(?!\S)')
+_SEARCH_EPOCH = 1142899200 # 2006-03-21, i.e. before the first tweet
+_MIN_SHARD_SECONDS = 60
+_INITIAL_SHARD_SECONDS = 86400
+_USER_CACHE_KEY_FIELDS = ('id', 'id_str', 'screen_name', 'name', 'description', 'verified', 'created_at', 'followers_count', 'friends_count', 'statuses_count', 'favourites_count', 'listed_count', 'media_count', 'location', 'protected', 'url', 'profile_image_url_https', 'profile_banner_url', 'is_blue_verified', 'verified_type')
 _CIPHERS_CHROME = 'TLS_AES_128_GCM_SHA256:TLS_AES_256_GCM_SHA384:TLS_CHACHA20_POLY1305_SHA256:ECDHE-ECDSA-AES128-GCM-SHA256:ECDHE-RSA-AES128-GCM-SHA256:ECDHE-ECDSA-AES256-GCM-SHA384:ECDHE-RSA-AES256-GCM-SHA384:ECDHE-ECDSA-CHACHA20-POLY1305:ECDHE-RSA-CHACHA20-POLY1305:ECDHE-RSA-AES128-SHA:ECDHE-RSA-AES256-SHA:AES128-GCM-SHA256:AES256-GCM-SHA384:AES128-SHA:AES256-SHA'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Tweet(snscrape.base.Item):
 	url: str
 	date: datetime.datetime
@@ -144,7 +154,7 @@ class Tweet(snscrape.base.Item):
 		return self.url
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class TextLink:
 	text: typing.Optional[str]
 	url: str
@@ -153,24 +163,24 @@ class TextLink:
 
 
 class Medium:
-	pass
+	__slots__ = ()
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Photo(Medium):
 	previewUrl: str
 	fullUrl: str
 	altText: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class VideoVariant:
 	url: str
 	contentType: typing.Optional[str]
 	bitrate: typing.Optional[int]
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Video(Medium):
 	thumbnailUrl: str
 	variants: typing.List[VideoVariant]
@@ -179,20 +189,20 @@ class Video(Medium):
 	altText: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Gif(Medium):
 	thumbnailUrl: str
 	variants: typing.List[VideoVariant]
 	altText: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Coordinates:
 	longitude: float
 	latitude: float
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Place:
 	id: str
 	fullName: str
@@ -203,10 +213,10 @@ class Place:
 
 
 class Card:
-	pass
+	__slots__ = ()
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class SummaryCard(Card):
 	title: str
 	url: str
@@ -216,12 +226,12 @@ class SummaryCard(Card):
 	creatorUser: typing.Optional['User'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class AppCard(SummaryCard):
 	pass
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PollCard(Card):
 	options: typing.List['PollOption']
 	endDate: datetime.datetime
@@ -231,13 +241,13 @@ class PollCard(Card):
 	medium: typing.Optional[Medium] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PollOption:
 	label: str
 	count: typing.Optional[int] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PlayerCard(Card):
 	title: str
 	url: str
@@ -246,7 +256,7 @@ class PlayerCard(Card):
 	siteUser: typing.Optional['User'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PromoConvoCard(Card):
 	actions: typing.List['PromoConvoAction']
 	thankYouText: str
@@ -256,13 +266,13 @@ class PromoConvoCard(Card):
 	cover: typing.Optional['Photo'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PromoConvoAction:
 	label: str
 	tweet: str
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class BroadcastCard(Card):
 	id: str
 	url: str
@@ -274,7 +284,7 @@ class BroadcastCard(Card):
 	siteUser: typing.Optional['User'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class PeriscopeBroadcastCard(Card):
 	id: str
 	url: str
@@ -288,12 +298,12 @@ class PeriscopeBroadcastCard(Card):
 	siteUser: typing.Optional['User'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class EventCard(Card):
 	event: 'Event'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Event:
 	id: int
 	category: str
@@ -306,7 +316,7 @@ class Event:
 		return f'https://twitter.com/i/events/{self.id}'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class NewsletterCard(Card):
 	title: str
 	description: str
@@ -316,7 +326,7 @@ class NewsletterCard(Card):
 	imageUrl: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class NewsletterIssueCard(Card):
 	newsletterTitle: str
 	newsletterDescription: str
@@ -328,13 +338,13 @@ class NewsletterIssueCard(Card):
 	imageUrl: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class AmplifyCard(Card):
 	id: str
 	video: Video
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class AppPlayerCard(Card):
 	title: str
 	video: Video
@@ -343,13 +353,13 @@ class AppPlayerCard(Card):
 	siteUser: typing.Optional['User'] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class SpacesCard(Card):
 	url: str
 	id: str
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class MessageMeCard(Card):
 	recipient: 'User'
 	url: str
@@ -362,7 +372,7 @@ UnifiedCardMediumKey = str
 UnifiedCardAppKey = str
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCard(Card):
 	componentObjects: typing.Dict[UnifiedCardComponentKey, 'UnifiedCardComponentObject']
 	destinations: typing.Dict[UnifiedCardDestinationKey, 'UnifiedCardDestination']
@@ -379,50 +389,50 @@ class UnifiedCard(Card):
 
 
 class UnifiedCardComponentObject:
-	pass
+	__slots__ = ()
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardDetailComponentObject(UnifiedCardComponentObject):
 	content: str
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardMediumComponentObject(UnifiedCardComponentObject):
 	mediumKey: UnifiedCardMediumKey
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardButtonGroupComponentObject(UnifiedCardComponentObject):
 	buttons: typing.List['UnifiedCardButton']
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardButton:
 	text: str
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardSwipeableMediaComponentObject(UnifiedCardComponentObject):
 	media: typing.List['UnifiedCardSwipeableMediaMedium']
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardSwipeableMediaMedium:
 	mediumKey: UnifiedCardMediumKey
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardAppStoreComponentObject(UnifiedCardComponentObject):
 	appKey: UnifiedCardAppKey
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardTwitterListDetailsComponentObject(UnifiedCardComponentObject):
 	name: str
 	memberCount: int
@@ -431,7 +441,7 @@ class UnifiedCardTwitterListDetailsComponentObject(UnifiedCardComponentObject):
 	destinationKey: UnifiedCardDestinationKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardTwitterCommunityDetailsComponentObject(UnifiedCardComponentObject):
 	name: str
 	theme: str
@@ -440,7 +450,7 @@ class UnifiedCardTwitterCommunityDetailsComponentObject(UnifiedCardComponentObje
 	membersFacepile: typing.Optional[typing.List['User']] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardDestination:
 	url: typing.Optional[str] = None
 	appKey: typing.Optional[UnifiedCardAppKey] = None
@@ -451,7 +461,7 @@ class UnifiedCardDestination:
 			raise ValueError('did not get exactly one of url and appKey')
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardApp:
 	type: str
 	id: str
@@ -471,33 +481,33 @@ class UnifiedCardApp:
 	hasInAppAds: typing.Optional[bool] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardSwipeableLayoutSlide:
 	mediumComponentKey: UnifiedCardComponentKey
 	componentKey: UnifiedCardComponentKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UnifiedCardCollectionLayoutSlide:
 	detailsComponentKey: UnifiedCardComponentKey
 	mediumComponentKey: UnifiedCardComponentKey
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Vibe:
 	text: str
 	imageUrl: str
 	imageDescription: str
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class EditState:
 	editTweetIds: typing.List[int]
 	editableUntilDate: datetime.datetime
 	editsRemaining: int
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class TweetRef(snscrape.base.Item):
 	'''A reference to a tweet for which no proper Tweet object could be produced from the data returned by Twitter'''
 
@@ -507,7 +517,7 @@ class TweetRef(snscrape.base.Item):
 		return f'https://twitter.com/i/web/status/{self.id}'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Tombstone(snscrape.base.Item):
 	'''A placeholder for a tweet that cannot be accessed'''
 
@@ -519,7 +529,7 @@ class Tombstone(snscrape.base.Item):
 		return f'https://twitter.com/i/web/status/{self.id}'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class User(snscrape.base.Item):
 	# Most fields can be None if they're not known.
 
@@ -559,7 +569,7 @@ class User(snscrape.base.Item):
 		return self.url
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UserLabel:
 	description: str
 	url: typing.Optional[str] = None
@@ -567,7 +577,7 @@ class UserLabel:
 	longDescription: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class UserRef:
 	id: int
 	text: typing.Optional[str] = None
@@ -577,7 +587,7 @@ class UserRef:
 		return f'https://twitter.com/i/user/{self.id}'
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Community(snscrape.base.Item):
 	id: int
 	name: str
@@ -593,7 +603,7 @@ class Community(snscrape.base.Item):
 	description: typing.Optional[str] = None
 
 
-@dataclasses.dataclass
+@snscrape.base._dataclass_with_slots
 class Trend(snscrape.base.Item):
 	name: str
 	domainContext: str
@@ -627,10 +637,132 @@ class GuestTokenManager:
 	def setTime(self):
 		return self._setTime
 
-	def reset(self, *, blockUntil = None):
+	def reset(self, *, blockUntil = None, token = None):
+		if token is not None and token != self._token:
+			# Already replaced, e.g. by another scraper sharing this manager
+			return
 		self._token = None
 		self._setTime = 0.0
 
+	def update(self, token, headers):
+		'''Called with the response headers of each API request made with `token`'''
+
+		pass
+
+	def refill(self, fetch):
+		'''Called by scrapers with a function that retrieves a new guest token; managers holding several tokens can use it to top up'''
+
+		pass
+
+
+@dataclasses.dataclass
+class _GuestTokenState:
+	setTime: float
+	uses: int = 0
+	remaining: typing.Optional[int] = None
+	resetTime: typing.Optional[int] = None
+	blockedUntil: typing.Optional[int] = None
+
+	def is_healthy(self, currentTime):
+		if self.setTime < currentTime - _GUEST_TOKEN_VALIDITY:
+			return False
+		if self.blockedUntil is not None and self.blockedUntil > currentTime:
+			return False
+		if self.remaining == 0 and self.resetTime is not None and self.resetTime > currentTime:
+			return False
+		return True
+
+
+class GuestTokenPool(GuestTokenManager):
+	'''A thread-safe guest token manager holding up to `size` tokens
+
+	Each request gets the least-used healthy token, where the rate limit state of each token is tracked from the x-rate-limit-* response headers.
+	A blocked or exhausted token only takes itself out of rotation rather than stalling every scraper sharing the manager.
+	When fewer than `size` healthy tokens are available, new ones are retrieved in the background.
+	'''
+
+	def __init__(self, size = 4):
+		super().__init__()
+		if size < 1:
+			raise ValueError('size must be positive')
+		self._size = size
+		self._tokens = {}
+		self._lock = threading.Lock()
+		self._refilling = False
+
+	def _healthy_tokens(self, currentTime):
+		# Must be called with the lock held
+		setTimeThreshold = currentTime - _GUEST_TOKEN_VALIDITY
+		self._tokens = {token: state for token, state in self._tokens.items() if state.setTime >= setTimeThreshold}
+		return [(state.uses, token) for token, state in self._tokens.items() if state.is_healthy(currentTime)]
+
+	@property
+	def token(self):
+		with self._lock:
+			healthy = self._healthy_tokens(time.time())
+			if not healthy:
+				return None
+			_, token = min(healthy)
+			state = self._tokens[token]
+			state.uses += 1
+			self._token, self._setTime = token, state.setTime
+			return token
+
+	@token.setter
+	def token(self, token):
+		with self._lock:
+			if token not in self._tokens:
+				self._tokens[token] = _GuestTokenState(setTime = time.time())
+			self._token, self._setTime = token, self._tokens[token].setTime
+
+	def reset(self, *, blockUntil = None, token = None):
+		with self._lock:
+			if token is None:
+				token = self._token
+			if token in self._tokens:
+				if blockUntil:
+					self._tokens[token].blockedUntil = blockUntil
+				else:
+					del self._tokens[token]
+			if token == self._token:
+				self._token = None
+				self._setTime = 0.0
+
+	def update(self, token, headers):
+		with self._lock:
+			if (state := self._tokens.get(token)) is None:
+				return
+			if headers.get('x-rate-limit-remaining', '').isdigit():
+				state.remaining = int(headers['x-rate-limit-remaining'])
+			if headers.get('x-rate-limit-reset', '').isdigit():
+				state.resetTime = int(headers['x-rate-limit-reset'])
+
+	def refill(self, fetch):
+		with self._lock:
+			if self._refilling or len(self._healthy_tokens(time.time())) >= self._size:
+				return
+			self._refilling = True
+		threading.Thread(target = self._refill, args = (fetch,), daemon = True).start()
+
+	def _refill(self, fetch):
+		try:
+			while True:
+				with self._lock:
+					if len(self._healthy_tokens(time.time())) >= self._size:
+						break
+				_logger.info('Retrieving additional guest token for pool')
+				token = fetch()
+				with self._lock:
+					if token in self._tokens:
+						# Twitter handed out a token the pool already has; try again later rather than hammering the endpoint
+						break
+					self._tokens[token] = _GuestTokenState(setTime = time.time())
+		except snscrape.base.ScraperException as e:
+			_logger.warning(f'Could not refill guest token pool: {e!s}')
+		finally:
+			with self._lock:
+				self._refilling = False
+
 
 class _CLIGuestTokenManager(GuestTokenManager):
 	def __init__(self):
@@ -736,7 +868,9 @@ class _CLIGuestTokenManager(GuestTokenManager):
 		self.token  # Implicitly reads from the file if necessary
 		return self._setTime
 
-	def reset(self, *, blockUntil = None):
+	def reset(self, *, blockUntil = None, token = None):
+		if token is not None and token != self._token:
+			return
 		self._blockedUntil = blockUntil
 		self._write()
 		super().reset()
@@ -756,7 +890,12 @@ class _TwitterAPIType(enum.Enum):
 
 
 class _TwitterAPIScraper(snscrape.base.Scraper):
-	def __init__(self, baseUrl, *, guestTokenManager = None, maxEmptyPages = 0, **kwargs):
+	_rateLimit = (5, 5) # Modest default pacing shared by shards and clones; the per-endpoint windows are handled through x-rate-limit-reset on 429s
+	_useRateLimitReset = True
+
+	def __init__(self, baseUrl, *, guestTokenManager = None, maxEmptyPages = 0, prefetchPages = 0, userCacheSize = 1000, **kwargs):
+		if prefetchPages < 0:
+			raise ValueError('prefetchPages must not be negative')
 		super().__init__(**kwargs)
 		self._baseUrl = baseUrl
 		if guestTokenManager is None:
@@ -766,6 +905,9 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 			guestTokenManager = _globalGuestTokenManager
 		self._guestTokenManager = guestTokenManager
 		self._maxEmptyPages = maxEmptyPages
+		self._prefetchPages = prefetchPages
+		self._userCacheSize = userCacheSize
+		self._userCache = collections.OrderedDict()
 		self._apiHeaders = {
 			'Authorization': _API_AUTHORIZATION_HEADER,
 			'Referer': self._baseUrl,
@@ -797,40 +939,61 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 			del self._apiHeaders['x-csrf-token']
 
 	def _ensure_guest_token(self, url = None):
-		if self._guestTokenManager.token is None:
+		# The token is only read once from the manager since managers holding several tokens may hand out a different one on each access.
+		token = self._guestTokenManager.token
+		if token is None:
 			_logger.info('Retrieving guest token')
 			r = self._get(self._baseUrl if url is None else url, responseOkCallback = self._check_guest_token_response)
 			if (match := re.search(r'document\.cookie = decodeURIComponent\("gt=(\d+); Max-Age=10800; Domain=\.twitter\.com; Path=/; Secure"\);', r.text)):
 				_logger.debug('Found guest token in HTML')
-				self._guestTokenManager.token = match.group(1)
+				token = match.group(1)
 			if 'gt' in r.cookies:
 				_logger.debug('Found guest token in cookies')
-				self._guestTokenManager.token = r.cookies['gt']
-			if not self._guestTokenManager.token:
+				token = r.cookies['gt']
+			if not token:
 				_logger.debug('No guest token in response')
-				_logger.info('Retrieving guest token via API')
-				r = self._post('https://api.twitter.com/1.1/guest/activate.json', data = b'', headers = self._apiHeaders, responseOkCallback = self._check_guest_token_response)
-				o = r.json()
-				if not o.get('guest_token'):
-					raise snscrape.base.ScraperException('Unable to retrieve guest token')
-				self._guestTokenManager.token = o['guest_token']
-			assert self._guestTokenManager.token
-		_logger.debug(f'Using guest token {self._guestTokenManager.token}')
-		self._session.cookies.set('gt', self._guestTokenManager.token, domain = '.twitter.com', path = '/', secure = True, expires = self._guestTokenManager.setTime + _GUEST_TOKEN_VALIDITY)
-		self._apiHeaders['x-guest-token'] = self._guestTokenManager.token
-
-	def _unset_guest_token(self, blockUntil):
-		self._guestTokenManager.reset(blockUntil = blockUntil)
+				token = self._activate_guest_token(self._apiHeaders)
+			assert token
+			self._guestTokenManager.token = token
+		_logger.debug(f'Using guest token {token}')
+		self._session.cookies.set('gt', token, domain = '.twitter.com', path = '/', secure = True, expires = self._guestTokenManager.setTime + _GUEST_TOKEN_VALIDITY)
+		self._apiHeaders['x-guest-token'] = token
+		self._guestTokenManager.refill(self._fetch_additional_guest_token)
+
+	def _activate_guest_token(self, headers):
+		_logger.info('Retrieving guest token via API')
+		r = self._post('https://api.twitter.com/1.1/guest/activate.json', data = b'', headers = headers, responseOkCallback = self._check_guest_token_response)
+		o = snscrape.base._json_loads_response(r)
+		if not o.get('guest_token'):
+			raise snscrape.base.ScraperException('Unable to retrieve guest token')
+		return o['guest_token']
+
+	def _fetch_additional_guest_token(self):
+		# May run in a background thread, so work on a copy of the headers and only use the API (which doesn't touch the session's gt cookie).
+		headers = dict(self._apiHeaders)
+		headers.pop('x-guest-token', None)
+		return self._activate_guest_token(headers)
+
+	def _unset_guest_token(self, blockUntil, token = None):
+		self._guestTokenManager.reset(blockUntil = blockUntil, token = token)
 		del self._session.cookies['gt']
 		del self._apiHeaders['x-guest-token']
 
+	def _use_rate_limit_reset(self, response):
+		# On a 429, _check_api_response has already switched to another guest token, so the reset time of the old one is irrelevant to the retry.
+		# Only wait for it if the retry reuses the same credentials, i.e. in authenticated mode or if the token did not change.
+		return response.request.headers.get('x-guest-token') == self._apiHeaders.get('x-guest-token')
+
 	def _check_api_response(self, r, apiType, instructionsPath):
+		token = r.request.headers.get('x-guest-token')
+		if token is not None:
+			self._guestTokenManager.update(token, r.headers)
 		if r.status_code in (403, 404, 429):
 			if r.status_code == 429 and r.headers.get('x-rate-limit-remaining', '') == '0' and 'x-rate-limit-reset' in r.headers:
 				blockUntil = min(int(r.headers['x-rate-limit-reset']), int(time.time()) + 900)
 			else:
 				blockUntil = int(time.time()) + 300
-			self._unset_guest_token(blockUntil)
+			self._unset_guest_token(blockUntil, token = token)
 			self._ensure_guest_token()
 			return False, f'blocked ({r.status_code})'
 		if r.headers.get('content-type', '').replace(' ', '') != 'application/json;charset=utf-8':
@@ -838,7 +1001,7 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 		if r.status_code != 200:
 			return False, f'non-200 status code ({r.status_code})'
 		try:
-			obj = r.json()
+			obj = snscrape.base._json_loads_response(r)
 		except json.JSONDecodeError as e:
 			return False, f'received invalid JSON from Twitter ({e})'
 		# Pass the already-parsed object outwards so it doesn't need to be decoded twice.
@@ -863,7 +1026,30 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 		r = self._get(endpoint, params = params, headers = self._apiHeaders, responseOkCallback = functools.partial(self._check_api_response, apiType = apiType, instructionsPath = instructionsPath))
 		return r._snscrapeObj
 
-	def _iter_api_data(self, endpoint, apiType, params, paginationParams = None, cursor = None, direction = _ScrollDirection.BOTTOM, instructionsPath = None):
+	def _iter_api_data(self, endpoint, apiType, params, paginationParams = None, cursor = None, direction = _ScrollDirection.BOTTOM, instructionsPath = None, checkpointStream = None):
+		# If prefetching is enabled, the following pages are retrieved in a background thread while the caller processes the current one.
+		# The lookahead is bounded by prefetchPages; the pagination logic itself is unchanged.
+		# If checkpointStream is set and the scraper has a checkpoint, the cursor of each page is recorded when the caller starts processing it, and pagination resumes from the stored cursor.
+		# The caller is responsible for passing the resulting items through _checkpoint_track with the same stream name.
+		checkpoint = self._checkpoint if checkpointStream is not None else None
+		if checkpoint is not None:
+			assert direction is _ScrollDirection.BOTTOM, 'checkpoints are only supported when scrolling to the bottom'
+			if checkpoint.is_done(checkpointStream):
+				return
+			storedCursor = checkpoint.resume(checkpointStream, {'endpoint': endpoint, 'variables': params['variables']})
+			if storedCursor is not None:
+				cursor = storedCursor
+		pages = self._iter_api_data_pages(endpoint, apiType, params, paginationParams = paginationParams, cursor = cursor, direction = direction, instructionsPath = instructionsPath)
+		if self._prefetchPages:
+			pages = snscrape.utils.prefetch(pages, self._prefetchPages)
+		for pageCursor, obj in pages:
+			if checkpoint is not None:
+				checkpoint.start_page(checkpointStream, pageCursor)
+			yield obj
+		if checkpoint is not None:
+			checkpoint.finish(checkpointStream)
+
+	def _iter_api_data_pages(self, endpoint, apiType, params, paginationParams = None, cursor = None, direction = _ScrollDirection.BOTTOM, instructionsPath = None):
 		# Iterate over endpoint with params/paginationParams, optionally starting from a cursor
 		# Handles guest token extraction using the baseUrl passed to __init__ etc.
 		# Order from params and paginationParams is preserved. To insert the cursor at a particular location, insert a 'cursor' key into paginationParams there (value is overwritten).
@@ -890,7 +1076,7 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 		while True:
 			_logger.info(f'Retrieving scroll page {cursor}')
 			obj = self._get_api_data(endpoint, apiType, reqParams, instructionsPath = instructionsPath)
-			yield obj
+			yield cursor, obj
 
 			# No data format test, just a hard and loud crash if anything's wrong :-)
 			newCursor = None
@@ -1310,7 +1496,7 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 				return
 			return MessageMeCard(**snscrape.utils.dict_map(bindingValues, {'recipient': 'recipient', 'card_url': 'url'}), buttonText = ctas[bindingValues['cta']])
 		elif cardName == 'unified_card':
-			o = json.loads(bindingValues['unified_card'])
+			o = snscrape.base._json_loads(bindingValues['unified_card'])
 			kwargs = {}
 			if 'type' in o:
 				unifiedCardType = o.get('type')
@@ -1612,6 +1798,27 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 		return ''.join(out)
 
 	def _user_to_user(self, user, id_ = None, **kwargs):
+		# Users are cached in an LRU keyed on the ID and all inputs of the conversion, so accounts appearing repeatedly (e.g. on a profile or in a thread) are only converted once and share one User object.
+		# Any change in the user data, e.g. of a counter, produces a different key.
+		if not self._userCacheSize:
+			return self._construct_user(user, id_ = id_, **kwargs)
+		key = (
+			id_,
+			tuple(user.get(k) for k in _USER_CACHE_KEY_FIELDS),
+			repr(user.get('entities')),
+			repr(user.get('affiliates_highlighted_label')),
+			tuple(sorted((k, repr(v)) for k, v in kwargs.items())),
+		)
+		if (cached := self._userCache.get(key)) is not None:
+			self._userCache.move_to_end(key)
+			return cached
+		userObj = self._construct_user(user, id_ = id_, **kwargs)
+		self._userCache[key] = userObj
+		if len(self._userCache) > self._userCacheSize:
+			self._userCache.popitem(last = False)
+		return userObj
+
+	def _construct_user(self, user, id_ = None, **kwargs):
 		kwargs['username'] = user['screen_name']
 		kwargs['id'] = id_ if id_ else user['id'] if 'id' in user else int(user['id_str'])
 		kwargs['displayname'] = user['name']
@@ -1693,7 +1900,11 @@ class _TwitterAPIScraper(snscrape.base.Scraper):
 
 	@classmethod
 	def _cli_construct(cls, argparseArgs, *args, **kwargs):
-		kwargs['guestTokenManager'] = _CLIGuestTokenManager()
+		# Shared by all scrapers in the process, e.g. in the CLI's batch mode
+		global _cliGuestTokenManager
+		if _cliGuestTokenManager is None:
+			_cliGuestTokenManager = _CLIGuestTokenManager()
+		kwargs['guestTokenManager'] = _cliGuestTokenManager
 		return super()._cli_construct(argparseArgs, *args, **kwargs)
 
 
@@ -1719,12 +1930,19 @@ class TwitterSearchScraperMode(enum.Enum):
 
 class TwitterSearchScraper(_TwitterAPIScraper):
 	name = 'twitter-search'
+	_supportsCheckpoint = True
 
-	def __init__(self, query, *, cursor = None, mode = TwitterSearchScraperMode.LIVE, top = None, maxEmptyPages = 20, auth = None, csrf = None, **kwargs):
+	def __init__(self, query, *, cursor = None, mode = TwitterSearchScraperMode.LIVE, top = None, maxEmptyPages = 20, auth = None, csrf = None, shards = 1, shardSize = 2000, **kwargs):
 		if not query.strip():
 			raise ValueError('empty query')
 		if mode not in tuple(TwitterSearchScraperMode):
 			raise ValueError('invalid mode, must be a TwitterSearchScraperMode')
+		if shards < 1:
+			raise ValueError('shards must be positive')
+		if shardSize < 1:
+			raise ValueError('shardSize must be positive')
+		if shards > 1 and cursor is not None:
+			raise ValueError('cursor cannot be combined with shards')
 		kwargs['maxEmptyPages'] = maxEmptyPages
 		super().__init__(baseUrl = 'https://twitter.com/search?' + urllib.parse.urlencode({'f': 'live', 'lang': 'en', 'q': query, 'src': 'spelling_expansion_revert_click'}), **kwargs)
 		self._query = query  # Note: may get replaced by subclasses when using user ID resolution
@@ -1736,8 +1954,14 @@ class TwitterSearchScraper(_TwitterAPIScraper):
 			warnings.warn(f'`top` argument is deprecated, use `mode = {replacement}` instead of `top = {bool(top)}`', snscrape.base.DeprecatedFeatureWarning, stacklevel = 2)
 			mode = TwitterSearchScraperMode.TOP if top else TwitterSearchScraperMode.LIVE
 		self._mode = mode
+		if shards > 1 and self._mode is not TwitterSearchScraperMode.LIVE:
+			raise ValueError('shards are only supported in live mode')
+		if shards > 1 and self._checkpoint is not None:
+			raise ValueError('checkpoints cannot be combined with shards')
 		self._auth = auth
 		self._csrf = csrf
+		self._shards = shards
+		self._shardSize = shardSize
 
 	def _check_scroll_response(self, r):
 		if r.status_code == 429:
@@ -1754,6 +1978,9 @@ class TwitterSearchScraper(_TwitterAPIScraper):
 			raise ValueError('empty query')
 		if self._mode is TwitterSearchScraperMode.USER:
 			raise snscrape.base.ScraperException('User searches currently unsupported')
+		if self._shards > 1:
+			yield from self._get_items_sharded()
+			return
 
 		paginationVariables = {
 			'rawQuery': self._query,
@@ -1797,8 +2024,106 @@ class TwitterSearchScraper(_TwitterAPIScraper):
 		if self._auth is not None and self._csrf is not None:
 			self._set_auth_info(self._auth, self._csrf)
 
-		for obj in self._iter_api_data('https://twitter.com/i/api/graphql/7jT5GT59P8IFjgxwqnEdQw/SearchTimeline', _TwitterAPIType.GRAPHQL, params, paginationParams, cursor = self._cursor, instructionsPath = ['data', 'search_by_raw_query', 'search_timeline', 'timeline', 'instructions']):
-			yield from self._graphql_timeline_instructions_to_tweets(obj['data']['search_by_raw_query']['search_timeline']['timeline']['instructions'])
+		def tweets():
+			for obj in self._iter_api_data('https://twitter.com/i/api/graphql/7jT5GT59P8IFjgxwqnEdQw/SearchTimeline', _TwitterAPIType.GRAPHQL, params, paginationParams, cursor = self._cursor, instructionsPath = ['data', 'search_by_raw_query', 'search_timeline', 'timeline', 'instructions'], checkpointStream = 'search'):
+				yield from self._graphql_timeline_instructions_to_tweets(obj['data']['search_by_raw_query']['search_timeline']['timeline']['instructions'])
+		yield from self._checkpoint_track(tweets(), 'search')
+
+	@staticmethod
+	def _split_time_bounds(query):
+		'''Remove the since/until/since_time/until_time operators from a query and return the remaining query and the bounds as Unix timestamps (or None if absent)'''
+
+		bounds = {}
+		for match in _SEARCH_TIME_BOUND_PATTERN.finditer(query):
+			operator, value = match.group(1), match.group(2)
+			if operator.endswith('_time'):
+				if not value.isdigit():
+					raise ValueError(f'cannot parse {operator}:{value}')
+				t = int(value)
+			else:
+				for format in ('%Y-%m-%d_%H:%M:%S_UTC', '%Y-%m-%d'):
+					try:
+						t = int(datetime.datetime.strptime(value, format).replace(tzinfo = datetime.timezone.utc).timestamp())
+					except ValueError:
+						continue
+					break
+				else:
+					raise ValueError(f'cannot parse {operator}:{value}')
+			bounds[operator.split('_', 1)[0]] = t
+		query = ' '.join(_SEARCH_TIME_BOUND_PATTERN.sub('', query).split())
+		return query, bounds.get('since'), bounds.get('until')
+
+	def _get_items_sharded(self):
+		# Split the time range of the query into windows, retrieve several of them concurrently, and emit them newest first.
+		# The windows are disjoint, so merging their descending-ID streams reduces to concatenating them in order.
+		# Window sizes adapt to the tweet density observed on completed windows, aiming for about shardSize tweets per window so that windows ahead of the consumer can complete in the background.
+		# Neither the current time nor the order in which windows complete is reproducible, so the upper bound and window sizes go through the HTTP archive to keep the URLs stable on replay.
+		query, since, until = self._split_time_bounds(self._query)
+		if not query:
+			raise ValueError('query consists only of time bounds')
+		since = since if since is not None else _SEARCH_EPOCH
+		until = until if until is not None else self._archived_value(f'twitter-search until {self._query}', lambda: int(time.time()) + 1)
+		observed = None # (seconds, count) of the most recently completed window
+
+		def record(seconds, count):
+			nonlocal observed
+			observed = (seconds, count)
+
+		def next_size(size):
+			if observed is None:
+				return size
+			seconds, count = observed
+			if count == 0:
+				newSize = size * 4
+			else:
+				newSize = seconds * self._shardSize // count
+			return max(_MIN_SHARD_SECONDS, min(newSize, size * 4))
+
+		def windows():
+			end = until
+			size = max(min((until - since) // self._shards, _INITIAL_SHARD_SECONDS), _MIN_SHARD_SECONDS)
+			while end > since:
+				size = self._archived_value(f'twitter-search window size {query} {end}', lambda: next_size(size))
+				start = max(since, end - size)
+				_logger.info(f'Scheduling search window {start} to {end}')
+				yield self._iter_shard(query, start, end, record)
+				end = start
+
+		# Window boundaries are exclusive, but be safe against duplicates anyway; out-of-order results are still emitted.
+		seenIds = snscrape.utils.CompactIntSet()
+		lowestId = None
+		for tweet in snscrape.utils.chain_concurrently(windows(), self._shards, depth = 4 * self._shardSize):
+			if tweet.id in seenIds:
+				_logger.debug(f'Skipping duplicate tweet {tweet.id}')
+				continue
+			seenIds.add(tweet.id)
+			if lowestId is not None and tweet.id > lowestId:
+				_logger.warning(f'Tweet {tweet.id} is out of order (after {lowestId})')
+			else:
+				lowestId = tweet.id
+			yield tweet
+
+	def _iter_shard(self, query, start, end, record):
+		scraper = TwitterSearchScraper(
+			f'{query} since_time:{start} until_time:{end}',
+			mode = self._mode,
+			maxEmptyPages = self._maxEmptyPages,
+			prefetchPages = self._prefetchPages,
+			userCacheSize = self._userCacheSize,
+			auth = self._auth,
+			csrf = self._csrf,
+			guestTokenManager = self._guestTokenManager,
+			retries = self._retries,
+			proxies = self._proxies,
+			archive = self._archive,
+			rateLimiter = self._rateLimiter,
+			retryPolicy = self._retryPolicy,
+		)
+		count = 0
+		for tweet in scraper.get_items():
+			count += 1
+			yield tweet
+		record(end - start, count)
 
 	@classmethod
 	def _cli_setup_parser(cls, subparser):
@@ -1806,6 +2131,9 @@ class TwitterSearchScraper(_TwitterAPIScraper):
 		group = subparser.add_mutually_exclusive_group(required = False)
 		group.add_argument('--mode', type = snscrape.utils.nonempty_string_arg('mode'), help = 'Search types: live/top/user/image/video')
 		subparser.add_argument('--max-empty-pages', dest = 'maxEmptyPages', metavar = 'N', type = int, default = 20, help = 'Stop after N empty pages from Twitter; set to 0 to disable')
+		subparser.add_argument('--prefetch-pages', dest = 'prefetchPages', metavar = 'N', type = snscrape.utils.parse_nonnegative_int, default = 0, help = 'Retrieve up to N pages ahead in the background while processing results; set to 0 to disable')
+		subparser.add_argument('--shards', metavar = 'N', type = snscrape.utils.parse_positive_int, default = 1, help = 'Split the time range of the query into windows and retrieve up to N of them concurrently (live mode only)')
+		subparser.add_argument('--shard-size', dest = 'shardSize', metavar = 'N', type = snscrape.utils.parse_positive_int, default = 2000, help = 'Aim for about N tweets per window when sharding')
 		subparser.add_argument('query', type = snscrape.utils.nonempty_string_arg('query'), help = 'A Twitter search string')
 		subparser.add_argument('--rfilter', type = str, help = 'A Twitter search result filter: user/image/video')
 		subparser.add_argument('--auth', type = snscrape.utils.nonempty_string_arg('auth'), help = 'Auth token')
@@ -1813,7 +2141,7 @@ class TwitterSearchScraper(_TwitterAPIScraper):
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, args.query, cursor = args.cursor, mode = TwitterSearchScraperMode._cli_from_args(args), maxEmptyPages = args.maxEmptyPages, auth = args.auth, csrf = args.csrf)
+		return cls._cli_construct(args, args.query, cursor = args.cursor, mode = TwitterSearchScraperMode._cli_from_args(args), maxEmptyPages = args.maxEmptyPages, prefetchPages = args.prefetchPages, auth = args.auth, csrf = args.csrf, shards = args.shards, shardSize = args.shardSize)
 
 
 class TwitterUserScraper(TwitterSearchScraper):
@@ -1877,16 +2205,18 @@ class TwitterUserScraper(TwitterSearchScraper):
 
 		subparser.add_argument('--user-id', dest = 'isUserId', action = 'store_true', default = False, help = 'Use user ID instead of username')
 		subparser.add_argument('user', type = user, help = 'A Twitter username (without @)')
+		subparser.add_argument('--prefetch-pages', dest = 'prefetchPages', metavar = 'N', type = snscrape.utils.parse_nonnegative_int, default = 0, help = 'Retrieve up to N pages ahead in the background while processing results; set to 0 to disable')
 		subparser.add_argument('--auth', type = snscrape.utils.nonempty_string_arg('auth'), help = 'Auth token')
 		subparser.add_argument('--csrf', type = snscrape.utils.nonempty_string_arg('csrf'), help = 'CSRF token')
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, user = int(args.user) if args.isUserId else args.user, auth = args.auth, csrf = args.csrf)
+		return cls._cli_construct(args, user = int(args.user) if args.isUserId else args.user, auth = args.auth, csrf = args.csrf, prefetchPages = args.prefetchPages)
 
 
 class TwitterProfileScraper(TwitterUserScraper):
 	name = 'twitter-profile'
+	_supportsCheckpoint = False
 
 	def get_items(self):
 		if not self._isUserId:
@@ -1963,6 +2293,7 @@ class TwitterProfileScraper(TwitterUserScraper):
 
 class TwitterUserRecommendationScraper(TwitterUserScraper):
 	name = 'twitter-urecommend'
+	_supportsCheckpoint = False
 
 	def get_items(self):
 		if not self._isUserId:
@@ -1999,6 +2330,7 @@ class TwitterUserRecommendationScraper(TwitterUserScraper):
 
 class TwitterUserConnectScraper(TwitterUserScraper):
 	name = 'twitter-uconnect'
+	_supportsCheckpoint = False
 
 	def get_items(self):
 		if not self._isUserId:
@@ -2105,9 +2437,18 @@ class TwitterTweetScraperMode(enum.Enum):
 class TwitterTweetScraper(_TwitterAPIScraper):
 	name = 'twitter-tweet'
 
-	def __init__(self, tweetId, *, mode = TwitterTweetScraperMode.SINGLE, **kwargs):
+	def __init__(self, tweetId, *, mode = TwitterTweetScraperMode.SINGLE, recurseQueueLimit = None, recurseConcurrency = 1, recurseOrder = 'bfs', **kwargs):
 		self._tweetId = tweetId
 		self._mode = mode
+		if recurseQueueLimit is not None and recurseQueueLimit < 1:
+			raise ValueError('recurseQueueLimit must be positive')
+		if recurseConcurrency < 1:
+			raise ValueError('recurseConcurrency must be positive')
+		if recurseOrder not in ('bfs', 'completion'):
+			raise ValueError("recurseOrder must be 'bfs' or 'completion'")
+		self._recurseQueueLimit = recurseQueueLimit
+		self._recurseConcurrency = recurseConcurrency
+		self._recurseOrder = recurseOrder
 		super().__init__(f'https://twitter.com/i/web/status/{self._tweetId}', **kwargs)
 
 	def get_items(self):
@@ -2175,32 +2516,131 @@ class TwitterTweetScraper(_TwitterAPIScraper):
 			if hasModeratedReplies:
 				yield from self._get_moderated_replies(self._tweetId)
 		elif self._mode is TwitterTweetScraperMode.RECURSE:
-			seenTweets = set()
-			queue = collections.deque()
+			# The seen IDs are stored compactly, and the queue spills to disk beyond recurseQueueLimit IDs if that is set, so large conversation trees do not exhaust the memory.
+			seenTweets = snscrape.utils.CompactIntSet()
+			queue = snscrape.utils.SpillingQueue(memoryLimit = self._recurseQueueLimit)
 			queue.append(self._tweetId)
-			while queue:
-				tweetId = queue.popleft()
-				thisPagParams = copy.deepcopy(paginationParams)
-				thisPagParams['variables']['focalTweetId'] = str(tweetId)
-				thisParams = copy.deepcopy(thisPagParams)
-				del thisPagParams['variables']['cursor'], thisPagParams['variables']['referrer']
-				hasModeratedReplies = False
-				for obj in self._iter_api_data(url, _TwitterAPIType.GRAPHQL, thisParams, thisPagParams, direction = _ScrollDirection.BOTH, instructionsPath = instructionsPath):
-					if not obj['data']:
-						continue
-					for tweet in self._graphql_timeline_instructions_to_tweets(obj['data']['threaded_conversation_with_injections_v2']['instructions'], includeConversationThreads = True):
-						if tweet.id not in seenTweets:
-							yield tweet
-							seenTweets.add(tweet.id)
-							if tweet.id != self._tweetId:  # Already queued at the beginning
-								queue.append(tweet.id)
-					hasModeratedReplies = hasModeratedReplies or self._has_moderated_replies(obj, tweetId)
-				if hasModeratedReplies:
-					for tweet in self._get_moderated_replies(tweetId):
-						if tweet.id not in seenTweets:
-							yield tweet
-							seenTweets.add(tweet.id)
-							queue.append(tweet.id)
+			try:
+				if self._recurseConcurrency > 1:
+					yield from self._recurse_concurrently(queue, seenTweets, url, paginationParams, instructionsPath)
+				else:
+					yield from self._recurse(queue, seenTweets, url, paginationParams, instructionsPath)
+			finally:
+				queue.close()
+
+	def _recurse(self, queue, seenTweets, url, paginationParams, instructionsPath):
+		while queue:
+			tweetId = queue.popleft()
+			for tweet in self._expand_tweet(tweetId, url, paginationParams, instructionsPath):
+				if tweet.id not in seenTweets:
+					yield tweet
+					seenTweets.add(tweet.id)
+					if tweet.id != self._tweetId:  # Already queued at the beginning
+						queue.append(tweet.id)
+
+	def _recurse_concurrently(self, frontier, seenTweets, url, paginationParams, instructionsPath):
+		# Up to recurseConcurrency frontier tweets are expanded at once by worker threads, each with its own clone of the scraper (and hence its own session).
+		# The main thread owns seenTweets and the frontier: it deduplicates the tweets as they come in, yields the new ones, and queues their IDs.
+		# In BFS order, the expansions are consumed strictly in frontier order, and those that are ahead of the head are buffered. This produces the same output as the sequential expansion.
+		# In completion order, tweets are processed as soon as any expansion produces them.
+		# The number of expansions that are finished but not consumed yet is limited to avoid unbounded buffering behind a large head expansion.
+		maxOutstanding = 4 * self._recurseConcurrency
+		local = threading.local()
+		stop = threading.Event()
+		results = queue.Queue()
+
+		def expand(taskId, tweetId):
+			if stop.is_set():
+				return
+			try:
+				if not hasattr(local, 'scraper'):
+					local.scraper = self._recurse_worker_scraper()
+				for tweet in local.scraper._expand_tweet(tweetId, url, paginationParams, instructionsPath):
+					if stop.is_set():
+						return
+					results.put((taskId, 'tweet', tweet))
+			except BaseException as e:
+				results.put((taskId, 'error', e))
+			else:
+				results.put((taskId, 'done', None))
+
+		tasks = {} # taskId -> [buffered tweets, done]
+		order = collections.deque() # taskIds in frontier order, only maintained in BFS order
+		taskIds = itertools.count()
+		running = 0
+		executor = concurrent.futures.ThreadPoolExecutor(max_workers = self._recurseConcurrency)
+		try:
+			while True:
+				while frontier and running < self._recurseConcurrency and len(tasks) < maxOutstanding:
+					taskId = next(taskIds)
+					tasks[taskId] = [collections.deque(), False]
+					if self._recurseOrder != 'completion':
+						order.append(taskId)
+					running += 1
+					executor.submit(expand, taskId, frontier.popleft())
+				if not tasks:
+					break
+				taskId, kind, value = results.get()
+				if kind == 'error':
+					raise value
+				if kind == 'done':
+					running -= 1
+				if self._recurseOrder == 'completion':
+					ready = [value] if kind == 'tweet' else []
+					if kind == 'done':
+						del tasks[taskId]
+				else:
+					if kind == 'tweet':
+						tasks[taskId][0].append(value)
+					else:
+						tasks[taskId][1] = True
+					ready = []
+					while order:
+						buffer, done = tasks[order[0]]
+						ready.extend(buffer)
+						buffer.clear()
+						if not done:
+							break
+						del tasks[order.popleft()]
+				for tweet in ready:
+					if tweet.id not in seenTweets:
+						yield tweet
+						seenTweets.add(tweet.id)
+						if tweet.id != self._tweetId:
+							frontier.append(tweet.id)
+		finally:
+			stop.set()
+			executor.shutdown(wait = False)
+
+	def _recurse_worker_scraper(self):
+		return TwitterTweetScraper(
+			self._tweetId,
+			mode = self._mode,
+			guestTokenManager = self._guestTokenManager,
+			maxEmptyPages = self._maxEmptyPages,
+			prefetchPages = self._prefetchPages,
+			userCacheSize = self._userCacheSize,
+			retries = self._retries,
+			proxies = self._proxies,
+			archive = self._archive,
+			rateLimiter = self._rateLimiter,
+			retryPolicy = self._retryPolicy,
+		)
+
+	def _expand_tweet(self, tweetId, url, paginationParams, instructionsPath):
+		# Yield all tweets of the conversation around tweetId including the moderated replies, with duplicates
+		thisPagParams = copy.deepcopy(paginationParams)
+		thisPagParams['variables']['focalTweetId'] = str(tweetId)
+		thisParams = copy.deepcopy(thisPagParams)
+		del thisPagParams['variables']['cursor'], thisPagParams['variables']['referrer']
+		hasModeratedReplies = False
+		for obj in self._iter_api_data(url, _TwitterAPIType.GRAPHQL, thisParams, thisPagParams, direction = _ScrollDirection.BOTH, instructionsPath = instructionsPath):
+			if not obj['data']:
+				continue
+			yield from self._graphql_timeline_instructions_to_tweets(obj['data']['threaded_conversation_with_injections_v2']['instructions'], includeConversationThreads = True)
+			hasModeratedReplies = hasModeratedReplies or self._has_moderated_replies(obj, tweetId)
+		if hasModeratedReplies:
+			yield from self._get_moderated_replies(tweetId)
 
 	def _has_moderated_replies(self, obj, tweetId):
 		for instruction in obj['data']['threaded_conversation_with_injections_v2']['instructions']:
@@ -2253,12 +2693,15 @@ class TwitterTweetScraper(_TwitterAPIScraper):
 	def _cli_setup_parser(cls, subparser):
 		group = subparser.add_mutually_exclusive_group(required = False)
 		group.add_argument('--scroll', action = 'store_true', default = False, help = 'Enable scrolling in both directions')
-		group.add_argument('--recurse', '--recursive', action = 'store_true', default = False, help = 'Enable recursion through all tweets encountered (warning: slow, potentially memory-intensive!)')
+		group.add_argument('--recurse', '--recursive', action = 'store_true', default = False, help = 'Enable recursion through all tweets encountered (warning: slow!)')
+		subparser.add_argument('--recurse-queue-limit', dest = 'recurseQueueLimit', metavar = 'N', type = snscrape.utils.parse_positive_int, default = None, help = 'With --recurse, keep at most about N queued tweet IDs in memory and spill the rest to a temporary file')
+		subparser.add_argument('--recurse-concurrency', dest = 'recurseConcurrency', metavar = 'N', type = snscrape.utils.parse_positive_int, default = 1, help = 'With --recurse, expand up to N tweets concurrently')
+		subparser.add_argument('--recurse-order', dest = 'recurseOrder', choices = ('bfs', 'completion'), default = 'bfs', help = 'With --recurse-concurrency, emit tweets in breadth-first order (same as without concurrency) or as soon as they are retrieved')
 		subparser.add_argument('tweetId', type = int, help = 'A tweet ID')
 
 	@classmethod
 	def _cli_from_args(cls, args):
-		return cls._cli_construct(args, args.tweetId, mode = TwitterTweetScraperMode._cli_from_args(args))
+		return cls._cli_construct(args, args.tweetId, mode = TwitterTweetScraperMode._cli_from_args(args), recurseQueueLimit = args.recurseQueueLimit, recurseConcurrency = args.recurseConcurrency, recurseOrder = args.recurseOrder)
 
 
 class TwitterListPostsScraper(TwitterSearchScraper):
@@ -6,7 +6,6 @@ import collections
 import dataclasses
 import datetime
 import itertools
-import json
 import logging
 import re
 import snscrape.base
@@ -194,7 +193,7 @@ class VKontakteUserScraper(snscrape.base.Scraper):
 					_logger.warning(f'Photo thumb wrap on {url} has no or unexpected onclick, skipping')
 					continue
 				photoData = a['onclick'][a['onclick'].find('{"temp":') : -8] # -8 = len(', event)')
-				photoObj = json.loads(photoData)
+				photoObj = snscrape.base._json_loads(photoData)
 				singleLetterKeys = [k for k in photoObj['temp'].keys() if len(k) == 1 and 97 <= ord(k) <= 122] # 97 = ord('a'), 122 = ord('z')
 				for x in singleLetterKeys:
 					# Merge base into URLs
@@ -315,7 +314,7 @@ class VKontakteUserScraper(snscrape.base.Scraper):
 		if r.status_code != 200:
 			raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
 		# Convert to JSON and read the HTML payload.  Note that this implicitly converts the data to a Python string (i.e., Unicode), away from a windows-1251-encoded bytes.
-		posts = r.json()['payload'][1][0]
+		posts = snscrape.base._json_loads_response(r)['payload'][1][0]
 		return posts
 
 	def _get_entity(self):
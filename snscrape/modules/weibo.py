@@ -110,7 +110,7 @@ class WeiboUserScraper(snscrape.base.Scraper):
 			r = self._get(f'https://m.weibo.cn/api/container/getIndex?type=uid&value={self._user}&containerid=107603{self._user}&count=25{sinceParam}', headers = self._headers, responseOkCallback = self._check_timeline_response)
 			if r.status_code != 200:
 				raise snscrape.base.ScraperException(f'Got status code {r.status_code}')
-			o = r.json()
+			o = snscrape.base._json_loads_response(r)
 			for card in o['data']['cards']:
 				if card['card_type'] != 9:
 					_logger.warning(f'Skipping card of type {card["card_type"]}')
@@ -141,7 +141,7 @@ class WeiboUserScraper(snscrape.base.Scraper):
 		r = self._get(f'https://m.weibo.cn/api/container/getIndex?type=uid&value={self._user}', headers = self._headers)
 		if r.status_code != 200:
 			raise snscrape.base.ScraperException('Could not fetch user info')
-		o = r.json()
+		o = snscrape.base._json_loads_response(r)
 		return self._user_info_to_entity(o['data']['userInfo'])
 
 	@classmethod
@@ -1,3 +1,14 @@
+import argparse
+import array
+import bisect
+import collections
+import heapq
+import os
+import queue
+import tempfile
+import threading
+
+
 def dict_map(input, keyMap):
 	'''Return a new dict from an input dict and a {'input_key': 'output_key'} mapping'''
 
@@ -28,6 +39,30 @@ def nonempty_string_arg(name):
 	return f
 
 
+def parse_positive_int(arg):
+	'''An argparse argument type for a positive integer'''
+
+	try:
+		value = int(arg)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'invalid int value: {arg!r}') from None
+	if value <= 0:
+		raise argparse.ArgumentTypeError(f'{arg!r} is not positive')
+	return value
+
+
+def parse_nonnegative_int(arg):
+	'''An argparse argument type for a non-negative integer'''
+
+	try:
+		value = int(arg)
+	except ValueError:
+		raise argparse.ArgumentTypeError(f'invalid int value: {arg!r}') from None
+	if value < 0:
+		raise argparse.ArgumentTypeError(f'{arg!r} is negative')
+	return value
+
+
 def module_deprecation_helper(all, **names):
 	'''A helper function to generate the relevant module __getattr__ and __dir__ functions for handling deprecated names'''
 
@@ -39,3 +74,321 @@ def module_deprecation_helper(all, **names):
 	def __dir__():
 		return sorted(all + list(names.keys()))
 	return __getattr__, __dir__
+
+
+class _Prefetcher:
+	def __init__(self, iterable, depth):
+		self._queue = queue.Queue(maxsize = max(depth, 0))
+		self._stop = threading.Event()
+		self._done = False
+		self._thread = threading.Thread(target = self._run, args = (iter(iterable),), daemon = True)
+		self._thread.start()
+
+	def _put(self, entry):
+		# Block while the queue is full, but give up once the consumer has gone away
+		while not self._stop.is_set():
+			try:
+				self._queue.put(entry, timeout = 0.1)
+			except queue.Full:
+				continue
+			return True
+		return False
+
+	def _run(self, it):
+		try:
+			for item in it:
+				if not self._put((False, item)):
+					return
+		except BaseException as e:
+			self._put((True, e))
+		else:
+			self._put((True, None))
+		finally:
+			if hasattr(it, 'close'):
+				it.close()
+
+	def __iter__(self):
+		return self
+
+	def __next__(self):
+		if self._done:
+			raise StopIteration
+		isEnd, value = self._queue.get()
+		if isEnd:
+			self._done = True
+			if value is not None:
+				raise value
+			raise StopIteration
+		return value
+
+	def close(self):
+		self._done = True
+		self._stop.set()
+
+	def __del__(self):
+		self.close()
+
+
+def prefetch(iterable, depth):
+	'''Return an iterator over `iterable` which is advanced in a background thread up to `depth` items ahead of the consumer; a depth of zero means no limit.
+
+	Exceptions raised by `iterable` are re-raised to the consumer in order. Closing the returned iterator stops the background thread at the next item.'''
+
+	return _Prefetcher(iterable, depth)
+
+
+def chain_concurrently(iterables, concurrency, depth = 0):
+	'''Yield the items of each iterable in `iterables` in order like itertools.chain.from_iterable, but consume up to `concurrency` of the iterables ahead in background threads, buffering up to `depth` items each (zero means no limit).
+
+	`iterables` is only advanced when a slot becomes free, so it may be a generator that adapts the later iterables based on how the earlier ones went.'''
+
+	iterables = iter(iterables)
+	running = collections.deque()
+	try:
+		while True:
+			while len(running) < concurrency:
+				try:
+					iterable = next(iterables)
+				except StopIteration:
+					break
+				running.append(prefetch(iterable, depth))
+			if not running:
+				break
+			yield from running.popleft()
+	finally:
+		for prefetcher in running:
+			prefetcher.close()
+
+
+def interleave_concurrently(iterables, concurrency):
+	'''Yield the items of each iterable in `iterables` in the order in which they become available, consuming up to `concurrency` of the iterables at a time in background threads.
+
+	The items of each iterable keep their relative order. Exceptions raised by an iterable are re-raised to the consumer. Closing the returned generator stops the background threads at their next item.'''
+
+	iterables = iter(iterables)
+	results = queue.Queue(maxsize = concurrency)
+	stop = threading.Event()
+
+	def put(entry):
+		while not stop.is_set():
+			try:
+				results.put(entry, timeout = 0.1)
+			except queue.Full:
+				continue
+			return True
+		return False
+
+	def run(iterable):
+		it = iter(iterable)
+		try:
+			for item in it:
+				if not put((False, item)):
+					return
+		except BaseException as e:
+			put((True, e))
+		else:
+			put((True, None))
+		finally:
+			if hasattr(it, 'close'):
+				it.close()
+
+	running = 0
+	try:
+		while True:
+			while running < concurrency:
+				try:
+					iterable = next(iterables)
+				except StopIteration:
+					break
+				threading.Thread(target = run, args = (iterable,), daemon = True).start()
+				running += 1
+			if not running:
+				break
+			isEnd, value = results.get()
+			if not isEnd:
+				yield value
+				continue
+			running -= 1
+			if value is not None:
+				raise value
+	finally:
+		stop.set()
+
+
+class _Descending:
+	__slots__ = ('value',)
+
+	def __init__(self, value):
+		self.value = value
+
+	def __eq__(self, other):
+		return self.value == other.value
+
+	def __lt__(self, other):
+		return other.value < self.value
+
+
+def _merge_sort_key(key, reverse):
+	if key is None:
+		key = lambda item: item
+	if reverse:
+		return lambda item: _Descending(key(item))
+	return key
+
+
+def merge(*iterables, key = None, reverse = False):
+	'''Merge the `iterables`, each sorted by `key` (descending if `reverse` is true), into one sorted iterator like heapq.merge.
+
+	Items with equal keys are yielded in the order of the iterables they come from, e.g. merge(comments, submissions, key = lambda item: item.date, reverse = True) yields a comment before a submission with the same date.
+	Only the current item of each iterable is held in memory. Closing the returned generator closes all iterables that have a close method.'''
+
+	sortKey = _merge_sort_key(key, reverse)
+	iterators = [iter(iterable) for iterable in iterables]
+	heap = []
+	try:
+		for index, it in enumerate(iterators):
+			for item in it:
+				heap.append((sortKey(item), index, item))
+				break
+		heapq.heapify(heap)
+		while heap:
+			_, index, item = heap[0]
+			yield item
+			for item in iterators[index]:
+				heapq.heapreplace(heap, (sortKey(item), index, item))
+				break
+			else:
+				heapq.heappop(heap)
+	finally:
+		for it in iterators:
+			if hasattr(it, 'close'):
+				it.close()
+
+
+async def amerge(*aiterables, key = None, reverse = False):
+	'''Asynchronous counterpart of merge for async iterables, e.g. several Scraper.aget_items()'''
+
+	sortKey = _merge_sort_key(key, reverse)
+	iterators = [aiterable.__aiter__() for aiterable in aiterables]
+	heap = []
+	try:
+		for index, it in enumerate(iterators):
+			try:
+				item = await it.__anext__()
+			except StopAsyncIteration:
+				continue
+			heap.append((sortKey(item), index, item))
+		heapq.heapify(heap)
+		while heap:
+			_, index, item = heap[0]
+			yield item
+			try:
+				item = await iterators[index].__anext__()
+			except StopAsyncIteration:
+				heapq.heappop(heap)
+			else:
+				heapq.heapreplace(heap, (sortKey(item), index, item))
+	finally:
+		for it in iterators:
+			if hasattr(it, 'aclose'):
+				await it.aclose()
+
+
+class CompactIntSet:
+	'''A set of unsigned 64-bit integers stored compactly
+
+	The members are kept in a sorted array('Q') (8 bytes per member) with a small set as a write buffer, which is merged into the array once it grows beyond a fraction of the array's size.
+	Membership tests are a set lookup followed by a binary search.
+	'''
+
+	def __init__(self, iterable = (), *, minBufferSize = 4096):
+		self._array = array.array('Q')
+		self._buffer = set()
+		self._minBufferSize = minBufferSize
+		for x in iterable:
+			self.add(x)
+
+	def add(self, x):
+		if x in self:
+			return
+		self._buffer.add(x)
+		if len(self._buffer) >= max(self._minBufferSize, len(self._array) // 16):
+			self._merge()
+
+	def _merge(self):
+		self._array = array.array('Q', heapq.merge(self._array, sorted(self._buffer)))
+		self._buffer.clear()
+
+	def __contains__(self, x):
+		if x in self._buffer:
+			return True
+		i = bisect.bisect_left(self._array, x)
+		return i < len(self._array) and self._array[i] == x
+
+	def __len__(self):
+		return len(self._array) + len(self._buffer)
+
+	def __iter__(self):
+		return heapq.merge(self._array, sorted(self._buffer))
+
+
+class SpillingQueue:
+	'''A FIFO queue of unsigned 64-bit integers that keeps at most about memoryLimit of them in memory and spills the rest to a temporary file
+
+	Items are spilled in chunks of chunkSize in packed form. A memoryLimit of None disables spilling.
+	'''
+
+	def __init__(self, *, memoryLimit = None, chunkSize = 65536):
+		self._memoryLimit = memoryLimit
+		self._chunkSize = chunkSize if memoryLimit is None else max(1, min(chunkSize, memoryLimit // 2))
+		# Order of the items: head, then the chunks on disk, then tail
+		self._head = collections.deque()
+		self._chunks = collections.deque()
+		self._tail = array.array('Q')
+		self._file = None
+		self._len = 0
+
+	def append(self, x):
+		if self._memoryLimit is None or (not self._chunks and not self._tail and len(self._head) < self._memoryLimit - self._chunkSize):
+			self._head.append(x)
+		else:
+			self._tail.append(x)
+			if len(self._tail) >= self._chunkSize:
+				self._spill()
+		self._len += 1
+
+	def _spill(self):
+		if self._file is None:
+			self._file = tempfile.TemporaryFile(prefix = 'snscrape_queue_')
+		self._file.seek(0, os.SEEK_END)
+		self._chunks.append((self._file.tell(), len(self._tail)))
+		self._tail.tofile(self._file)
+		self._tail = array.array('Q')
+
+	def popleft(self):
+		if not self._head:
+			if self._chunks:
+				offset, count = self._chunks.popleft()
+				self._file.seek(offset)
+				chunk = array.array('Q')
+				chunk.fromfile(self._file, count)
+				self._head.extend(chunk)
+				if not self._chunks:
+					# Everything on disk has been read, so the file can start over.
+					self._file.seek(0)
+					self._file.truncate()
+			elif self._tail:
+				self._head.extend(self._tail)
+				self._tail = array.array('Q')
+			else:
+				raise IndexError('pop from an empty queue')
+		self._len -= 1
+		return self._head.popleft()
+
+	def __len__(self):
+		return self._len
+
+	def close(self):
+		if self._file is not None:
+			self._file.close()
+			self._file = None